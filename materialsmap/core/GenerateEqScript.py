@@ -2,6 +2,7 @@ import pandas as pd
 from tqdm import tqdm
 import os
 import numpy as np
+from materialsmap.core.project import loadSettings, loadCompositions
 ##############################################
 # Temperature in the setting file should be in Celcius
 # default composition excel file should be in weight fraction
@@ -73,15 +74,15 @@ def getSettings(path):
         set: rearrange the parameters in settings
     """
     ##############################get settings######################################
-    settings = np.load(f'{path}/setting.npy',allow_pickle=True) #settings = [TemperatureRange,numPoint,numSimultion,relatedEles,terminalAlloys,indep_terminalAlloys,database,pressure]
-    comp = settings[3]
-    pressure = settings[7]
-    database = settings[6]
-    TRange = settings[0]
-    numFile = int(settings[1])
-    comp1 = settings[5][0]
-    comp2 = settings[5][1]
-    comps = settings[4]
+    settings = loadSettings(path)
+    comp = settings['relatedEles']
+    pressure = settings['pressure']
+    database = settings['database']
+    TRange = settings['TemperatureRange']
+    numFile = settings['numPoint']
+    comp1 = settings['indep_terminalAlloys'][0]
+    comp2 = settings['indep_terminalAlloys'][1]
+    comps = settings['terminalAlloys']
     path = os.path.abspath(path)
     folder_Eq = f'{path}/Thermo-calc/Equilibrium Simulation'
     isExist = os.path.exists(folder_Eq + '/Result')
@@ -94,7 +95,7 @@ def getSettings(path):
         os.makedirs(folder_Scheil + '/Result')
         print("The new directory for Scheil is created!")
     #get composition
-    data = pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
+    data = loadCompositions(path)
     composition_data = dict()
     for item in data.columns:
         if 'alloy' in item:
@@ -107,7 +108,7 @@ def getSettings(path):
     return [TRange, numFile, comp1, comp2, comp, folder_Eq, folder_Scheil, composition_data, Compositions, comps, pressure, database]
     
 
-def createEqScript(path, maxNumSim = 999, database = None, eleAmountType = 'massFraction'): 
+def createEqScript(path, maxNumSim = 999, database = None, eleAmountType = 'massFraction', coarseFactor = None): 
     """generate the TCM files for eq calculations based on settings
 
     Args:
@@ -115,6 +116,7 @@ def createEqScript(path, maxNumSim = 999, database = None, eleAmountType = 'mass
         maxNumSim (int, optional): the maximum number of simulations in each TCM file. Defaults to 999.
         database (str, optional): the path to database or database name that indeside thermo_calc. Defaults to None.
         eleAmountType (str, optional): the element amount type. Defaults to 'massFraction'.
+        coarseFactor (int, optional): use coarseFactor times the temperature step as max step of the axis, STEP adds the phase boundaries itself. Defaults to None (the temperature step).
 
     Returns:
         TCM files: numScript(related to different comps)_comp(related elements in this script)_numFile(if exceed the maxNumSim, the script will be splited)
@@ -129,6 +131,9 @@ def createEqScript(path, maxNumSim = 999, database = None, eleAmountType = 'mass
     output_Eq = settings[5]
     TemperatureRange = settings[0]
     pressure = settings[10]
+    axisStep = TemperatureRange[2]
+    if coarseFactor is not None:
+        axisStep = TemperatureRange[2]*coarseFactor
     output = sortCompositions(Compositions)
     index_compositionList = 0
     for Compositions in output:
@@ -192,7 +197,7 @@ def createEqScript(path, maxNumSim = 999, database = None, eleAmountType = 'mass
             f.write('SCREEN\n')
             f.write('VWCS\n')
             f.write(f's-a-v 1 t {TemperatureRange[0]+273.15} {TemperatureRange[1]+273.15}\n')
-            f.write(f'{TemperatureRange[2]}\n')
+            f.write(f'{axisStep}\n')
             f.write('step\n')
             f.write('NORMAL\n')
             f.write('enter function TC=T-273.15\n\n')
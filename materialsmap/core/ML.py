@@ -2,6 +2,8 @@ import numpy as np
 import pandas as pd
 from pycalphad import Database, equilibrium, Model, variables as v
 from materialsmap.ref_data import eleweight
+from materialsmap.core.project import loadSettings, loadCompositions
+from materialsmap.core.compositions import getPointCompositions
 from collections import defaultdict
 import requests
 import json
@@ -14,34 +16,17 @@ def ML_run(path,properties='melting_temperature'):
         path (str): path to open the setting and store the results
         properties (str): properteis of interested. Defaults to melting_temperature.
     """
-    setting = np.load(f'{path}/setting.npy',allow_pickle=True)
+    setting = loadSettings(path)
     comps = []
-    for i in setting[3]:
+    for i in setting['relatedEles']:
         comps.append(i.upper())
     comps.append('VA')
-    compositions_list = []
-    indepcomp_list = []
-    all_comp_tot = []
-    df = pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
+    df = loadCompositions(path)
+    compositions_list, all_comp_tot = getPointCompositions(df, setting['relatedEles'], pureFallback = False)
     data_str = "[" # change the compositions to MAPP format
     for n in range(len(df.index)):
-        comp_list={}
-        all_comp = []
-        nocomp_list = []
-        indep = 0
-        for o,i in enumerate(setting[3]):
-            if indep == 0 and float(df.loc[n,[i]].values) > 0:
-                indep  = 1
-                indepcomp_list.append(i)
-                all_comp.append(i)
-                continue;
-            elif float(df.loc[n,[i]].values) < 1E-5:
-                nocomp_list.append(i)
-                continue
-            i = i.upper()
-            all_comp.append(i)
-            comp_list[v.W(i)]=float(df.loc[n,[i]].values)
-        comp_list_mole = v.get_mole_fractions(comp_list,v.Species(indepcomp_list[n]),eleweight)
+        comp_list_mole = compositions_list[n]
+        all_comp = all_comp_tot[n]
         if len(data_str) > 2: 
             data_str += ","
         if len(comp_list_mole) == 0:
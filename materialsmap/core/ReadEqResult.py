@@ -1,4 +1,6 @@
 from materialsmap.core.GenerateEqScript import getSettings
+from materialsmap.core.result_store import ResultStoreWriter
+from materialsmap.core.executor import get_executor, bounded_imap_unordered, TaskFailure
 from tqdm import tqdm
 import numpy as np
 import json
@@ -15,21 +17,12 @@ def getColumn(words):
             columns.append(word[index1:-1])
     return columns
 
-def sortOutputbyT(output,T):
-    n = len(output[T])
-    for i in range(n):
-        # Last i elements are already in place
-        for j in range(0, n-i-1):
-            # Traverse the array from 0 to n-i-1
-            # Swap if the element found is greater than the next element
-            if output[T][j] > output[T][j+1] :
-                for item in output.keys():
-                    output[item][j], output[item][j+1] = output[item][j+1], output[item][j]
-    return output
-
 def readEqFromFile(folder_Eq, file_index, Mole = True): 
     """if Mole is True, then read mole fraction for phase, else read weight fraction for phase
 
+    The file is read line by line in one pass, the rows of each col-1= block go to NumPy columns
+    (0 for the columns missing in a block) and all rows are sorted once by the first column (T).
+
     Args:
         folder_Eq (path): path to folder that contains eq results
         file_index (int): index of the TCM files
@@ -42,41 +35,42 @@ def readEqFromFile(folder_Eq, file_index, Mole = True):
         fileName = f'{folder_Eq}/{file_index}_mole.exp'
     else:
         fileName = f'{folder_Eq}/{file_index}_wt.exp'
-    f = open(fileName,'r+')
-    lines = f.readlines()
-    #############get all col###########
-    columns = []
-    for index in range(len(lines)):
-        content = lines[index]
-        words = content.split()
-        if len(words) > 0 and 'col-1=' in words[0]:
-            columns += getColumn(words)
-    finalcolumns = set(columns)
-    ############initialize output######
-    output = dict()
-    for item in finalcolumns:
-        output[item] = []
-    ###################################
-    startRead = False
-    for index in range(len(lines)):
-        content = lines[index]
+    finalcolumns = {}
+    blocks = []
+    columns = None
+    f = open(fileName,'r')
+    for index, content in enumerate(f):
         words = content.split()
-        if len(words) > 0 and 'col-1=' in words[0]:
+        if len(words) == 0:
+            columns = None
+            continue
+        if 'col-1=' in words[0]:
             columns = getColumn(words)
-            startRead = True
-        if startRead and len(words) > 0 and 'col-1=' not in words[0]:
+            # index of each column of this block in the output, in order of appearance
+            positions = [finalcolumns.setdefault(col, len(finalcolumns)) for col in columns]
+            rows = []
+            blocks.append((positions, rows))
+        elif columns is not None:
             if len(words) == len(columns) and 'NONE' not in words:
-                for col in finalcolumns:
-                    if col in columns:
-                        colIndex = columns.index(col)
-                        output[col].append(float(words[colIndex]))
-                    else:
-                        output[col].append(0)
+                rows.append(words)
             else:
                 print(f'error in {file_index}th file, line {index}')
-        if startRead and len(words) == 0:
-            startRead = False
-        output = sortOutputbyT(output, columns[0])
+    f.close()
+    numRows = sum(len(rows) for positions, rows in blocks)
+    values = np.zeros((numRows, len(finalcolumns)))
+    start = 0
+    for positions, rows in blocks:
+        if len(rows) > 0:
+            values[start:start+len(rows), positions] = np.array(rows, dtype=float)
+            start += len(rows)
+    output = dict()
+    if numRows == 0:
+        for item in finalcolumns:
+            output[item] = []
+        return output
+    order = np.argsort(values[:, 0], kind='stable')
+    for item, col in finalcolumns.items():
+        output[item] = values[order, col].tolist()
     return output
 
 def transferTempToKelvin(data,numFile):
@@ -86,16 +80,39 @@ def transferTempToKelvin(data,numFile):
             del data[f'Point{index}']['TC']
     return data
 
-def getEqdata(path, readMole = True):
+def readEqPoint(folder_Eq, file_index, Mole = True):
+    """read the eq results of one point for getEqdata, raise if the file has no result
+
+    Args:
+        folder_Eq (path): path to folder that contains eq results
+        file_index (int): index of the TCM files
+        Mole (bool, optional): Defaults to True.
+
+    Returns:
+        dict: eq results sorted by T, in K and without the multi-phase (',') columns
+    """
+    Result = {key: val for key, val in readEqFromFile(folder_Eq, file_index, Mole).items() if ',' not in key}
+    if Result == {}:
+        raise ValueError('no result')
+    Result['TK'] = [item + 273.15 for item in Result.pop('TC')]
+    return Result
+
+def getEqdata(path, readMole = True, executor = None, max_workers = None, window = None):
     """read eq results from exp files
     if readMole is True, then read mole fraction for phase, else read weight fraction for phase
 
+    The files are parsed in parallel by the executor and every point goes to the ResultStore as
+    soon as it is parsed, at most window points are in flight.
+
     Args:
         path (str): path to store the results
         readMole (bool, optional): _description_. Defaults to True.
+        executor (str or Executor, optional): executor that parses the files. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to None.
+        window (int, optional): max number of files in flight. Defaults to 64 per worker.
 
     Returns:
-        json: data_more.json that contains all eq results
+        dict: error of each file that failed, by index, the results are written to data_mole.json and the data_mole ResultStore
     """
     print('###################################################################')
     print('####################### Reading Eq Result #########################')
@@ -103,46 +120,19 @@ def getEqdata(path, readMole = True):
     settings = getSettings(path) #[TRange, numFile, comp1, comp2, comps, folder_Eq, folder_Scheil, composition_data, Compositions, comp, pressure, database]
     folder_Eq = settings[5]
     numFile = settings[1]
-    failList = []
-    data_original = {}
-    data = {}
-    for index in tqdm(range(numFile)):
-        # data_original[f'Point{index}'] = {}
-        # data[f'Point{index}'] = {}
-        try:
-            Result_original = readEqFromFile(folder_Eq,index, readMole)
-            Result = {}
-            for key in Result_original.keys():
-                if ',' not in key:
-                    Result[key] = Result_original[key]
-            if Result == {} or Result_original == {}:
-                print(f'\n error in {index}th file, no result!')
-                data_original[f'Point{index}'] = None
-                data[f'Point{index}'] = None
-                failList.append(index)
-            else:
-                data_original[f'Point{index}'] = {}
-                data[f'Point{index}'] = {}
-                for key in Result_original.keys():
-                    data_original[f'Point{index}'][key] = Result_original[key]
-                for key in Result.keys():
-                    data[f'Point{index}'][key] = Result[key]
-        except Exception as e:
-            print(f'\n fail to read {index}th file, {e}!')
-            data_original[f'Point{index}'] = None
-            data[f'Point{index}'] = None
-            failList.append(index)
-    data = transferTempToKelvin(data,numFile)
-    outputFile = json.dumps(data)
-    if readMole:
-        f = open(f'{folder_Eq}/Result/data_mole.json','w')
-    else:
-        f = open(f'{folder_Eq}/Result/data_wt.json','w')
-    f.write(outputFile)
-    f.close()
+    failures = {}
+    writer = ResultStoreWriter(f'{folder_Eq}/Result', numFile, 'data_mole' if readMole else 'data_wt')
+    tasks = [(folder_Eq, index, readMole) for index in range(numFile)]
+    for index, Result in tqdm(bounded_imap_unordered(get_executor(executor, max_workers, 1), readEqPoint, tasks, window), total=numFile):
+        if isinstance(Result, TaskFailure):
+            print(f'\n fail to read {index}th file, {Result.error}!')
+            failures[index] = Result.error
+            Result = None
+        writer.add(index, Result)
+    writer.close()
     print('####################### Reading Eq Result Done ####################')
-    print(f'{len(failList)} files failed. FailList:')
-    print(failList)
-    return None
+    print(f'{len(failures)} files failed. FailList:')
+    print(sorted(failures))
+    return failures
     # data = {'Point0':{'TC':[],'Phase1':[],'Phase2':[]},'Point1':{}......}
 
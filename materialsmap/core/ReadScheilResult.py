@@ -1,35 +1,31 @@
 import json
 from materialsmap.core.GenerateEqScript import getSettings
-from sklearn import neighbors
+from materialsmap.core.result_store import ResultStoreWriter
+from materialsmap.core.executor import get_executor, bounded_imap_unordered, TaskFailure
 import numpy as np
 from tqdm import tqdm
 import pandas as pd
 
-def getPhaseNamesInSequence(fileName,liquidPhase):
-    """rearrange the scheil results based on phase names
+def interpolateCurve(T, temp, values):
+    """linear interpolation of a curve at the temperatures T, constant beyond the ends of the curve
 
     Args:
-        fileName (str): name of files that contains the scheil results
-        liquidPhase (str): name of liquid phase
+        T (list): temperatures to evaluate
+        temp (list): temperatures of the curve, in any order
+        values (list): values of the curve
 
     Returns:
-        list: list of scheil phase name
+        ndarray: values at T
     """
-    PhaseNames = []
-    f = open(fileName,'r')
-    lines = f.readlines()
-    for i in range(len(lines)):
-        words = lines[i].split()
-        if words != [] and words[0] == '$E' and len(words) > 1:
-            phase = words[1:]
-            if liquidPhase not in phase[0] and phase[0] not in PhaseNames:
-                PhaseNames.append(phase[0])
-    f.close()
-    return PhaseNames
+    temp = np.asarray(temp, dtype=float)
+    order = np.argsort(temp, kind='stable')
+    return np.interp(np.asarray(T, dtype=float), temp[order], np.asarray(values, dtype=float)[order])
 
 def linkPhaseAndTemp(currentPhases, currentTemp):
     """create dicts that have both phase name and T
 
+    The curves of all phases are interpolated on the temperatures of the last phase.
+
     Args:
         currentPhases (dict)): dict of all realted phases and fraction
         currentTemp (dict): dict of temperature
@@ -37,20 +33,60 @@ def linkPhaseAndTemp(currentPhases, currentTemp):
     Returns:
         dict: dicts of all realted phases, fraction and temperature
     """
-    Models = []
-    n_neighbors = 2
-    weights = 'distance'
-    phases = [item for item in currentPhases.keys()]
-    for phase in phases:
-        input = np.array(currentTemp[phase]).reshape(-1, 1)
-        output = currentPhases[phase]
-        Models.append(neighbors.KNeighborsRegressor(n_neighbors, weights=weights).fit(input, output))
+    phases = [phase for phase in currentPhases.keys() if currentTemp[phase] != []]
     result = dict()
-    result['TC'] = currentTemp[phase]
+    result['TC'] = currentTemp[phases[-1]]
     for phase in phases:
-        result[phase] = Models[phases.index(phase)].predict(np.array(result['TC']).reshape(-1, 1)).tolist()
+        result[phase] = interpolateCurve(result['TC'], currentTemp[phase], currentPhases[phase]).tolist()
     return result
 
+def readScheilSolidFile(fileName, liquidPhase):
+    """read the solid phase fractions of a scheil exp file in one pass
+
+    The n-th curve of a block belongs to the n-th solid phase of the $E lines of the file, the
+    curves are kept by number and assigned to the phases at the end of the file.
+
+    Args:
+        fileName (str): name of files that contains the scheil results
+        liquidPhase (str): name of liquid phase
+
+    Returns:
+        set: dict of the fractions and dict of the temperatures of each phase
+    """
+    phaseNames = []
+    curves = []
+    startBlock = False
+    startRead = False
+    with open(fileName, 'r') as data:
+        for line in data:
+            words = line.split()
+            if words == []:
+                continue
+            if words[0] == '$E' and len(words) > 1:
+                if liquidPhase not in words[1] and words[1] not in phaseNames:
+                    phaseNames.append(words[1])
+                continue
+            if words[:2] == ['$', 'BLOCK']:
+                startBlock = True
+                phaseCount = 0
+            if startBlock and words[-1] == 'M':
+                startRead = True
+            if startRead and (words == ['CLIP', 'OFF'] or words[:2] == ['$', 'Y-AXIS:']):
+                startRead = False
+                phaseCount += 1
+            if startRead and startBlock and words[0] == 'BLOCKEND':
+                startRead = False
+                startBlock = False
+            if startRead:
+                curves.append((phaseCount, float(words[0]), float(words[1])))
+    currentPhases = {phase: [] for phase in phaseNames}
+    currentTemp = {phase: [] for phase in phaseNames}
+    for phaseCount, temp, value in curves:
+        phase = phaseNames[phaseCount]
+        currentTemp[phase].append(temp)
+        currentPhases[phase].append(value)
+    return currentPhases, currentTemp
+
 def getAllPhases(ScheilResult):
     """read scheil results from exp files
 
@@ -70,69 +106,51 @@ def getAllPhases(ScheilResult):
     phases = set(phases)
     return phases
 
-def getFinalScheilResult(ScheilResult,folder_Scheil,numFile):
-    """get scheil results from exp
+def getFinalScheilRow(phaseAmount):
+    """phase fractions at the end of the scheil simulation of one point
 
     Args:
-        ScheilResult (dict): dict of scheil results
-        folder_Scheil (str): path to open/store the results
-        numFile (int): number of files in the scheil folder
+        phaseAmount (dict): scheil result of the point
 
     Returns:
-        xlsx: an excel sheet that contains the scheil results
+        set: dict of the final fraction of each phase and True if a phase could not be read
     """
-    print('####################################################################')
-    print('Getting final Scheil result...')
-    phaseNames = getAllPhases(ScheilResult)
+    failed = False
+    finalRow = dict()
+    for phase in phaseAmount.keys():
+        if phase != 'TC':
+            finalRow[phase] = phaseAmount[phase][-1] if phaseAmount[phase] != [] else 0
+    # sometimes the Scheil result will end up with a sum of 1.0000000000000002
+    # in this case, we will use the second last value
+    if sum(finalRow.values()) > 1:
+        for phase in finalRow.keys():
+            try:
+                finalRow[phase] = phaseAmount[phase][-2] if phaseAmount[phase] != [] else 0
+            except Exception as e:
+                print(phase, e)
+                failed = True
+    return finalRow, failed
+
+def writeFinalScheilResult(finalRows, folder_Scheil, writeExcel = False):
+    """write the final phase fractions of all points to ScheilResults.csv
+
+    Args:
+        finalRows (list): dict of getFinalScheilRow of each point, None for points without result
+        folder_Scheil (str): path to store the results
+        writeExcel (bool, optional): also export ScheilResults.xlsx. Defaults to False.
+    """
+    phaseNames = []
+    for finalRow in finalRows:
+        if finalRow != None:
+            phaseNames += [phase for phase in finalRow.keys() if phase not in phaseNames]
     finalPhases = dict()
-    finalPhases['Point'] = []
+    finalPhases['Point'] = list(range(len(finalRows)))
     for phase in phaseNames:
-        finalPhases[phase] = []
-    list = []
-    for index in tqdm(range(numFile)):
-        phaseAmount = ScheilResult[f'Point{index}']
-        if phaseAmount != None:
-            finalPhases['Point'].append(index)
-            for phase in phaseNames:
-                if phase in phaseAmount.keys():
-                    try:
-                        if phaseAmount[phase] != []:
-                            finalPhases[phase].append(phaseAmount[phase][-1])
-                        else:
-                            finalPhases[phase].append(0)
-                    except Exception as e:
-                        print(f'error in reading {phase} in Point {index}', e)
-                        list.append(index)
-                else:
-                    finalPhases[phase].append(0)
-            sum = 0 
-            for phase in phaseNames:
-                sum += finalPhases[phase][-1]
-            # sometimes the Scheil result will end up with a sum of 1.0000000000000002
-            # in this case, we will use the second last value
-            if sum > 1:
-                for phase in phaseNames:
-                    if phase in phaseAmount.keys():
-                        try:
-                            if phaseAmount[phase] != []:
-                                finalPhases[phase][-1] = phaseAmount[phase][-2]
-                            else:
-                                finalPhases[phase][-1] = 0
-                        except Exception as e:
-                            print(index, e)
-                            list.append(index)
-                    else:
-                        finalPhases[phase][-1] = 0
-        else:
-            finalPhases['Point'].append(index)
-            for phase in phaseNames:
-                finalPhases[phase].append('')
-    # print('FailList:',list)
-    # print(f'{len(list)} points failed to read')
+        finalPhases[phase] = [('' if finalRow == None else finalRow.get(phase, 0)) for finalRow in finalRows]
     result = pd.DataFrame(finalPhases)
-    result.to_excel(f'{folder_Scheil}/Result/ScheilResults.xlsx')
-    print('##########################end reading Scheil#############################')
-    return list
+    result.to_csv(f'{folder_Scheil}/Result/ScheilResults.csv')
+    if writeExcel:
+        result.to_excel(f'{folder_Scheil}/Result/ScheilResults.xlsx')
 
 def readLiqAndSolT(folder_Scheil, numFile):
     """read the liquidius and solidius temperature from exp files
@@ -152,39 +170,44 @@ def readLiqAndSolT(folder_Scheil, numFile):
     x = []
     index_fail = []
     for index in range(numFile):
-        temp = []
-        liquid = []
         fileName = f'{folder_Scheil}/{index}_liquid_mol%.exp'
         try:
-            data = open(fileName,'r')
-        except:
+            result[f'Point{index}'] = readLiquidFile(fileName)
+        except OSError:
             result[f'Point{index}'] = None
             index_fail.append(index)
             print(f'cannot find {index}th file')
             continue
-        lines = data.readlines()
-        startRead = False
-        for i in range(len(lines)):
-            content = lines[i]
+        if result[f'Point{index}'] == None:
+            print(f'No result in {index}th simulation')
+            index_fail.append(index)
+    return result, index_fail
+
+def readLiquidFile(fileName):
+    """read the liquid fraction curve of a scheil exp file
+
+    Args:
+        fileName (str): name of the {index}_liquid_mol%.exp file
+
+    Returns:
+        dict: temperature (TC) and liquid fraction, None if the file has no result
+    """
+    temp = []
+    liquid = []
+    startRead = False
+    with open(fileName,'r') as data:
+        for content in data:
             words = content.split()
-            if i < len(lines) - 1:
-                nextContent = lines[i + 1]
-                # print(words[-1],',', nextContent,'\n')
             if words!= [] and words[-1] == 'M':
                 startRead = True
             if words == ['BLOCKEND'] or words == ['CLIP', 'OFF'] or words[:2] == ['$', 'Y-AXIS:'] and startRead:
                 startRead = False
             if startRead:
                 temp.append(float(words[0]))
-                liquid.append(float(words[1]))  
-        if liquid != [] and temp != []: 
-            result[f'Point{index}'] = dict() 
-            result[f'Point{index}']['TC'] = temp
-            result[f'Point{index}']['LIQUID'] = liquid
-        else:
-            print(f'No result in {index}th simulation')
-            index_fail.append(index)
-    return result, index_fail
+                liquid.append(float(words[1]))
+    if liquid == [] or temp == []:
+        return None
+    return {'TC': temp, 'LIQUID': liquid}
 
 def combineLiqAndSolT(ScheilLiquidResult, ScheilResult, numFile):
     """combined scheil liquid phase fraction and liquidius and solidius temperature
@@ -199,22 +222,25 @@ def combineLiqAndSolT(ScheilLiquidResult, ScheilResult, numFile):
     """
     finalResult = dict()
     for index in range(numFile):
-        solid = ScheilResult[f'Point{index}']
-        liquid = ScheilLiquidResult[f'Point{index}']
-        if solid == None and liquid == None:
-            finalResult[f'Point{index}'] = None
-        if solid == None and liquid != None:
-            finalResult[f'Point{index}'] = liquid
-        if solid != None and liquid == None:
-            finalResult[f'Point{index}'] = solid
-        if solid != None and liquid != None:
-            finalResult[f'Point{index}'] = solid
-            input = np.array(liquid['TC']).reshape(-1, 1)
-            output = liquid['LIQUID']
-            model = neighbors.KNeighborsRegressor(2, weights='distance').fit(input, output)
-            finalResult[f'Point{index}']['LIQUID'] = model.predict(np.array(solid['TC']).reshape(-1, 1)).tolist()
+        finalResult[f'Point{index}'] = combineLiqAndSolPoint(ScheilLiquidResult.get(f'Point{index}'), ScheilResult[f'Point{index}'])
     return finalResult
 
+def combineLiqAndSolPoint(liquid, solid):
+    """combined scheil liquid phase fraction and solid phase fractions of one point
+
+    Args:
+        liquid (dict): liquid fraction from readLiquidFile or None
+        solid (dict): solid phase fractions from linkPhaseAndTemp or None, the liquid fraction is added to it
+
+    Returns:
+        dict: combined result on the temperatures of the solid phases, None if both are None
+    """
+    if solid == None:
+        return liquid
+    if liquid != None:
+        solid['LIQUID'] = interpolateCurve(solid['TC'], liquid['TC'], liquid['LIQUID']).tolist()
+    return solid
+
 def transferTempToKelvin(data,numFile):
     for index in range(numFile):
         if data[f'Point{index}'] != None:
@@ -222,15 +248,62 @@ def transferTempToKelvin(data,numFile):
             del data[f'Point{index}']['TC']
     return data
 
-def getScheilSolidPhase(path, liquidPhase = 'LIQUID'):
+def readScheilPoint(folder_Scheil, index, liquidPhase = 'LIQUID'):
+    """read the solid and liquid exp files of one point for getScheilSolidPhase
+
+    Args:
+        folder_Scheil (str): path to the scheil results
+        index (int): index of the point
+        liquidPhase (str, optional): name of liquid phase. Defaults to 'LIQUID'.
+
+    Returns:
+        set: combined result in K (None without result), final solid phase fractions (None without solid result) and list of the errors of the files
+    """
+    errors = []
+    solid = None
+    finalRow = None
+    fileName = f'{folder_Scheil}/{index}_solid_mol%.exp'
+    try:
+        solid = linkPhaseAndTemp(*readScheilSolidFile(fileName, liquidPhase))
+    except OSError:
+        errors.append(f'{fileName} does not exist')
+    except Exception as e:
+        errors.append(f'fail to read {fileName}, {e}')
+    if solid != None:
+        finalRow, failed = getFinalScheilRow(solid)
+        if failed:
+            errors.append(f'error in reading the final phases of {fileName}')
+    fileName = f'{folder_Scheil}/{index}_liquid_mol%.exp'
+    liquid = None
+    try:
+        liquid = readLiquidFile(fileName)
+        if liquid == None:
+            errors.append(f'no result in {fileName}')
+    except OSError:
+        errors.append(f'{fileName} does not exist')
+    except Exception as e:
+        errors.append(f'fail to read {fileName}, {e}')
+    point = combineLiqAndSolPoint(liquid, solid)
+    if point != None:
+        point['TK'] = [item + 273.15 for item in point.pop('TC')]
+    return point, finalRow, errors
+
+def getScheilSolidPhase(path, liquidPhase = 'LIQUID', writeExcel = False, executor = None, max_workers = None, window = None):
     """read scheil results from exp file
 
+    The files are parsed in parallel by the executor and every point goes to the ResultStore as
+    soon as it is parsed, at most window points are in flight.
+
     Args:
         path (str): path to store the results
         liquidPhase (str, optional): name of liquid phase. Defaults to 'LIQUID'.
+        writeExcel (bool, optional): also export ScheilResults.xlsx. Defaults to False.
+        executor (str or Executor, optional): executor that parses the files. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to None.
+        window (int, optional): max number of points in flight. Defaults to 64 per worker.
 
     Returns:
-        json: data_more.json that contains all scheil results
+        dict: errors of each point that failed, by index, the results are written to data_mole.json, the data_mole ResultStore and ScheilResults.csv
     """
     print('#####################################################')
     print('#############start reading Scheil Result#############')
@@ -239,74 +312,21 @@ def getScheilSolidPhase(path, liquidPhase = 'LIQUID'):
     folder_Scheil = settings[6]
     numFile = settings[1]
     #####################read data###########################
-    ScheilResult = dict()
-    index_noFile = []
-    index_failRead = []
-    for index in tqdm(range(numFile)):
-        ########################################################################
-        ###########################read solid phase#############################
-        fileName = f'{folder_Scheil}/{index}_solid_mol%.exp'
-        try:
-            phaseNames = getPhaseNamesInSequence(fileName, liquidPhase)
-            data = open(fileName,'r')
-        except:
-            print(f'\n {fileName} does not exist, skip')
-            index_noFile.append(index)
-            ScheilResult[f'Point{index}'] = None
-            continue
-        try:
-            currentPhases = dict()
-            currentTemp = dict()
-            for phase in phaseNames:
-                currentPhases[phase] = []
-                currentTemp[phase] = []
-            startBlock = False
-            startRead = False
-            BlockNum = 0
-            lines = data.readlines()
-            for i in range(len(lines)):
-                words = lines[i].split()
-                if words != [] and words[:2] == ['$','BLOCK']:
-                    BlockNum += 1
-                    startBlock = True
-                    phaseCount = 0
-                if startBlock and words != [] and words[-1] == 'M':
-                    startRead = True
-                if startRead and words != [] and words == ['CLIP', 'OFF']:
-                    startRead = False
-                    phaseCount += 1
-                if startRead and words != [] and words[:2] == ['$', 'Y-AXIS:']:
-                    startRead = False
-                    phaseCount += 1            
-                if startRead and startBlock and words != [] and words[0] == 'BLOCKEND':
-                    startRead = False
-                    startBlock = False
-                if startRead:
-                    phase = phaseNames[phaseCount]
-                    currentTemp[phase].append(float(words[0]))
-                    currentPhases[phase].append(float(words[1]))
-            #######################uniform temperatures for each phase##########
-            ScheilResult[f'Point{index}'] = linkPhaseAndTemp(currentPhases, currentTemp)
-            ####################################################################
-        except Exception as e:
-            print(f'fail to read {fileName}, skip',e)
-            index_failRead.append(index)
-            ScheilResult[f'Point{index}'] = None
-            continue
-    # print('Failed Index List: ',index_failRead, len(index_failRead))
-    ############################################################################
-    ########################end of reading solid phase##########################
-    ############################################################################
-    #################read the final Scheil phase result#########################
-    failList2 = getFinalScheilResult(ScheilResult,folder_Scheil, numFile)
-    ScheilLiquidResult, failList3 = readLiqAndSolT(folder_Scheil, numFile)
-    finalScheilResult = combineLiqAndSolT(ScheilLiquidResult, ScheilResult, numFile)
-    finalScheilResult = transferTempToKelvin(finalScheilResult,numFile)
-    outputFile = json.dumps(finalScheilResult)
-    f = open(f'{folder_Scheil}/Result/data_mole.json','w')
-    f.write(outputFile)
-    f.close()
-    totalfailList = list(set(index_noFile + index_failRead + failList2 + failList3))
-    print(f'Failed Index List: {totalfailList}')
-    print(f'{len(totalfailList)} Files Failed to Read')
-    return None
+    failures = dict()
+    finalRows = [None] * numFile
+    writer = ResultStoreWriter(f'{folder_Scheil}/Result', numFile)
+    tasks = [(folder_Scheil, index, liquidPhase) for index in range(numFile)]
+    for index, result in tqdm(bounded_imap_unordered(get_executor(executor, max_workers, 1), readScheilPoint, tasks, window), total=numFile):
+        if isinstance(result, TaskFailure):
+            result = (None, None, [result.error])
+        point, finalRows[index], errors = result
+        if errors != []:
+            print(f'\n Point {index}: ' + '; '.join(errors))
+            failures[index] = errors
+        writer.add(index, point)
+    writer.close()
+    #################write the final Scheil phase result########################
+    writeFinalScheilResult(finalRows, folder_Scheil, writeExcel)
+    print(f'Failed Index List: {sorted(failures)}')
+    print(f'{len(failures)} Files Failed to Read')
+    return failures
@@ -0,0 +1,207 @@
+import os
+import numpy as np
+from materialsmap.core.compositions import createComposition
+from materialsmap.core.project import saveSettings
+from materialsmap.core.pycalphad_run import pycalphad_eq, pycalphad_scheil
+
+def coarseCells(ngridpts, maxLevel):
+    """triangles of the uniform grid with ngridpts divisions
+
+    The vertices are integer coordinates on the finest lattice (ngridpts*2**maxLevel divisions),
+    so the midpoints of the edges stay exact down to maxLevel.
+
+    Args:
+        ngridpts (int): number of divisions of the coarse grid
+        maxLevel (int): number of times a cell can be subdivided
+
+    Returns:
+        list: cells as ((i0, j0), (i1, j1), (i2, j2), level)
+    """
+    scale = 2 ** maxLevel
+    cells = []
+    for a in range(ngridpts):
+        for b in range(ngridpts - a):
+            cells.append(((a * scale, b * scale), ((a + 1) * scale, b * scale), (a * scale, (b + 1) * scale), 0))
+            if a + b + 2 <= ngridpts:
+                cells.append((((a + 1) * scale, b * scale), (a * scale, (b + 1) * scale), ((a + 1) * scale, (b + 1) * scale), 0))
+    return cells
+
+def subdivideCell(cell):
+    """split a triangle into 4 triangles at the midpoints of its edges"""
+    p0, p1, p2, level = cell
+    m01 = ((p0[0] + p1[0]) // 2, (p0[1] + p1[1]) // 2)
+    m12 = ((p1[0] + p2[0]) // 2, (p1[1] + p2[1]) // 2)
+    m02 = ((p0[0] + p2[0]) // 2, (p0[1] + p2[1]) // 2)
+    return [(p0, m01, m02, level + 1), (m01, p1, m12, level + 1), (m02, m12, p2, level + 1), (m01, m12, m02, level + 1)]
+
+def findBoundaryCells(cells, pointIndex, classes, solidusT, solidusTolerance = 50):
+    """cells whose vertices disagree on feasibility or differ strongly in solidus temperature
+
+    Args:
+        cells (list): cells from coarseCells/subdivideCell
+        pointIndex (dict): lattice coordinate to index of the point in classes/solidusT
+        classes (ndarray): (points,) feasibility class of each point
+        solidusT (ndarray): (points,) scheil solidus temperature of each point, nan without result
+        solidusTolerance (float, optional): max solidus difference (K) in a cell. Defaults to 50.
+
+    Returns:
+        list: bool for each cell, True if the cell should be refined
+    """
+    flags = []
+    for cell in cells:
+        index = [pointIndex[p] for p in cell[:3]]
+        T = solidusT[index]
+        T = T[~np.isnan(T)]
+        disagree = len(set(classes[index].tolist())) > 1
+        flags.append(disagree or (len(T) > 1 and T.max() - T.min() > solidusTolerance))
+    return flags
+
+def _midpoint(a, b):
+    """lattice midpoint of the edge (a, b), None if it is not on the lattice"""
+    if (a[0] + b[0]) % 2 or (a[1] + b[1]) % 2:
+        return None
+    return ((a[0] + b[0]) // 2, (a[1] + b[1]) // 2)
+
+def hangingEdges(cell, points):
+    """edges of a cell that have a point of a finer neighbour at their midpoint
+
+    Args:
+        cell (set): cell from coarseCells/subdivideCell
+        points (set): lattice coordinates of the vertices of all cells
+
+    Returns:
+        list: (a, b, opposite vertex, midpoint, True if the neighbour is more than one level finer) of each hanging edge
+    """
+    p0, p1, p2 = cell[:3]
+    hanging = []
+    for a, b, c in [(p0, p1, p2), (p1, p2, p0), (p2, p0, p1)]:
+        m = _midpoint(a, b)
+        if m is not None and m in points:
+            deep = any(q is not None and q in points for q in [_midpoint(a, m), _midpoint(m, b)])
+            hanging.append((a, b, c, m, deep))
+    return hanging
+
+def balanceCells(cells):
+    """subdivide the neighbours of refined cells until every cell has at most one hanging edge, one level finer
+
+    This is the red closure of red-green refinement: a cell with two or three hanging edges, or a
+    neighbour more than one level finer, is split in 4 and the check is repeated. The remaining
+    hanging edges are closed by conformingTriangles without new points.
+
+    Args:
+        cells (list): cells from coarseCells/subdivideCell
+
+    Returns:
+        list: balanced cells
+    """
+    while True:
+        points = set(p for cell in cells for p in cell[:3])
+        balanced = []
+        changed = False
+        for cell in cells:
+            hanging = hangingEdges(cell, points)
+            if len(hanging) > 1 or any(edge[4] for edge in hanging):
+                balanced.extend(subdivideCell(cell))
+                changed = True
+            else:
+                balanced.append(cell)
+        cells = balanced
+        if not changed:
+            return cells
+
+def conformingTriangles(cells):
+    """triangles of the balanced cells without hanging nodes, the green closure of red-green refinement
+
+    A cell with one hanging edge is split in 2 at the midpoint of that edge, so the triangles share
+    full edges and can be used as the triangulation of the map (e.g. matplotlib Triangulation).
+
+    Args:
+        cells (list): cells from balanceCells
+
+    Returns:
+        list: triangles as 3 lattice coordinates
+    """
+    points = set(p for cell in cells for p in cell[:3])
+    triangles = []
+    for cell in cells:
+        hanging = hangingEdges(cell, points)
+        if len(hanging) == 0:
+            triangles.append(tuple(cell[:3]))
+        else:
+            a, b, c, m, deep = hanging[0]
+            triangles.extend([(a, m, c), (m, b, c)])
+    return triangles
+
+def runPycalphad(path, intial_temperature, executor = None, max_workers = None):
+    """pycalphad eq and scheil of the composition table of path, the points of the checkpoints are not calculated again
+
+    Args:
+        path (str): path of the settings and results
+        intial_temperature (float): the temperature to start scheil if not eq results
+        executor (str or Executor, optional): executor of pycalphad_eq/pycalphad_scheil. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to None.
+    """
+    eq_results = pycalphad_eq(path, resume = True, executor = executor, max_workers = max_workers)
+    pycalphad_scheil(path, intial_temperature, resume = True, executor = executor, max_workers = max_workers, eq_results = eq_results)
+
+def adaptiveCompositions(path, comps, indep_comps, materials_update, TemperatureRange, database, intial_temperature, classify, pressure = 101325, eleAmountType = 'massFraction',
+                         ngridpts = 5, maxLevel = 3, solidusTolerance = 50, executor = None, max_workers = None, calculate = runPycalphad):
+    """run pycalphad eq/scheil on a coarse grid and refine only the cells on the feasibility boundaries
+
+    The grid starts with ngridpts divisions. At each level, the cells whose vertices disagree on
+    feasibility or whose scheil solidus differ by more than solidusTolerance are split in 4, until the
+    spacing of the finest lattice, 1/(ngridpts*2**maxLevel), is reached. Their neighbours are
+    balanced with balanceCells. The points of each level are appended to the composition table and
+    settings.json is updated, the previous points are read from the checkpoints so only the new
+    points are calculated.
+
+    Args:
+        path (str): path to store the settings and results
+        comps (list): List of all components
+        indep_comps (list): List of the two independent components
+        materials_update (dict): Dicts that contains the compositions of each compotents
+        TemperatureRange (set): (lower limit, upper limit, temperature step)
+        database (str): path to the TDB file
+        intial_temperature (float): the temperature to start scheil if not eq results
+        classify (function): classify(path, compositions_list) returns the (points,) feasibility classes and (points,) scheil solidus T (nan without result), e.g. classifyForRefinement of plot.FeasibilityMap
+        pressure (float, optional): Defaults to 101325.
+        eleAmountType (str, optional): Defaults to 'massFraction'.
+        ngridpts (int, optional): divisions of the coarse grid. Defaults to 5.
+        maxLevel (int, optional): max number of refinements, the default gives the spacing of a 41-point grid. Defaults to 3.
+        solidusTolerance (float, optional): max solidus difference (K) in a cell. Defaults to 50.
+        executor (str or Executor, optional): executor of pycalphad_eq/pycalphad_scheil. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to None.
+        calculate (function, optional): calculate(path, intial_temperature, executor, max_workers) runs the points of the composition table. Defaults to runPycalphad.
+
+    Returns:
+        set: compositions_list of all calculated points, their feasibility classes and the conforming triangles as indices of compositions_list
+    """
+    resolution = ngridpts * 2 ** maxLevel
+    cells = coarseCells(ngridpts, maxLevel)
+    points = []
+    pointIndex = {}
+    level = 0
+    while True:
+        for cell in cells:
+            for p in cell[:3]:
+                if p not in pointIndex:
+                    pointIndex[p] = len(points)
+                    points.append(p)
+        print(f'Level {level}: {len(points)} points')
+        compositions_list = [{indep_comps[0]: i / resolution, indep_comps[1]: j / resolution} for i, j in points]
+        Compositions, numPoint, comp, numSimultion = createComposition(indep_comps, comps, compositions_list, materials_update, path)
+        settings = [TemperatureRange, numPoint, numSimultion, comp, comps, indep_comps, os.path.abspath(database), pressure, eleAmountType]
+        saveSettings(path, settings)
+        calculate(path, intial_temperature, executor, max_workers)
+        classes, solidusT = classify(path, compositions_list)
+        classes = np.asarray(classes)
+        solidusT = np.asarray(solidusT, dtype=float)
+        flags = findBoundaryCells(cells, pointIndex, classes, solidusT, solidusTolerance)
+        refine = [flag and cell[3] < maxLevel for cell, flag in zip(cells, flags)]
+        if not any(refine):
+            break
+        cells = [child for cell, flag in zip(cells, refine) for child in (subdivideCell(cell) if flag else [cell])]
+        cells = balanceCells(cells)
+        level += 1
+    triangles = [[pointIndex[p] for p in triangle] for triangle in conformingTriangles(cells)]
+    return compositions_list, classes, triangles
@@ -0,0 +1,51 @@
+import json
+import os
+
+class Checkpoint:
+    """append-only JSONL file of finished points, written in completion order
+
+    Each line is {"Point": index, "key": key, "result": result}. The key is the
+    point_key of the point, so lines written with other settings are ignored on resume.
+
+    Args:
+        filename (str): path to the checkpoint file
+        keys (list): point_key of every point
+        resume (bool, optional): keep the points already in the file. Defaults to False.
+    """
+
+    def __init__(self, filename, keys, resume=False):
+        self.filename = filename
+        self.keys = keys
+        self.results = {}
+        if resume and os.path.exists(filename):
+            self.results = self._read()
+            # rewrite the valid lines only, a crash may leave a half written last line,
+            # into a new file that replaces the old one only once it is complete
+            with open(filename + '.tmp', 'w') as f:
+                for num, result in self.results.items():
+                    f.write(json.dumps({'Point': num, 'key': self.keys[num], 'result': result}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(filename + '.tmp', filename)
+        self.f = open(filename, 'a' if resume else 'w')
+
+    def _read(self):
+        results = {}
+        with open(self.filename, 'r') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                num = item.get('Point')
+                if isinstance(num, int) and num < len(self.keys) and item.get('key') == self.keys[num]:
+                    results[num] = item['result']
+        return results
+
+    def write(self, num, result):
+        """append the result of one point and flush it to disk"""
+        self.f.write(json.dumps({'Point': num, 'key': self.keys[num], 'result': result}) + '\n')
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
@@ -1,3 +1,5 @@
+import itertools
+import math
 import os
 import time
 
@@ -7,24 +9,72 @@ import numpy as np
 import pandas as pd
 from multiprocessing import Pool
 from tqdm import tqdm
-from materialsmap.ref_data import relatedEle
+from pycalphad import variables as v
+from materialsmap.ref_data import relatedEle, eleweight
+from materialsmap.core.project import saveCompositions
+
+def simplexLatticeSize(numIndep, ngridpts):
+    """number of points of the simplex lattice, C(ngridpts+numIndep, numIndep)"""
+    return math.comb(ngridpts + numIndep, numIndep)
+
+def simplexLattice(numIndep, ngridpts, chunkSize = 100000):
+    """Generate the simplex lattice of numIndep independent components in chunks
+
+    The points are integer partitions: non-negative integer rows with a sum <= ngridpts, so the
+    fractions row/ngridpts never drop or duplicate an edge point. The rows are in lexicographic
+    order (first component in the outer loop) and only one chunk is in memory at a time.
+
+    Args:
+        numIndep (int): number of independent components
+        ngridpts (int): Int of the grids
+        chunkSize (int, optional): max number of rows in each chunk. Defaults to 100000.
+
+    Yields:
+        ndarray: (rows, numIndep) integer lattice coordinates
+    """
+    if numIndep == 1:
+        for start in range(0, ngridpts + 1, chunkSize):
+            yield np.arange(start, min(start + chunkSize, ngridpts + 1)).reshape(-1, 1)
+        return
+    chunk = []
+    numRows = 0
+    for prefix in itertools.product(range(ngridpts + 1), repeat = numIndep - 2):
+        remaining = ngridpts - sum(prefix)
+        if remaining < 0:
+            continue
+        # all the (a, b) pairs with a + b <= remaining for the last two components
+        counts = np.arange(remaining + 1, 0, -1)
+        a = np.repeat(np.arange(remaining + 1), counts)
+        b = np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+        block = np.stack([a, b], axis=1)
+        rows = np.empty((len(block), numIndep), dtype=np.int64)
+        rows[:, :numIndep - 2] = prefix
+        rows[:, numIndep - 2:] = block
+        chunk.append(rows)
+        numRows += len(rows)
+        while numRows >= chunkSize:
+            rows = np.concatenate(chunk)
+            yield rows[:chunkSize]
+            chunk = [rows[chunkSize:]]
+            numRows = len(chunk[0])
+    if numRows > 0:
+        yield np.concatenate(chunk)
 
 def generateCompositions(indep_comps,ngridpts):
     """Generate composition list based on the independetn components and grid density
 
     Args:
-        indep_comps (list): List of independet components 
+        indep_comps (list): List of independet components, any number of them
         ngridpts (int): Int of the grids
 
     Returns:
         list: List combinations of independent components
     """
-    axisList = [item for item in np.arange(0,1+1/ngridpts, 1/ngridpts)]
     comps = []
-    for x in axisList:
-        for y in axisList:
-            if x+y <= 1:
-                comps.append({indep_comps[0]:x, indep_comps[1]:y})
+    for lattice in simplexLattice(len(indep_comps), ngridpts):
+        fractions = (lattice / ngridpts).tolist()
+        for row in fractions:
+            comps.append(dict(zip(indep_comps, row)))
     return comps
 
 def getCompostion(indep_comps,alloyCompostion,comps,materials_update): # get element composition from alloy composition
@@ -64,15 +114,111 @@ def getCompostion(indep_comps,alloyCompostion,comps,materials_update): # get ele
             composition[item.upper()] = Composition[item]
     return composition
 
-def createComposition(indep_comps,comps,compositions_list,materials_update,path): #create compositions
+def getAlloyMatrix(comps, materials_update):
+    """element fractions of the terminal alloys, only for the elements present in the alloys
+
+    Args:
+        comps (list): List of all components
+        materials_update (dict): Dicts that contains the compositions of each compotents
+
+    Returns:
+        set: comp (list of the related elements, upper case) and the (alloys, elements) matrix
+    """
+    elements = []
+    for item in comps:
+        for item_ele in materials_update[item].keys():
+            if item_ele not in elements:
+                elements.append(item_ele)
+    alloyMatrix = np.zeros((len(comps), len(elements)))
+    for item_index, item in enumerate(comps):
+        for ele_index, ele in enumerate(elements):
+            if ele in relatedEle and ele in materials_update[item].keys():
+                alloyMatrix[item_index, ele_index] = materials_update[item][ele]
+    return [ele.upper() for ele in elements], alloyMatrix
+
+def massToMoleFractions(massFractions, elements):
+    """convert mass fractions to mole fractions with eleweight, for all the points at once
+
+    Args:
+        massFractions (ndarray): (points, elements) mass fractions, each row sums to 1
+        elements (list): element names (upper case) of the columns
+
+    Returns:
+        ndarray: (points, elements) mole fractions
+    """
+    weights = np.array([eleweight[ele.upper()] for ele in elements])
+    moles = np.asarray(massFractions, dtype=float) / weights
+    total = moles.sum(axis = 1, keepdims = True)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        return np.where(total > 0, moles / total, 0.0)
+
+def getMoleFractionTable(df, elements, tolerance = 1E-5):
+    """mole fractions of every point of a composition table at once
+
+    The dependent element of a point is its first element (in the order of elements) with a
+    positive mass fraction. The other elements below tolerance are dropped and their mass goes
+    to the dependent element, as in v.get_mole_fractions with the remaining mass fractions.
+
+    Args:
+        df (DataFrame): composition table, mass fractions in the element columns
+        elements (list): element columns (upper case) in the order of the related elements
+        tolerance (float, optional): min mass fraction of an independent element. Defaults to 1E-5.
+
+    Returns:
+        set: X (points, elements) mole fractions, present (points, elements) mask of the components of each point, dependent (points,) index of the dependent element
+    """
+    W = df[list(elements)].to_numpy(dtype = float)
+    dependent = np.argmax(W > 0, axis = 1)
+    isDependent = np.zeros(W.shape, dtype = bool)
+    isDependent[np.arange(len(W)), dependent] = True
+    present = ~isDependent & (W >= tolerance)
+    mass = np.where(present, W, 0)
+    mass[np.arange(len(W)), dependent] = 1 - mass.sum(axis = 1)
+    X = massToMoleFractions(mass, elements)
+    present |= isDependent
+    return X, present, dependent
+
+def getPointCompositions(df, elements, tolerance = 1E-5, pureFallback = True):
+    """v.X conditions and components of every point of a composition table, the input of the pycalphad drivers
+
+    Args:
+        df (DataFrame): composition table, mass fractions in the element columns
+        elements (list): element columns (upper case) in the order of the related elements
+        tolerance (float, optional): min mass fraction of an independent element. Defaults to 1E-5.
+        pureFallback (bool, optional): give pure points a second component at X=tolerance so pycalphad has one independent composition. Defaults to True.
+
+    Returns:
+        set: compositions_list (list of {v.X: mole fraction} without the dependent element) and all_comp_tot (list of components of each point, dependent element first)
+    """
+    X, present, dependent = getMoleFractionTable(df, elements, tolerance)
+    independent = present.copy()
+    independent[np.arange(len(X)), dependent] = False
+    # first dropped element of each point, the second component of pure points
+    absent = ~present
+    fallback = np.argmax(absent, axis = 1)
+    compositions_list = []
+    all_comp_tot = []
+    for n in range(len(X)):
+        columns = np.flatnonzero(independent[n])
+        composition = {v.X(elements[j]): float(X[n, j]) for j in columns}
+        all_comp = [elements[dependent[n]]] + [elements[j] for j in columns]
+        if len(composition) == 0 and pureFallback and absent[n].any():
+            composition[v.X(elements[fallback[n]])] = tolerance
+            all_comp.append(elements[fallback[n]])
+        compositions_list.append(composition)
+        all_comp_tot.append(all_comp)
+    return compositions_list, all_comp_tot
+
+def createComposition(indep_comps,comps,compositions_list,materials_update,path,writeExcel = False): #create compositions
     """Create a compositions list of element based on the input of components
 
     Args:
         indep_comps (list): List of independet components 
         comps (list): List of all components 
-        compositions_list (list): List combinations of independent components
+        compositions_list (list): List combinations of independent components, or (points, independent components) array
         materials_update (dict): Dicts that contains the compositions of each compotents
         path (str): path to store the results
+        writeExcel (bool, optional): also export composition_for_feasibilityMap.xlsx. Defaults to False.
 
     Returns:
         set: 
@@ -81,32 +227,27 @@ def createComposition(indep_comps,comps,compositions_list,materials_update,path)
         comp(list): the related element
         newCompositions(int): the length of the generate composition list
     """
+    # fractions of all the terminal alloys, (points, alloys) in the order of comps
+    if isinstance(compositions_list, np.ndarray):
+        indep = np.asarray(compositions_list, dtype=float).reshape(-1, len(indep_comps))
+    else:
+        indep = np.array([[alloys[item] for item in indep_comps] for alloys in compositions_list], dtype=float).reshape(-1, len(indep_comps))
+    alloyFractions = np.zeros((len(indep), len(comps)))
+    for item_index, item in enumerate(comps):
+        if item in indep_comps:
+            alloyFractions[:, item_index] = indep[:, indep_comps.index(item)]
+        else:
+            alloyFractions[:, item_index] = 1 - indep.sum(axis = 1)
+    comp, alloyMatrix = getAlloyMatrix(comps, materials_update)
+    eleNum = len(comp)
+    # element fractions of every point in one product, (points, alloys) @ (alloys, elements)
+    elementFractions = alloyFractions @ alloyMatrix
     Compositions = dict()
-    index = 0
-    for num, alloys in enumerate(compositions_list): 
-        composition = getCompostion(indep_comps,alloys,comps,materials_update) #alloys updated to 3 alloys in this function
-        if index == 0: #initialize Compositions
-            comp = []
-            for item in comps:
-                for item_ele in materials_update[item].keys():
-                    comp.append(item_ele)
-            comp = set(comp)
-            comp = [item.upper() for item in comp]
-            eleNum = len(comp)
-            for item in comp:
-                Compositions[item] = []
-            for item in comps:
-                Compositions['alloy_'+item] = []
-            Compositions['Index'] = []
-        for key in alloys.keys():
-            Compositions['alloy_'+key].append(alloys[key])
-        for ele in comp:
-            if ele in composition.keys():
-                Compositions[ele].append(composition[ele])
-            else:
-                Compositions[ele].append(0)
-        Compositions['Index'].append(index)
-        index += 1
+    for ele_index, ele in enumerate(comp):
+        Compositions[ele] = elementFractions[:, ele_index].tolist()
+    for item_index, item in enumerate(comps):
+        Compositions['alloy_'+item] = alloyFractions[:, item_index].tolist()
+    Compositions['Index'] = list(range(len(alloyFractions)))
     newCompositions = pd.DataFrame(Compositions)
     print(f'Equilibrium simulation #: {len(newCompositions)}')
     numPoint =  len(newCompositions) 
@@ -116,5 +257,5 @@ def createComposition(indep_comps,comps,compositions_list,materials_update,path)
     if len(path) == 0:
         pass;
     else:
-        newCompositions.to_excel(f'{path}/composition_for_feasibilityMap.xlsx')
+        saveCompositions(path, Compositions, writeExcel)
     return Compositions, int(numPoint), comp, len(newCompositions)
\ No newline at end of file
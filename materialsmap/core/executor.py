@@ -0,0 +1,555 @@
+import itertools
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing import Pool
+from multiprocessing.connection import wait
+from multiprocessing.pool import ThreadPool
+import materialsmap.core.istarmap
+
+def _cgroup_cpus():
+    """CPU quota of the container (cgroup v2 cpu.max or v1 cfs quota), None if not limited"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return max(1, math.ceil(int(quota) / int(period)))
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return max(1, math.ceil(quota / period))
+    except (OSError, ValueError):
+        pass
+    return None
+
+def available_cpus():
+    """number of CPUs this process can use, the CPU affinity and the cgroup quota of the container
+
+    Returns:
+        int: number of usable CPUs, at least 1
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpus()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(1, cpus)
+
+def default_workers():
+    """default number of workers, one CPU is left to the main process when there are more than one"""
+    return max(1, available_cpus() - 1)
+
+def auto_chunksize(num_tasks, workers, factor=4):
+    """chunk size that gives every worker about factor chunks, same rule as Pool.map
+
+    Args:
+        num_tasks (int): number of tasks
+        workers (int): number of workers
+        factor (int, optional): number of chunks per worker. Defaults to 4.
+
+    Returns:
+        int: chunk size, at least 1
+    """
+    return max(1, math.ceil(num_tasks / (workers * factor)))
+
+# initializer already called in this worker process (serial/thread executors and distributed workers)
+_initialized = None
+
+def _files_stamp(initargs):
+    """size and mtime in ns of the initargs that are files, e.g. the TDB file of init_worker"""
+    stamp = []
+    for arg in initargs:
+        if isinstance(arg, (str, os.PathLike)) and os.path.isfile(arg):
+            stat = os.stat(arg)
+            stamp.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+def _initialize(initializer, initargs):
+    """call the initializer once per initargs, again when a file of initargs changed on disk"""
+    global _initialized
+    if initializer is None:
+        return
+    key = (initializer, initargs, _files_stamp(initargs))
+    if _initialized != key:
+        initializer(*initargs)
+        _initialized = key
+
+def _call_initialized(initializer, initargs, func, args):
+    _initialize(initializer, initargs)
+    return func(*args)
+
+def _call_indexed(task):
+    index, func, args = task
+    return index, func(*args)
+
+class _Gate:
+    """sliding window of tasks in flight, the task generator takes a slot and the consumer gives it back
+
+    Args:
+        window (int): max number of tasks in flight
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.slots = threading.Semaphore(window)
+        self.closed = False
+
+    def tasks(self, iterable):
+        for task in iterable:
+            self.slots.acquire()
+            if self.closed:
+                return
+            yield task
+
+    def release(self):
+        self.slots.release()
+
+    def close(self):
+        """stop the generator, a pool thread blocked on a slot is woken up"""
+        self.closed = True
+        # one at a time, Semaphore.release takes no count before Python 3.9
+        for _ in range(self.window):
+            self.slots.release()
+
+class TaskFailure:
+    """returned by call_guarded in place of the result of a task that raised or timed out
+
+    Args:
+        error (str): description of the error, kept as a string so it always pickles
+        timed_out (bool, optional): True if the task ran longer than its timeout. Defaults to False.
+    """
+
+    def __init__(self, error, timed_out=False):
+        self.error = error
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        return f'TaskFailure({self.error!r})'
+
+class TaskTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+def alarm_available():
+    """True if call_guarded can time out a task in this thread (SIGALRM, main thread of a POSIX process)"""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+def call_guarded(func, args, timeout=None):
+    """run func(*args) and return a TaskFailure instead of raising, so one bad task does not abort a whole map
+
+    The timeout uses SIGALRM inside the calling process, a call stuck in compiled code is only
+    interrupted when it returns to Python. Executor.imap_guarded of the process executor enforces
+    the timeout from the parent instead.
+
+    Args:
+        func (function): task
+        args (set): arguments of func
+        timeout (float, optional): max run time of the task in seconds, only where alarm_available(). Defaults to None (no limit).
+
+    Returns:
+        result of func or TaskFailure
+    """
+    use_alarm = timeout is not None
+    if use_alarm and not alarm_available():
+        raise ValueError('the timeout of call_guarded needs SIGALRM in the main thread, use the process executor for timeouts')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    except TaskTimeout:
+        return TaskFailure(f'timed out after {timeout} s', True)
+    except Exception as error:
+        return TaskFailure(f'{type(error).__name__}: {error}')
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+class Executor:
+    """run the tasks of the calculation drivers, subclasses set how the tasks are distributed
+
+    Args:
+        max_workers (int, optional): number of workers. Defaults to default_workers().
+        chunksize (int, optional): number of tasks sent to a worker at once. Defaults to auto_chunksize.
+    """
+
+    name = None
+
+    def __init__(self, max_workers=None, chunksize=None):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f'max_workers must be 1+, not {max_workers}')
+        self.max_workers = max_workers or default_workers()
+        self.chunksize = chunksize
+
+    def get_chunksize(self, num_tasks):
+        return self.chunksize or auto_chunksize(num_tasks, self.max_workers)
+
+    def starmap(self, func, iterable, initializer=None, initargs=()):
+        """run func(*args) for every args of iterable
+
+        Args:
+            func (function): task, must be importable for process based executors
+            iterable (list): list of argument tuples
+            initializer (function, optional): called once in every worker before its first task. Defaults to None.
+            initargs (set, optional): arguments of initializer. Defaults to ().
+
+        Yields:
+            results of func, in the order of iterable
+        """
+        raise NotImplementedError
+
+    def imap_unordered(self, func, iterable, initializer=None, initargs=()):
+        """run func(*args) for every args of iterable, the tasks are taken one by one from a shared queue by the idle workers
+
+        Submit the tasks longest first, so the short tasks fill the gaps at the end instead of a few long tasks straggling.
+
+        Args:
+            func (function): task, must be importable for process based executors
+            iterable (list): list of argument tuples, in the order they should be started
+            initializer (function, optional): called once in every worker before its first task. Defaults to None.
+            initargs (set, optional): arguments of initializer. Defaults to ().
+
+        Yields:
+            set: index of the args in iterable and result of func, in completion order
+        """
+        raise NotImplementedError
+
+    def imap_guarded(self, func, iterable, initializer=None, initargs=(), timeout=None, window=None):
+        """imap_unordered of call_guarded tasks, an exception or a timeout of a task gives a TaskFailure instead of aborting the map
+
+        Only the process executor can stop a running task, the other executors raise ValueError for a timeout.
+        The iterable is read lazily, a new task is taken only when fewer than window tasks are in flight.
+
+        Args:
+            func (function): task, must be importable for process based executors
+            iterable (list): list of argument tuples, in the order they should be started
+            initializer (function, optional): called once in every worker before its first task. Defaults to None.
+            initargs (set, optional): arguments of initializer. Defaults to ().
+            timeout (float, optional): max run time of a task in seconds. Defaults to None (no limit).
+            window (int, optional): max number of tasks in flight, including the results not yet consumed. Defaults to None (no limit).
+
+        Yields:
+            set: index of the args in iterable and result of func or TaskFailure, in completion order
+        """
+        if timeout is not None:
+            raise ValueError(f'the {self.name} executor cannot stop a running task, use the process executor for timeouts')
+        tasks = ((func, args) for args in iterable)
+        if window is None:
+            yield from self.imap_unordered(call_guarded, tasks, initializer, initargs)
+            return
+        gate = _Gate(window)
+        results = self.imap_unordered(call_guarded, gate.tasks(tasks), initializer, initargs)
+        try:
+            for result in results:
+                yield result
+                gate.release()
+        finally:
+            # wake the pool before it is closed, it would wait for a blocked task generator
+            gate.close()
+            results.close()
+
+class SerialExecutor(Executor):
+    """run the tasks one by one in the current process, for debugging and profiling"""
+
+    name = 'serial'
+
+    def __init__(self, max_workers=None, chunksize=None):
+        super().__init__(1, chunksize)
+
+    def starmap(self, func, iterable, initializer=None, initargs=()):
+        _initialize(initializer, initargs)
+        for args in iterable:
+            yield func(*args)
+
+    def imap_unordered(self, func, iterable, initializer=None, initargs=()):
+        _initialize(initializer, initargs)
+        for index, args in enumerate(iterable):
+            yield index, func(*args)
+
+    def imap_guarded(self, func, iterable, initializer=None, initargs=(), timeout=None, window=None):
+        """see Executor.imap_guarded, one task is in flight at a time and the timeout uses SIGALRM, ValueError where it is not available"""
+        if timeout is not None and not alarm_available():
+            raise ValueError('the serial executor times out tasks with SIGALRM, which is not available here, use the process executor for timeouts')
+        _initialize(initializer, initargs)
+        for index, args in enumerate(iterable):
+            yield index, call_guarded(func, args, timeout)
+
+class ThreadExecutor(Executor):
+    """run the tasks in a pool of threads of the current process, the initializer is called once for all threads"""
+
+    name = 'thread'
+
+    def starmap(self, func, iterable, initializer=None, initargs=()):
+        iterable = list(iterable)
+        _initialize(initializer, initargs)
+        with ThreadPool(self.max_workers) as p:
+            yield from p.istarmap(func, iterable, chunksize=self.get_chunksize(len(iterable)))
+
+    def imap_unordered(self, func, iterable, initializer=None, initargs=()):
+        _initialize(initializer, initargs)
+        with ThreadPool(self.max_workers) as p:
+            yield from p.imap_unordered(_call_indexed, ((index, func, args) for index, args in enumerate(iterable)), chunksize=self.chunksize or 1)
+
+class ProcessExecutor(Executor):
+    """run the tasks in a multiprocessing Pool, the initializer is called once in every process"""
+
+    name = 'process'
+
+    def starmap(self, func, iterable, initializer=None, initargs=()):
+        iterable = list(iterable)
+        with Pool(self.max_workers, initializer=initializer, initargs=initargs) as p:
+            yield from p.istarmap(func, iterable, chunksize=self.get_chunksize(len(iterable)))
+
+    def imap_unordered(self, func, iterable, initializer=None, initargs=()):
+        with Pool(self.max_workers, initializer=initializer, initargs=initargs) as p:
+            yield from p.imap_unordered(_call_indexed, ((index, func, args) for index, args in enumerate(iterable)), chunksize=self.chunksize or 1)
+
+    def imap_guarded(self, func, iterable, initializer=None, initargs=(), timeout=None, window=None):
+        """see Executor.imap_guarded, the timeout is enforced by the parent
+
+        The tasks are sent in chunks of chunksize (auto_chunksize for a list, 1 for a generator) to
+        worker processes that send back each result as soon as it is done, so a task is sent only when
+        a worker is idle and at most window tasks are in flight. The timeout applies to each task of a
+        chunk: a worker that runs past it (e.g. stuck in compiled solver code) or dies is terminated and
+        replaced by a new one, which runs the initializer again, and the rest of its chunk is sent again
+        task by task.
+        """
+        workers = min(self.max_workers, window or self.max_workers)
+        chunksize = self.chunksize or (self.get_chunksize(len(iterable)) if hasattr(iterable, '__len__') else 1)
+        if window is not None:
+            chunksize = max(1, min(chunksize, window // workers))
+        tasks = enumerate(iterable)
+        # tasks of a chunk that did not run because an earlier task of the chunk hung or killed the worker
+        again = []
+        idle = [_GuardedWorker(initializer, initargs) for _ in range(workers)]
+        busy = {}
+        pending = True
+        try:
+            while True:
+                while idle and (again or pending):
+                    if again:
+                        chunk = [again.pop(0)]
+                    else:
+                        chunk = list(itertools.islice(tasks, chunksize))
+                        if len(chunk) < chunksize:
+                            pending = False
+                        if len(chunk) == 0:
+                            break
+                    worker = idle.pop()
+                    if not worker.send((func, [args for index, args in chunk])):
+                        worker = _GuardedWorker(initializer, initargs)
+                        worker.send((func, [args for index, args in chunk]))
+                    busy[worker.connection] = [worker, chunk, None if timeout is None else time.monotonic() + timeout]
+                if len(busy) == 0:
+                    return
+                deadlines = [deadline for worker, chunk, deadline in busy.values() if deadline is not None]
+                ready = wait(list(busy), None if len(deadlines) == 0 else max(0, min(deadlines) - time.monotonic()))
+                for connection in ready:
+                    worker, chunk, deadline = busy[connection]
+                    try:
+                        result = connection.recv()
+                    except EOFError:
+                        del busy[connection]
+                        result = TaskFailure(f'worker exited with code {worker.stop(0)}')
+                        again += chunk[1:]
+                        idle.append(_GuardedWorker(initializer, initargs))
+                        yield chunk[0][0], result
+                        continue
+                    index = chunk.pop(0)[0]
+                    if len(chunk) == 0:
+                        del busy[connection]
+                        idle.append(worker)
+                    elif deadline is not None:
+                        busy[connection][2] = time.monotonic() + timeout
+                    yield index, result
+                now = time.monotonic()
+                for connection, (worker, chunk, deadline) in list(busy.items()):
+                    if deadline is not None and now >= deadline:
+                        del busy[connection]
+                        worker.stop(0)
+                        again += chunk[1:]
+                        idle.append(_GuardedWorker(initializer, initargs))
+                        yield chunk[0][0], TaskFailure(f'timed out after {timeout} s', True)
+        finally:
+            workers = idle + [worker for worker, chunk, deadline in busy.values()]
+            for worker in workers:
+                worker.send(None)
+            for worker in workers:
+                worker.stop()
+
+def _guarded_worker_loop(connection, initializer, initargs):
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        chunk = connection.recv()
+        if chunk is None:
+            return
+        func, chunk = chunk
+        for args in chunk:
+            result = call_guarded(func, args)
+            try:
+                connection.send(result)
+            except Exception as error:
+                connection.send(TaskFailure(f'the result cannot be sent to the parent, {type(error).__name__}: {error}'))
+
+class _GuardedWorker:
+    """process of ProcessExecutor.imap_guarded, it runs the call_guarded tasks of one chunk at a time and sends back each result"""
+
+    def __init__(self, initializer, initargs):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_guarded_worker_loop, args=(child, initializer, initargs), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, task):
+        """send a chunk (func, list of args), or None to stop the worker, False if the worker is gone"""
+        try:
+            self.connection.send(task)
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+
+    def stop(self, timeout=5):
+        """wait timeout seconds for the worker to exit, then terminate it
+
+        Returns:
+            int: exit code of the process
+        """
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+        return self.process.exitcode
+
+class DistributedExecutor(Executor):
+    """run the tasks on a dask.distributed cluster, a LocalCluster of max_workers processes or the scheduler at address
+
+    Args:
+        max_workers (int, optional): number of workers of the LocalCluster. Defaults to default_workers().
+        chunksize (int, optional): number of tasks sent to a worker at once. Defaults to 1.
+        address (str, optional): address of a running scheduler, e.g. 'tcp://10.0.0.1:8786'. Defaults to None (LocalCluster).
+    """
+
+    name = 'distributed'
+
+    def __init__(self, max_workers=None, chunksize=None, address=None):
+        super().__init__(max_workers, chunksize or 1)
+        self.address = address
+
+    def starmap(self, func, iterable, initializer=None, initargs=()):
+        try:
+            from dask.distributed import Client, LocalCluster
+        except ImportError:
+            raise ImportError('the distributed executor needs dask.distributed, install it with pip install "dask[distributed]"')
+        iterable = list(iterable)
+        chunksize = self.get_chunksize(len(iterable))
+        chunks = [iterable[start:start+chunksize] for start in range(0, len(iterable), chunksize)]
+        if self.address is None:
+            cluster = LocalCluster(n_workers=self.max_workers, threads_per_worker=1, processes=True)
+        else:
+            cluster = self.address
+        with Client(cluster) as client:
+            futures = client.map(_run_chunk, chunks, initializer=initializer, initargs=initargs, func=func, pure=False)
+            for future in futures:
+                yield from future.result()
+        if self.address is None:
+            cluster.close()
+
+    def imap_unordered(self, func, iterable, initializer=None, initargs=()):
+        try:
+            from dask.distributed import Client, LocalCluster, as_completed
+        except ImportError:
+            raise ImportError('the distributed executor needs dask.distributed, install it with pip install "dask[distributed]"')
+        if self.address is None:
+            cluster = LocalCluster(n_workers=self.max_workers, threads_per_worker=1, processes=True)
+        else:
+            cluster = self.address
+        with Client(cluster) as client:
+            # the scheduler starts the tasks in submission order and steals queued tasks for idle workers
+            futures = [client.submit(_call_initialized, initializer, initargs, _call_indexed, ((index, func, args),), pure=False, priority=-index)
+                       for index, args in enumerate(iterable)]
+            for future in as_completed(futures):
+                yield future.result()
+        if self.address is None:
+            cluster.close()
+
+    def imap_guarded(self, func, iterable, initializer=None, initargs=(), timeout=None, window=None):
+        """see Executor.imap_guarded, a new task is submitted each time a result is consumed"""
+        if timeout is not None:
+            raise ValueError(f'the {self.name} executor cannot stop a running task, use the process executor for timeouts')
+        try:
+            from dask.distributed import Client, LocalCluster, as_completed
+        except ImportError:
+            raise ImportError('the distributed executor needs dask.distributed, install it with pip install "dask[distributed]"')
+        if self.address is None:
+            cluster = LocalCluster(n_workers=self.max_workers, threads_per_worker=1, processes=True)
+        else:
+            cluster = self.address
+        tasks = enumerate(iterable)
+        with Client(cluster) as client:
+            def submit(index, args):
+                return client.submit(_call_initialized, initializer, initargs, _call_indexed, ((index, call_guarded, (func, args)),), pure=False, priority=-index)
+            futures = as_completed([submit(index, args) for index, args in itertools.islice(tasks, window)])
+            for future in futures:
+                yield future.result()
+                task = next(tasks, None)
+                if task is not None:
+                    futures.add(submit(*task))
+        if self.address is None:
+            cluster.close()
+
+def bounded_imap_unordered(executor, func, iterable, window=None, timeout=None):
+    """imap_guarded with a sliding window, a new task is started each time a result is consumed so that at most window results are in flight
+
+    All the tasks run in one pool, the workers are initialized once.
+
+    Args:
+        executor (Executor): executor from get_executor
+        func (function): task, must be importable for process based executors
+        iterable (list): list of argument tuples, read lazily
+        window (int, optional): max number of tasks in flight. Defaults to 64 per worker.
+        timeout (float, optional): max run time of a task in seconds, see Executor.imap_guarded. Defaults to None.
+
+    Yields:
+        set: index of the args in iterable and result of func or TaskFailure, in completion order
+    """
+    window = window or 64 * executor.max_workers
+    yield from executor.imap_guarded(func, iterable, timeout=timeout, window=window)
+
+def _run_chunk(chunk, initializer, initargs, func):
+    return [_call_initialized(initializer, initargs, func, args) for args in chunk]
+
+EXECUTORS = {executor.name: executor for executor in [SerialExecutor, ThreadExecutor, ProcessExecutor, DistributedExecutor]}
+
+def get_executor(executor=None, max_workers=None, chunksize=None):
+    """executor of the calculation drivers
+
+    Args:
+        executor (str or Executor, optional): 'process', 'thread', 'serial', 'distributed' or an Executor instance. Defaults to 'process'.
+        max_workers (int, optional): number of workers, ignored for Executor instances. Defaults to default_workers().
+        chunksize (int, optional): number of tasks sent to a worker at once, ignored for Executor instances. Defaults to auto_chunksize.
+
+    Returns:
+        Executor: the executor
+    """
+    if isinstance(executor, Executor):
+        return executor
+    executor = executor or 'process'
+    if executor not in EXECUTORS:
+        raise ValueError(f'unknown executor {executor}, use one of {list(EXECUTORS)}')
+    return EXECUTORS[executor](max_workers, chunksize)
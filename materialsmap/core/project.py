@@ -0,0 +1,90 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+SETTINGS_VERSION = 1
+# order of the legacy setting.npy array
+SETTINGS_KEYS = ['TemperatureRange', 'numPoint', 'numSimultion', 'relatedEles', 'terminalAlloys', 'indep_terminalAlloys', 'database', 'pressure', 'eleAmountType']
+
+def _toJson(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (tuple, list)):
+        return [_toJson(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def saveSettings(path, settings):
+    """write the settings of a map to settings.json
+
+    Args:
+        path (str): path to store the settings
+        settings (list or dict): [TemperatureRange,numPoint,numSimultion,relatedEles,terminalAlloys,indep_terminalAlloys,database,pressure,eleAmountType] or dict with these keys
+    """
+    if not isinstance(settings, dict):
+        settings = dict(zip(SETTINGS_KEYS, settings))
+    manifest = {'version': SETTINGS_VERSION}
+    for key in SETTINGS_KEYS:
+        if key in settings:
+            manifest[key] = _toJson(settings[key])
+    f = open(f'{path}/settings.json', 'w')
+    f.write(json.dumps(manifest, indent = 4))
+    f.close()
+
+def loadSettings(path):
+    """read the settings of a map, settings.json or, if it does not exist, the legacy setting.npy
+
+    Args:
+        path (str): path to the stored settings
+
+    Returns:
+        dict: settings with the keys of SETTINGS_KEYS
+    """
+    if os.path.exists(f'{path}/settings.json'):
+        f = open(f'{path}/settings.json')
+        manifest = json.load(f)
+        f.close()
+        if manifest.get('version', 0) > SETTINGS_VERSION:
+            raise Exception(f'settings.json version {manifest["version"]} is newer than the supported version {SETTINGS_VERSION}')
+        settings = {key: manifest[key] for key in SETTINGS_KEYS if key in manifest}
+    else:
+        legacy = np.load(f'{path}/setting.npy', allow_pickle = True)
+        settings = dict(zip(SETTINGS_KEYS, legacy))
+    settings['TemperatureRange'] = tuple(settings['TemperatureRange'])
+    settings['numPoint'] = int(settings['numPoint'])
+    settings['relatedEles'] = list(settings['relatedEles'])
+    settings['terminalAlloys'] = list(settings['terminalAlloys'])
+    settings['indep_terminalAlloys'] = list(settings['indep_terminalAlloys'])
+    settings.setdefault('eleAmountType', 'massFraction')
+    return settings
+
+def saveCompositions(path, Compositions, writeExcel = False):
+    """write the composition table of a map to composition_for_feasibilityMap.npz
+
+    Args:
+        path (str): path to store the compositions
+        Compositions (dict): columns of the table, from createComposition
+        writeExcel (bool, optional): also export composition_for_feasibilityMap.xlsx. Defaults to False.
+    """
+    columns = {key: np.asarray(val) for key, val in Compositions.items()}
+    np.savez(f'{path}/composition_for_feasibilityMap.npz', **columns)
+    if writeExcel:
+        pd.DataFrame(Compositions).to_excel(f'{path}/composition_for_feasibilityMap.xlsx')
+
+def loadCompositions(path):
+    """read the composition table of a map, the .npz file or, if it does not exist, the legacy .xlsx file
+
+    Args:
+        path (str): path to the stored compositions
+
+    Returns:
+        DataFrame: one row per point, element, alloy_ and Index columns
+    """
+    if os.path.exists(f'{path}/composition_for_feasibilityMap.npz'):
+        data = np.load(f'{path}/composition_for_feasibilityMap.npz')
+        df = pd.DataFrame({key: data[key] for key in data.files})
+        data.close()
+        return df
+    return pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
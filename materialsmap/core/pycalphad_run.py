@@ -4,63 +4,229 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 from pycalphad import Database, equilibrium, Model, variables as v
-from pycalphad.core.calculate import _sample_phase_constitution
-from pycalphad.core.errors import DofError
-from pycalphad.core.utils import point_sample
-from scheil import simulate_scheil_solidification
-from multiprocessing import Pool
+from pycalphad.core.utils import filter_phases, unpack_components
 from collections import defaultdict
 from materialsmap.ref_data import eleweight
-import materialsmap.core.istarmap
+from materialsmap.core.pycalphad_worker import init_worker, publish_database, equilibrium_point, equilibrium_batch, equilibrium_adaptive, scheil_point, SCHEIL_PRESSURE
+from materialsmap.core.result_cache import open_cache, database_hash, point_key
+from materialsmap.core.checkpoint import Checkpoint
+from materialsmap.core.executor import get_executor, TaskFailure
+from materialsmap.core.result_store import ResultStore, writeResult, hasResultStore, readResultStore, segmentReduce
+from materialsmap.core.project import loadSettings, loadCompositions
+from materialsmap.core.compositions import getPointCompositions
+from scheil.solidification_result import SolidificationResult
 from sys import argv
 import tqdm    
 import json
+import math
 
-def pycalphad_eq(path):
+def _eq_to_dict(eq):
+    """change one eq result to the dict format stored in data_mole.json
+
+    Args:
+        eq (xarray.Dataset): eq result of one composition
+
+    Returns:
+        dict: temperature and phase fractions of this composition
+    """
+    result = {}
+    result['TK'] = list(eq.T.values)
+    eq_phases_name = set(eq.Phase.values.flatten().tolist()) - {''}
+    eq_phases = eq.Phase.values.squeeze().tolist()
+    for eq_phase in eq_phases_name:
+        result[eq_phase] = []
+        for n,va in enumerate(eq["NP"].values.squeeze()):
+            count = eq_phases[n].count(eq_phase)
+            if count == 0:
+                result[eq_phase].append(0)
+            elif count == 1:
+                index = eq_phases[n].index(eq_phase)
+                result[eq_phase].append("{:.8f}".format(float(va[index])))
+            elif count == 2:
+                index = [i for i, x in enumerate(eq_phases[n]) if x == eq_phase]
+                total = 0
+                for i in index:
+                    total += float(va[i])
+                result[eq_phase].append("{:.8f}".format(total))
+            else:
+                print('error')
+    return result
+
+def _scheil_to_dict(scheil_result):
+    """change one scheil result to the dict format stored in data_mole.json
+
+    Args:
+        scheil_result (SolidificationResult): scheil result of one composition
+
+    Returns:
+        dict: temperature and phase fractions of this composition, None for a failed point
+    """
+    if scheil_result is None:
+        return None
+    result = {}
+    scheils = scheil_result.to_dict()
+    result['TK'] = scheils['temperatures']
+    for pha,val in scheil_result.cum_phase_amounts.items():
+        if np.sum(val) > 1E-6:
+            result[pha] = val
+    result['LIQUID'] = (1.0 - np.array(scheils['fraction_solid'])).tolist()
+    return result
+
+def liquidus_brackets(store, intial_temperature, lower_temperature, liquid_name='LIQUID'):
+    """temperature bracket of the liquidus of every point from the eq results
+
+    The upper bound is the eq temperature above the last one with solid, the lower bound that last
+    temperature with solid. Points still solid at the highest eq temperature get intial_temperature as
+    upper bound, points fully liquid at every eq temperature a zero width bracket at the lowest one, and
+    points without eq result (lower_temperature, intial_temperature).
+
+    Args:
+        store (ResultStore): eq results, temperatures in increasing order for each point
+        intial_temperature (float): fully liquid temperature used when the eq results have none
+        lower_temperature (float): lower bound used for the points without eq result
+        liquid_name (str, optional): Defaults to 'LIQUID'.
+
+    Returns:
+        set: (points,) lower bounds and (points,) upper bounds
+    """
+    T_low = np.full(len(store), float(lower_temperature))
+    T_high = np.full(len(store), float(intial_temperature))
+    if liquid_name not in store.phases:
+        return T_low, T_high
+    liquid = np.asarray(store.fractions[:, store.phases.index(liquid_name)], dtype=float)
+    TK = np.asarray(store.TK, dtype=float)
+    first = store.offsets[:-1]
+    last = store.offsets[1:] - 1
+    last_solid = segmentReduce(np.maximum, np.where(liquid < 1 - 1E-6, np.arange(len(TK)), -1), store.offsets, empty=-1).astype(int)
+    valid = np.asarray(store.valid) & (store.length > 0)
+    above = valid & (last_solid == last)
+    T_low[above] = TK[last[above]]
+    inside = valid & (last_solid >= first) & (last_solid < last)
+    T_low[inside] = TK[last_solid[inside]]
+    T_high[inside] = TK[last_solid[inside] + 1]
+    below = valid & (last_solid < first)
+    T_low[below] = TK[first[below]]
+    T_high[below] = TK[first[below]]
+    return T_low, T_high
+
+def _scheil_costs(dbf, phases, all_comp_tot, store=None, step_temperature=1.0, liquid_name='LIQUID'):
+    """estimate the relative cost of the scheil simulation of every point
+
+    The cost grows with the size of each eq solve (components times active phases) and with the number of
+    temperature steps, taken from the liquidus to solidus span of the eq results. The points without eq
+    result get the median span.
+
+    Args:
+        dbf (Database): database
+        phases (list): list of phases
+        all_comp_tot (list): components of every point
+        store (ResultStore, optional): eq results. Defaults to None.
+        step_temperature (float, optional): temperature step of scheil. Defaults to 1.0.
+        liquid_name (str, optional): Defaults to 'LIQUID'.
+
+    Returns:
+        list: cost of every point
+    """
+    spans = np.full(len(all_comp_tot), np.nan)
+    if store is not None and liquid_name in store.phases:
+        liquid = np.asarray(store.fractions[:, store.phases.index(liquid_name)], dtype=float)
+        TK = np.asarray(store.TK, dtype=float)
+        solidusT = segmentReduce(np.minimum, np.where(liquid > 0, TK, np.inf), store.offsets)
+        liquidusT = segmentReduce(np.minimum, np.where(liquid >= 1, TK, np.inf), store.offsets)
+        liquidusT = np.where(np.isinf(liquidusT), segmentReduce(np.maximum, TK, store.offsets), liquidusT)
+        span = np.where(np.isinf(solidusT), np.nan, np.maximum(liquidusT - solidusT, 0.0))
+        count = min(len(span), len(spans))
+        spans[:count] = span[:count]
+    default_span = float(np.nanmedian(spans)) if np.any(~np.isnan(spans)) else 0.0
+    spans[np.isnan(spans)] = default_span
+    active_phases = {}
+    costs = []
+    for num, comps in enumerate(all_comp_tot):
+        key = tuple(comps)
+        if key not in active_phases:
+            active_phases[key] = len(filter_phases(dbf, unpack_components(dbf, comps), phases))
+        costs.append(len(comps) * active_phases[key] * (1 + spans[num] / step_temperature))
+    return costs
+
+def _run_equilibrium(iter_args_equilibrium, todo, executor, initargs, batched=False, batch_size=None, timeout=None, adaptive=None):
+    """run the eq calculations of the todo points with the executor
+
+    Args:
+        iter_args_equilibrium (list): list of (components, conditions) of all points
+        todo (list): index of the points to calculate
+        executor (Executor): executor from get_executor
+        initargs (set): arguments of init_worker
+        batched (bool, optional): group the points sharing the same components. Defaults to False.
+        batch_size (int, optional): max number of points in one batched task. Defaults to None.
+        timeout (float, optional): max run time of one task in seconds, see Executor.imap_guarded. Defaults to None.
+        adaptive (set, optional): (coarse_factor, np_tolerance) of equilibrium_adaptive. Defaults to None (full temperature grid).
+
+    Yields:
+        set: index of the point and its eq result, TaskFailure if the task raised or timed out, in completion order
+    """
+    if len(todo) == 0:
+        return
+    if batched:
+        groups = defaultdict(list)
+        for num in todo:
+            groups[tuple(iter_args_equilibrium[num][0])].append(num)
+        iter_args_batch = []
+        batch_index = []
+        for comps_new, nums in groups.items():
+            size = batch_size or math.ceil(len(nums)/executor.max_workers)
+            for start in range(0, len(nums), size):
+                batch_index.append(nums[start:start+size])
+                iter_args_batch.append((list(comps_new), [iter_args_equilibrium[n][1] for n in batch_index[-1]], adaptive))
+        for index, eq_batch in tqdm.tqdm(executor.imap_guarded(equilibrium_batch, iter_args_batch, init_worker, initargs, timeout),
+                        total=len(iter_args_batch)):
+            nums = batch_index[index]
+            if isinstance(eq_batch, TaskFailure):
+                eq_batch = [eq_batch]*len(nums)
+            for n, eq_result in zip(nums, eq_batch):
+                yield n, eq_result
+    else:
+        if adaptive is None:
+            func, tasks = equilibrium_point, [iter_args_equilibrium[n] for n in todo]
+        else:
+            func, tasks = equilibrium_adaptive, [(*iter_args_equilibrium[n], *adaptive) for n in todo]
+        for index, eq_result in tqdm.tqdm(executor.imap_guarded(func, tasks, init_worker, initargs, timeout),
+                        total=len(todo)):
+            yield todo[index], eq_result
+
+def pycalphad_eq(path, batched=False, batch_size=None, cache=None, resume=False, executor=None, max_workers=None, chunksize=None, timeout=None, retry=False,
+                 adaptive_temperature=False, coarse_factor=5, np_tolerance=0.05):
     """running and store equlibrium calculations based on the settings on path
 
     Args:
         path (str): path to open the setting and store the results
+        batched (bool, optional): group the compositions sharing the same components and build their models only once per group. Defaults to False.
+        batch_size (int, optional): max number of compositions in one batched task. Defaults to splitting each group evenly over the cores.
+        cache (bool or str, optional): reuse and store per-point results in a SQLite cache, True for ~/.materialsmap/result_cache.sqlite or a path to the file. Defaults to None (no cache).
+        resume (bool, optional): skip the points already in Result/checkpoint.jsonl of a previous (killed) run. Defaults to False.
+        executor (str or Executor, optional): 'process', 'thread', 'serial', 'distributed' or an Executor instance. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to the usable CPUs (affinity and container quota) minus one.
+        chunksize (int, optional): number of points sent to a worker at once. Defaults to about 4 chunks per worker.
+        timeout (float, optional): max run time of one task in seconds, enforced by the process executor, see Executor.imap_guarded. Defaults to None (no limit).
+        retry (bool, optional): run the failed points once more, one point per task and with twice the timeout. Defaults to False.
+        adaptive_temperature (bool, optional): scan every coarse_factor temperature and refine only around the phase changes, see equilibrium_adaptive. Defaults to False.
+        coarse_factor (int, optional): number of temperature steps in a coarse step. Defaults to 5.
+        np_tolerance (float, optional): change of a phase amount between coarse temperatures that triggers a refinement. Defaults to 0.05.
 
     Returns:
-        json: data_more.json that contains all eq results
+        dict: eq results of every point, also written to data_mole.json and the data_mole ResultStore
     """
 
-    setting = np.load(f'{path}/setting.npy',allow_pickle=True)
-    dbf = Database(setting[6])
+    setting = loadSettings(path)
+    # parsed once here, the forked workers inherit it
+    dbf = publish_database(setting['database'])
     comps = []
-    for i in setting[3]:
+    for i in setting['relatedEles']:
         comps.append(i.upper())
     comps.append('VA')
     phases = list(dbf.phases.keys())
-    potentials = {v.N: 1, v.T: setting[0], v.P: setting[7]}  # for equilibrium calculations
-    compositions_list = []
-    indepcomp_list = []
-    all_comp_tot = []
-    df = pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
-    for n in range(len(df.index)):
-        comp_list={}
-        all_comp = []
-        nocomp_list = []
-        indep = 0
-        for o,i in enumerate(setting[3]):
-            if indep == 0 and float(df.loc[n,[i]].values) > 0:
-                indep  = 1
-                indepcomp_list.append(i)
-                all_comp.append(i)
-                continue;
-            elif float(df.loc[n,[i]].values) < 1E-5:
-                nocomp_list.append(i)
-                continue
-            i = i.upper()
-            all_comp.append(i)
-            comp_list[v.W(i)]=float(df.loc[n,[i]].values)
-        comp_list_mole = v.get_mole_fractions(comp_list,v.Species(indepcomp_list[n]),eleweight)
-        if len(comp_list_mole) == 0:
-            comp_list_mole[v.X(nocomp_list[0])]=1E-5
-            all_comp.append(nocomp_list[0])
-        all_comp_tot.append(all_comp)
-        compositions_list.append(comp_list_mole)
+    potentials = {v.N: 1, v.T: setting['TemperatureRange'], v.P: setting['pressure']}  # for equilibrium calculations
+    df = loadCompositions(path)
+    compositions_list, all_comp_tot = getPointCompositions(df, setting['relatedEles'])
 
     iter_args_equilibrium = []
     for num, composition in enumerate(compositions_list):
@@ -73,48 +239,72 @@ def pycalphad_eq(path):
         conds.update(potentials)
         comps_new = all_comp_tot[num]
         comps_new.append('VA')
-        iter_args_equilibrium.append((dbf, comps_new, phases, conds))
-    # Multiprocessing step:
-    cores = os.cpu_count() - 1
-    eq_results = []
-    with Pool(cores) as p:
-        for eq_result in tqdm.tqdm(p.istarmap(equilibrium, iter_args_equilibrium),
-                        total=len(iter_args_equilibrium)):
-            eq_results.append(eq_result)
-            pass
-    # Chang eq result to dict
-    equilibrium_result = defaultdict(dict)
-    for num,eq in enumerate(eq_results):
-        equilibrium_result['Point'+str(num)]['TK'] = list(eq.T.values)
-        eq_phases_name = set(eq.Phase.values.flatten().tolist()) - {''}
-        eq_phases = eq.Phase.values.squeeze().tolist()
-        for eq_phase in eq_phases_name:
-            equilibrium_result['Point'+str(num)][eq_phase] = []
-            for n,va in enumerate(eq["NP"].values.squeeze()):
-                count = eq_phases[n].count(eq_phase)
-                if count == 0:
-                    equilibrium_result['Point'+str(num)][eq_phase].append(0)
-                elif count == 1:
-                    index = eq_phases[n].index(eq_phase)
-                    equilibrium_result['Point'+str(num)][eq_phase].append("{:.8f}".format(float(va[index])))
-                elif count == 2:
-                    index = [i for i, x in enumerate(eq_phases[n]) if x == eq_phase]
-                    result = 0
-                    for i in index:
-                        result += float(va[i])
-                    equilibrium_result['Point'+str(num)][eq_phase].append("{:.8f}".format(result))
-                else:
-                    print('error')
+        iter_args_equilibrium.append((comps_new, conds))
     isExist = os.path.exists(path+'/Pycalphad/Equilibrium Simulation/Result/')
     if not isExist:
         os.makedirs(path+'/Pycalphad/Equilibrium Simulation/Result/')
         print("The new directory is created!")
-    output_File = json.dumps(equilibrium_result)
-    f = open(path+'/Pycalphad/Equilibrium Simulation'+'/Result/data_mole.json','w')
-    f.write(output_File)
-    f.close()
+    db_hash = database_hash(setting['database'])
+    conditions = {'T': np.asarray(setting['TemperatureRange'], dtype=float).tolist(), 'P': float(setting['pressure'])}
+    adaptive = None
+    if adaptive_temperature:
+        adaptive = (coarse_factor, np_tolerance)
+        conditions['adaptive_temperature'] = [coarse_factor, np_tolerance]
+    point_keys = []
+    for comps_new, conds in iter_args_equilibrium:
+        composition = {key: val for key, val in conds.items() if isinstance(key, v.MoleFraction)}
+        point_keys.append(point_key('eq', db_hash, comps_new, composition, conditions, phases))
+    # Read the finished points of the previous run and the cached points
+    checkpoint = Checkpoint(path+'/Pycalphad/Equilibrium Simulation/Result/checkpoint.jsonl', point_keys, resume)
+    result_cache = None
+    try:
+        point_results = dict(checkpoint.results)
+        if resume:
+            print(f'{len(point_results)}/{len(iter_args_equilibrium)} points found in the checkpoint')
+        result_cache = open_cache(cache)
+        if result_cache is not None:
+            for num in range(len(iter_args_equilibrium)):
+                if num in point_results:
+                    continue
+                cached = result_cache.get(point_keys[num])
+                if cached is not None:
+                    point_results[num] = cached
+            print(f'{len(point_results)}/{len(iter_args_equilibrium)} points found in the checkpoint and result cache')
+        todo = [num for num in range(len(iter_args_equilibrium)) if num not in point_results]
+        # Multiprocessing step:
+        executor = get_executor(executor, max_workers, chunksize)
+        for attempt in range(1 + int(retry)):
+            if attempt > 0 and len(todo) > 0:
+                print(f'Retry {len(todo)} failed points')
+                batched = False
+                timeout = None if timeout is None else 2*timeout
+            failed = []
+            for num, eq in _run_equilibrium(iter_args_equilibrium, todo, executor, (setting['database'], phases), batched, batch_size, timeout, adaptive):
+                if isinstance(eq, TaskFailure):
+                    print(f'Point{num} failed: {eq.error}')
+                    failed.append(num)
+                    continue
+                # Chang eq result to dict
+                point_results[num] = _eq_to_dict(eq)
+                checkpoint.write(num, point_results[num])
+                if result_cache is not None:
+                    result_cache.put(point_keys[num], 'eq', point_results[num])
+            todo = failed
+        # the failed points are stored as None and calculated again on resume
+        for num in todo:
+            point_results[num] = None
+    finally:
+        checkpoint.close()
+        if result_cache is not None:
+            result_cache.close()
+    equilibrium_result = defaultdict(dict)
+    for num in range(len(iter_args_equilibrium)):
+        equilibrium_result['Point'+str(num)] = point_results[num]
+    writeResult(equilibrium_result, path+'/Pycalphad/Equilibrium Simulation/Result')
+    return equilibrium_result
 
-def pycalphad_scheil(path,intial_temperature,liquid_name='LIQUID',step_temperature=1.0,eq_kwargs=None,stop=0.0001, verbose=False, adaptive=True):
+def pycalphad_scheil(path,intial_temperature,liquid_name='LIQUID',step_temperature=1.0,eq_kwargs=None,stop=0.0001, verbose=False, adaptive=True, cache=None, resume=False, executor=None, max_workers=None, chunksize=None, timeout=None, retry=False,
+                     eq_results=None, bisect=True, liquidus_tolerance=1.0):
     """running and store scheil simulations based on the settings on path
 
     Args:
@@ -122,115 +312,162 @@ def pycalphad_scheil(path,intial_temperature,liquid_name='LIQUID',step_temperatu
         intial_temperature (_type_): the temperature of scheil
         liquid_name (str, optional): Defaults to 'LIQUID'.
         step_temperature (float, optional): Defaults to 1.0.
-        eq_kwargs (_type_, optional): keywords pass to eq calculations. Defaults to None.
+        eq_kwargs (dict, optional): keywords of the equilibrium calls of scheil, e.g. {'calc_opts': {'pdens': 500}}. Defaults to None.
         stop (float, optional): the liqud fraction to stop scheil simulations. Defaults to 0.0001.
         verbose (bool, optional): Defaults to False.
         adaptive (bool, optional): Dynamic zoom in when close to stop. Defaults to True.
+        cache (bool or str, optional): reuse and store per-point results in a SQLite cache, True for ~/.materialsmap/result_cache.sqlite or a path to the file. Defaults to None (no cache).
+        resume (bool, optional): skip the points already in Result/checkpoint.jsonl of a previous (killed) run. Defaults to False.
+        executor (str or Executor, optional): 'process', 'thread', 'serial', 'distributed' or an Executor instance. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to the usable CPUs (affinity and container quota) minus one.
+        chunksize (int, optional): number of points sent to a worker at once. Defaults to 1, the points are sent longest first (see _scheil_costs).
+        timeout (float, optional): max run time of one point in seconds, enforced by the process executor, see Executor.imap_guarded. Defaults to None (no limit).
+        retry (bool, optional): run the failed points once more with relaxed settings: twice the step_temperature and timeout, 10 times the stop. These points are printed and not written to the checkpoint or the cache. Defaults to False.
+        eq_results (dict or ResultStore, optional): eq results of the points, e.g. returned by pycalphad_eq, used only when the pressure of the settings is SCHEIL_PRESSURE. Defaults to None (read the Result folder of the eq simulations).
+        bisect (bool, optional): start each point from a bisection of the liquidus inside the bracket of liquidus_brackets. Defaults to True.
+        liquidus_tolerance (float, optional): the bisection stops within liquidus_tolerance K above the liquidus. Defaults to 1.0.
+
+    Returns:
+        list: SolidificationResult of every point, None for the failed points
     """                   
 
-    setting = np.load(f'{path}/setting.npy',allow_pickle=True)
-    dbf = Database(setting[6])
+    setting = loadSettings(path)
+    # parsed once here, the forked workers inherit it
+    dbf = publish_database(setting['database'])
     comps = []
-    for i in setting[3]:
+    for i in setting['relatedEles']:
         comps.append(i.upper())
     comps.append('VA')
     phases = list(dbf.phases.keys())
-    compositions_list = []
-    indepcomp_list = []
-    all_comp_tot = []
-    df = pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
-    for n in range(len(df.index)):
-        comp_list={}
-        all_comp = []
-        nocomp_list = []
-        indep = 0
-        for o,i in enumerate(setting[3]):
-            if indep == 0 and float(df.loc[n,[i]].values) > 0:
-                indep  = 1
-                indepcomp_list.append(i)
-                all_comp.append(i)
-                continue;
-            elif float(df.loc[n,[i]].values) < 1E-5:
-                nocomp_list.append(i)
-                continue
-            i = i.upper()
-            all_comp.append(i)
-            comp_list[v.W(i)]=float(df.loc[n,[i]].values)
-        comp_list_mole = v.get_mole_fractions(comp_list,v.Species(indepcomp_list[n]),eleweight)
-        if len(comp_list_mole) == 0:
-            comp_list_mole[v.X(nocomp_list[0])]=1E-5
-            all_comp.append(nocomp_list[0])
-        all_comp_tot.append(all_comp)
-        compositions_list.append(comp_list_mole)
-    LiquidusTemp = []
-    isExist = os.path.exists(path+'/Pycalphad/Equilibrium Simulation/Result/')
-    if isExist:
-        f = open(path+'/Pycalphad/Equilibrium Simulation'+'/Result/data_mole.json')
-        eq_results = json.load(f)
-        for j in eq_results.values():
-            if len(j.keys()) == 1:
-                j = None
-                LiquidusTemp.append(intial_temperature)
-                continue;
-            for n,a in enumerate(j['LIQUID']):
-                if n+1 == len(j['LIQUID']):
-                    print('cannot find liquid phase in eq results, start with back up temperature')
-                    LiquidusTemp.append(intial_temperature)
-                elif float(a) < 1 and float(j['LIQUID'][n+1]) == 1:
-                    LiquidusTemp.append(j['TK'][n+1])
-                    break;
-    if len(LiquidusTemp) == 0:
-        T_liquid = [intial_temperature]*len(compositions_list)
-    else:
-        T_liquid = LiquidusTemp
-    # Generate points for adaptive Scheil starting points (performance)
-    points_dict = {}
-    for phase_name in phases:
-        try:
-            mod = Model(dbf, comps, phase_name)
-            points_dict[phase_name] = _sample_phase_constitution(mod, point_sample, True, 2000)
-        except DofError:
-            pass
+    df = loadCompositions(path)
+    compositions_list, all_comp_tot = getPointCompositions(df, setting['relatedEles'])
     liquid_name = 'LIQUID'
     step_temperature = 1.0
-    eq_kwargs = {'adaptive':True, 'eq_kwargs':{'calc_opts': {'points': points_dict}}}
     stop = 0.0001
     verbose = False
     adaptive = True
-    # Run simulations
-    iter_args_scheil = []
+    # Start temperatures from the liquidus of the eq results
+    eq_folder = path+'/Pycalphad/Equilibrium Simulation/Result'
+    if eq_results is None and hasResultStore(eq_folder):
+        eq_results = readResultStore(eq_folder)
+    elif eq_results is None and os.path.exists(eq_folder+'/data_mole.json'):
+        f = open(eq_folder+'/data_mole.json')
+        eq_results = json.load(f)
+        f.close()
+    if eq_results is not None and not isinstance(eq_results, ResultStore):
+        eq_results = ResultStore.from_dict(eq_results)
+    T_low = np.full(len(compositions_list), float(setting['TemperatureRange'][0]))
+    T_liquid = np.full(len(compositions_list), float(intial_temperature))
+    if eq_results is not None and float(setting['pressure']) != SCHEIL_PRESSURE:
+        # the liquidus of the eq results does not bracket the liquidus at the pressure of scheil
+        print(f"Scheil runs at {SCHEIL_PRESSURE} Pa, the eq results at {setting['pressure']} Pa are not used for the start temperatures")
+    elif eq_results is not None:
+        low, high = liquidus_brackets(eq_results, intial_temperature, setting['TemperatureRange'][0], liquid_name)
+        count = min(len(low), len(compositions_list))
+        T_low[:count] = low[:count]
+        T_liquid[:count] = high[:count]
+    print(f'{int(np.sum(T_liquid == intial_temperature))}/{len(compositions_list)} points without liquidus in the eq results, searched up to {intial_temperature} K')
     for num, composition in enumerate(compositions_list):
         print(f"{composition} ({num+1}/{len(compositions_list)})")
         for key,val in composition.items():
             composition[key] = float("{:.6f}".format(val))  
-        comps_new = all_comp_tot[num]
-        comps_new.append('VA')  
-        iter_args_scheil.append((dbf, comps_new, phases, composition, T_liquid[num], step_temperature,liquid_name,eq_kwargs,stop,verbose, adaptive))
-    # Multiprocessing step:
-    cores = os.cpu_count() - 1
-    scheil_results_ori = []
-    with Pool(cores) as p:
-        for scheil_result_ori in tqdm.tqdm(p.istarmap(simulate_scheil_solidification, iter_args_scheil),
-                        total=len(iter_args_scheil)):
-            scheil_results_ori.append(scheil_result_ori)
-            pass
-    # Chang scheil result to dict
-    scheil_result = defaultdict(dict)
-    for num,i in enumerate(scheil_results_ori):
-        scheils = i.to_dict()
-        scheil_result['Point'+str(num)]['TK'] = scheils['temperatures']
-        for pha,val in i.cum_phase_amounts.items():
-            if np.sum(val) > 1E-6:
-                scheil_result['Point'+str(num)][pha] = val
-        scheil_result['Point'+str(num)]['LIQUID'] = (1.0 - np.array(scheils['fraction_solid'])).tolist()
-    
-    
+        all_comp_tot[num].append('VA')
     isExist = os.path.exists(path+'/Pycalphad/Scheil Simulation/Result/')
     if not isExist:
         os.makedirs(path+'/Pycalphad/Scheil Simulation/Result/')
         print("The new directory is created!")
-    output_File = json.dumps(scheil_result)
-    f = open(path+'/Pycalphad/Scheil Simulation'+'/Result/data_mole.json','w')
-    f.write(output_File)
-    f.close()
-    return scheil_results_ori
\ No newline at end of file
+    db_hash = database_hash(setting['database'])
+    point_keys = []
+    for num, composition in enumerate(compositions_list):
+        conditions = {'start_temperature': float(T_liquid[num]), 'step_temperature': step_temperature,
+                      'liquid_name': liquid_name, 'stop': stop, 'adaptive': adaptive}
+        if bisect:
+            conditions.update({'lower_temperature': float(T_low[num]), 'liquidus_tolerance': liquidus_tolerance})
+        if eq_kwargs:
+            conditions['eq_kwargs'] = repr(sorted(eq_kwargs.items()))
+        point_keys.append(point_key('scheil', db_hash, all_comp_tot[num], composition, conditions, phases))
+    # Read the finished points of the previous run and the cached points
+    checkpoint = Checkpoint(path+'/Pycalphad/Scheil Simulation/Result/checkpoint.jsonl', point_keys, resume)
+    result_cache = None
+    try:
+        scheil_results = {num: SolidificationResult.from_dict(result) for num, result in checkpoint.results.items()}
+        if resume:
+            print(f'{len(scheil_results)}/{len(compositions_list)} points found in the checkpoint')
+        result_cache = open_cache(cache)
+        if result_cache is not None:
+            for num in range(len(compositions_list)):
+                if num in scheil_results:
+                    continue
+                cached = result_cache.get(point_keys[num])
+                if cached is not None:
+                    scheil_results[num] = SolidificationResult.from_dict(cached)
+            print(f'{len(scheil_results)}/{len(compositions_list)} points found in the checkpoint and result cache')
+        todo = [num for num in range(len(compositions_list)) if num not in scheil_results]
+        if len(todo) > 0:
+            # Run simulations, longest first so the short points fill the gaps of the last workers
+            costs = _scheil_costs(dbf, phases, all_comp_tot, eq_results, step_temperature, liquid_name)
+            todo = sorted(todo, key=lambda num: -costs[num])
+            # Multiprocessing step:
+            executor = get_executor(executor, max_workers, chunksize or 1)
+            relaxed = []
+            for attempt in range(1 + int(retry)):
+                if attempt > 0 and len(todo) > 0:
+                    print(f'Retry {len(todo)} failed points with relaxed settings')
+                    step_temperature = 2*step_temperature
+                    stop = 10*stop
+                    timeout = None if timeout is None else 2*timeout
+                iter_args_scheil = []
+                for num in todo:
+                    lower_temperature = float(T_low[num]) if bisect else None
+                    iter_args_scheil.append((all_comp_tot[num], compositions_list[num], float(T_liquid[num]), step_temperature,liquid_name,eq_kwargs,stop,verbose, adaptive,
+                                             lower_temperature, liquidus_tolerance))
+                failed = []
+                for index, scheil_result_ori in tqdm.tqdm(executor.imap_guarded(scheil_point, iter_args_scheil, init_worker, (setting['database'], phases), timeout),
+                                total=len(iter_args_scheil)):
+                    num = todo[index]
+                    if isinstance(scheil_result_ori, TaskFailure):
+                        print(f'Point{num} failed: {scheil_result_ori.error}')
+                        failed.append(num)
+                        continue
+                    scheil_results[num] = scheil_result_ori
+                    # the relaxed results are kept out of the checkpoint and the cache, their keys are the ones of the original settings,
+                    # so a resumed run calculates them again with the original settings
+                    if attempt > 0:
+                        relaxed.append(num)
+                        continue
+                    checkpoint.write(num, scheil_result_ori.to_dict())
+                    if result_cache is not None:
+                        result_cache.put(point_keys[num], 'scheil', scheil_result_ori.to_dict())
+                todo = failed
+            if len(relaxed) > 0:
+                print(f'{len(relaxed)} points with relaxed settings (step_temperature {step_temperature}, stop {stop}): {", ".join(f"Point{num}" for num in sorted(relaxed))}')
+            # the failed points are stored as None and calculated again on resume
+            for num in todo:
+                scheil_results[num] = None
+    finally:
+        checkpoint.close()
+        if result_cache is not None:
+            result_cache.close()
+    scheil_results_ori = [scheil_results[num] for num in range(len(compositions_list))]
+    # Chang scheil result to dict
+    scheil_result = defaultdict(dict)
+    for num,i in enumerate(scheil_results_ori):
+        scheil_result['Point'+str(num)] = _scheil_to_dict(i)
+    writeResult(scheil_result, path+'/Pycalphad/Scheil Simulation/Result')
+    return scheil_results_ori
+
+def pycalphad_eq_scheil(path, intial_temperature, eq_options=None, scheil_options=None):
+    """run the eq calculations and the scheil simulations in one pipeline, the eq results are handed to scheil in memory
+
+    Args:
+        path (str): path to open the setting and store the results
+        intial_temperature (float): the temperature to start scheil if not eq results
+        eq_options (dict, optional): keywords passed to pycalphad_eq. Defaults to None.
+        scheil_options (dict, optional): keywords passed to pycalphad_scheil. Defaults to None.
+
+    Returns:
+        set: eq results of every point and SolidificationResult of every point
+    """
+    equilibrium_result = pycalphad_eq(path, **(eq_options or {}))
+    scheil_results = pycalphad_scheil(path, intial_temperature, eq_results=equilibrium_result, **(scheil_options or {}))
+    return equilibrium_result, scheil_results
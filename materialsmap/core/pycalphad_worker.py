@@ -0,0 +1,270 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import xarray as xr
+from pycalphad import Database, equilibrium, variables as v
+from pycalphad.codegen.callables import build_phase_records
+from pycalphad.core.utils import filter_phases, instantiate_models, unpack_components
+from scheil import simulate_scheil_solidification
+import scheil.simulate
+
+# State of the current Pool worker, filled once by init_worker
+_database = None
+_phases = None
+_model_cache = OrderedDict()
+_model_cache_size = 32
+# the thread executor shares the cache between its threads
+_model_cache_lock = threading.Lock()
+# builders of scheil.simulate, patched only while scheil_point runs, see cached_scheil_models
+_scheil_builders = (scheil.simulate.instantiate_models, scheil.simulate.build_phase_records)
+_scheil_patch_lock = threading.Lock()
+_scheil_patch_count = 0
+# pressure of simulate_scheil_solidification, fixed by scheil
+SCHEIL_PRESSURE = 101325
+# Databases parsed by the main process, forked workers inherit them instead of parsing the TDB file again
+_published = {}
+
+def publish_database(database):
+    """parse the TDB file once in the main process, before the workers start
+
+    The workers forked afterwards find it in init_worker (copy-on-write memory of the main process),
+    the workers of other start methods parse the file themselves.
+
+    Args:
+        database (str): path to the TDB file
+
+    Returns:
+        Database: the parsed database
+    """
+    key = os.path.abspath(database)
+    mtime = os.path.getmtime(database)
+    if key not in _published or _published[key][0] != mtime:
+        _published[key] = (mtime, Database(database))
+    return _published[key][1]
+
+def init_worker(database, phases=None, cache_size=32):
+    """initializer of the Pool workers, load the database once per process
+
+    Args:
+        database (str): path to the TDB file
+        phases (list, optional): list of phases. Defaults to all phases in the database.
+        cache_size (int, optional): number of (components, phases) models kept in the LRU cache. Defaults to 32.
+    """
+    global _database, _phases, _model_cache_size
+    key = os.path.abspath(database)
+    if key in _published and _published[key][0] == os.path.getmtime(database):
+        _database = _published[key][1]
+    else:
+        _database = Database(database)
+    _phases = list(phases) if phases is not None else list(_database.phases.keys())
+    with _model_cache_lock:
+        _model_cache.clear()
+    _model_cache_size = cache_size
+
+def get_models(comps, phases=None):
+    """get the models and phase records of a component set from the LRU cache, build them if missing
+
+    Args:
+        comps (list): list of components
+        phases (list, optional): list of phases. Defaults to the phases of the worker.
+
+    Returns:
+        set: active phases, dict of models and dict of phase records
+    """
+    phases = _phases if phases is None else phases
+    active_phases = filter_phases(_database, unpack_components(_database, comps), phases)
+    key = (tuple(sorted(str(comp) for comp in comps)), tuple(active_phases))
+    with _model_cache_lock:
+        if key in _model_cache:
+            _model_cache.move_to_end(key)
+            return _model_cache[key]
+    # built outside the lock, two threads missing the same key both build it and the first one is kept
+    models = instantiate_models(_database, comps, active_phases)
+    phase_records = build_phase_records(_database, comps, active_phases, [v.N, v.P, v.T], models,
+                                        output='GM', build_gradients=True, build_hessians=True)
+    with _model_cache_lock:
+        entry = _model_cache.setdefault(key, (active_phases, models, phase_records))
+        _model_cache.move_to_end(key)
+        while len(_model_cache) > _model_cache_size:
+            _model_cache.popitem(last=False)
+    return entry
+
+def _cached_instantiate_models(dbf, comps, phases, model=None, parameters=None, symbols_only=True):
+    if dbf is not _database or model is not None or parameters is not None:
+        return instantiate_models(dbf, comps, phases, model=model, parameters=parameters, symbols_only=symbols_only)
+    return get_models(comps, phases)[1]
+
+def _cached_build_phase_records(dbf, comps, phases, state_variables, models, **kwargs):
+    if dbf is _database and not kwargs:
+        _, cached_models, phase_records = get_models(comps, phases)
+        if models is cached_models:
+            return phase_records
+    return build_phase_records(dbf, comps, phases, state_variables, models, **kwargs)
+
+@contextmanager
+def cached_scheil_models():
+    """point scheil.simulate to the cached models and phase records of this worker, restore its builders on exit
+
+    scheil builds its models and phase records inside simulate_scheil_solidification. The patch is
+    counted, so the threads of the thread executor share it and the last one to leave restores the
+    builders. Other databases fall through to the original builders while it is active.
+    """
+    global _scheil_patch_count
+    with _scheil_patch_lock:
+        if _scheil_patch_count == 0:
+            scheil.simulate.instantiate_models = _cached_instantiate_models
+            scheil.simulate.build_phase_records = _cached_build_phase_records
+        _scheil_patch_count += 1
+    try:
+        yield
+    finally:
+        with _scheil_patch_lock:
+            _scheil_patch_count -= 1
+            if _scheil_patch_count == 0:
+                scheil.simulate.instantiate_models, scheil.simulate.build_phase_records = _scheil_builders
+
+def equilibrium_point(comps, conds):
+    """run equilibrium of one composition with the database and models of this worker
+
+    Args:
+        comps (list): list of components
+        conds (dict): conditions of the composition
+
+    Returns:
+        xarray.Dataset: eq result
+    """
+    active_phases, models, phase_records = get_models(comps)
+    return equilibrium(_database, comps, active_phases, conds, model=models, phase_records=phase_records)
+
+def temperature_grid(temperature_range):
+    """temperatures of a (lower limit, upper limit, step) range, same values as pycalphad uses for v.T"""
+    low, high, step = temperature_range
+    return np.arange(low, high, step, dtype=float)
+
+def _phase_changes(eq, np_tolerance):
+    """mask of the intervals between successive temperatures of eq where the phase set or the phase amounts change"""
+    phase = eq.Phase.values.squeeze()
+    amount = np.nan_to_num(eq.NP.values.squeeze())
+    names = sorted(set(phase.flatten().tolist()) - {''})
+    # (temperatures, phases) amount of each phase, the same phase can be on several vertices
+    fractions = np.stack([np.where(phase == name, amount, 0).sum(axis=-1) for name in names], axis=-1) if names else np.zeros((len(eq.T), 1))
+    present = fractions > 0
+    changed = np.any(present[1:] != present[:-1], axis=-1)
+    jump = np.abs(np.diff(fractions, axis=0)).max(axis=-1) > np_tolerance
+    return changed | jump
+
+def equilibrium_adaptive(comps, conds, coarse_factor=5, np_tolerance=0.05):
+    """run equilibrium on a coarse temperature grid and refine only the intervals with a phase change
+
+    The coarse grid takes every coarse_factor temperature of the v.T range (and its last one). The
+    intervals where the stable phase set changes or a phase amount changes by more than np_tolerance are
+    then calculated on the full grid. The result has the temperatures of both passes, in increasing order.
+
+    Args:
+        comps (list): list of components
+        conds (dict): conditions of the composition, v.T as (lower limit, upper limit, step)
+        coarse_factor (int, optional): number of fine steps in a coarse step. Defaults to 5.
+        np_tolerance (float, optional): change of a phase amount between coarse temperatures that triggers a refinement. Defaults to 0.05.
+
+    Returns:
+        xarray.Dataset: eq result
+    """
+    active_phases, models, phase_records = get_models(comps)
+    fine = temperature_grid(conds[v.T])
+    coarse_index = np.unique(np.append(np.arange(0, len(fine), coarse_factor), len(fine) - 1))
+    eq = equilibrium(_database, comps, active_phases, {**conds, v.T: fine[coarse_index].tolist()}, model=models, phase_records=phase_records)
+    refine = []
+    for interval in np.flatnonzero(_phase_changes(eq, np_tolerance)):
+        refine.extend(range(coarse_index[interval] + 1, coarse_index[interval + 1]))
+    if len(refine) == 0:
+        return eq
+    eq_refine = equilibrium(_database, comps, active_phases, {**conds, v.T: fine[refine].tolist()}, model=models, phase_records=phase_records)
+    return xr.concat([eq, eq_refine], dim='T').sortby('T')
+
+def equilibrium_batch(comps, conds_list, adaptive=None):
+    """run equilibrium for compositions that share the same components
+
+    Args:
+        comps (list): components shared by every composition in the batch
+        conds_list (list): list of conditions, one for each composition
+        adaptive (set, optional): (coarse_factor, np_tolerance) of equilibrium_adaptive, run each composition with it. Defaults to None.
+
+    Returns:
+        list: eq results in the same order as conds_list
+    """
+    if adaptive is not None:
+        return [equilibrium_adaptive(comps, conds, *adaptive) for conds in conds_list]
+    active_phases, models, phase_records = get_models(comps)
+    comp_conds = [key for key in conds_list[0].keys() if isinstance(key, v.MoleFraction)]
+    if len(comp_conds) == 1 and len(conds_list) > 1:
+        # only one composition axis, so the whole batch is one vectorized call
+        conds = dict(conds_list[0])
+        conds[comp_conds[0]] = [item[comp_conds[0]] for item in conds_list]
+        eq = equilibrium(_database, comps, active_phases, conds, model=models, phase_records=phase_records)
+        return [eq.isel({str(comp_conds[0]): i}) for i in range(len(conds_list))]
+    return [equilibrium(_database, comps, active_phases, conds, model=models, phase_records=phase_records) for conds in conds_list]
+
+def liquid_fraction(comps, composition, temperature, liquid_name='LIQUID', pressure=101325):
+    """fraction of the liquid phase of one composition at one temperature
+
+    Args:
+        comps (list): list of components
+        composition (dict): composition of this point
+        temperature (float): temperature
+        liquid_name (str, optional): Defaults to 'LIQUID'.
+        pressure (float, optional): Defaults to 101325.
+
+    Returns:
+        float: liquid fraction
+    """
+    active_phases, models, phase_records = get_models(comps)
+    conds = {v.N: 1, v.P: pressure, v.T: temperature, **composition}
+    eq = equilibrium(_database, comps, active_phases, conds, model=models, phase_records=phase_records)
+    phase = eq.Phase.values.squeeze()
+    amount = eq.NP.values.squeeze()
+    return float(np.nansum(amount[phase == liquid_name]))
+
+def find_liquidus(comps, composition, lower_temperature, upper_temperature, liquid_name='LIQUID', tolerance=1.0, pressure=101325):
+    """bisection of the liquidus between a temperature with solid and a fully liquid temperature
+
+    Args:
+        comps (list): list of components
+        composition (dict): composition of this point
+        lower_temperature (float): temperature with solid (or the lowest temperature to search)
+        upper_temperature (float): fully liquid temperature
+        liquid_name (str, optional): Defaults to 'LIQUID'.
+        tolerance (float, optional): width of the final bracket in K. Defaults to 1.0.
+        pressure (float, optional): Defaults to 101325.
+
+    Returns:
+        float: lowest fully liquid temperature found, within tolerance above the liquidus
+    """
+    while upper_temperature - lower_temperature > tolerance:
+        temperature = (lower_temperature + upper_temperature)/2
+        if liquid_fraction(comps, composition, temperature, liquid_name, pressure) >= 1 - 1E-6:
+            upper_temperature = temperature
+        else:
+            lower_temperature = temperature
+    return upper_temperature
+
+def scheil_point(comps, composition, start_temperature, step_temperature=1.0, liquid_name='LIQUID', eq_kwargs=None, stop=0.0001, verbose=False, adaptive=True,
+                 lower_temperature=None, liquidus_tolerance=1.0):
+    """run scheil simulation of one composition with the database and models of this worker, at SCHEIL_PRESSURE
+
+    Args:
+        comps (list): list of components
+        composition (dict): composition of this point
+        start_temperature (float): temperature to start the scheil simulation, fully liquid
+        lower_temperature (float, optional): lower bound of the liquidus, start from find_liquidus between lower_temperature and start_temperature. Defaults to None.
+        liquidus_tolerance (float, optional): tolerance of find_liquidus in K. Defaults to 1.0.
+
+    Returns:
+        SolidificationResult: scheil result
+    """
+    if lower_temperature is not None:
+        start_temperature = find_liquidus(comps, composition, lower_temperature, start_temperature, liquid_name, liquidus_tolerance, SCHEIL_PRESSURE)
+    with cached_scheil_models():
+        return simulate_scheil_solidification(_database, comps, _phases, composition, start_temperature, step_temperature,
+                                              liquid_name, eq_kwargs, stop, verbose, adaptive)
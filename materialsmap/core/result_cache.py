@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser('~'), '.materialsmap', 'result_cache.sqlite')
+
+def database_hash(database):
+    """hash the content of the TDB file, so an edited database never reuses old results
+
+    Args:
+        database (str): path to the TDB file
+
+    Returns:
+        str: sha256 of the file
+    """
+    sha = hashlib.sha256()
+    with open(database, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def point_key(kind, db_hash, comps, composition, conditions, phases, digits=6):
+    """build the cache key of one point
+
+    Args:
+        kind (str): 'eq' or 'scheil'
+        db_hash (str): hash of the TDB file
+        comps (list): list of components
+        composition (dict): dict of v.X conditions of the point
+        conditions (dict): other conditions (T, P, scheil settings), must be json serializable
+        phases (list): list of phases
+        digits (int, optional): digits to round the composition. Defaults to 6.
+
+    Returns:
+        str: sha256 of the key content
+    """
+    content = {
+        'kind': kind,
+        'database': db_hash,
+        'comps': sorted(str(comp) for comp in comps),
+        'composition': {str(key): round(float(val), digits) for key, val in composition.items()},
+        'conditions': conditions,
+        'phases': sorted(phases),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+class ResultCache:
+    """persistent SQLite store of per-point eq/scheil results
+
+    Args:
+        filename (str, optional): path to the SQLite file. Defaults to ~/.materialsmap/result_cache.sqlite.
+        commit_every (int, optional): number of put calls between two commits, a killed run loses at most the uncommitted ones. Defaults to 16.
+    """
+
+    def __init__(self, filename=None, commit_every=16):
+        self.filename = filename or DEFAULT_CACHE
+        self.commit_every = max(1, commit_every)
+        self.pending = 0
+        folder = os.path.dirname(os.path.abspath(self.filename))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.connection = sqlite3.connect(self.filename)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, kind TEXT, value TEXT)')
+        self.connection.commit()
+
+    def get(self, key):
+        """return the cached result of key, or None for a cache miss"""
+        row = self.connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, kind, value):
+        """store the result of one point"""
+        self.connection.execute('INSERT OR REPLACE INTO results (key, kind, value) VALUES (?, ?, ?)', (key, kind, json.dumps(value)))
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+def open_cache(cache):
+    """open the result cache from the cache argument of pycalphad_eq/pycalphad_scheil
+
+    Args:
+        cache (bool or str): None/False for no cache, True for the default file, or path to the SQLite file
+
+    Returns:
+        ResultCache: the opened cache, None if disabled
+    """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ResultCache()
+    return ResultCache(cache)
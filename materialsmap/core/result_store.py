@@ -0,0 +1,336 @@
+import json
+import os
+import numpy as np
+
+class ResultStore:
+    """columnar store of eq/scheil results, one row per (point, temperature)
+
+    The rows of all points are concatenated, point i owns rows offsets[i]:offsets[i+1].
+    Points without result (None in the dict format) own no rows and have valid[i] False.
+
+    Args:
+        TK (ndarray): (rows,) temperature in K
+        fractions (ndarray): (rows, phases) phase fractions
+        offsets (ndarray): (points+1,) first row of each point
+        present (ndarray): (points, phases) True if the phase is a key of the point in the dict format
+        valid (ndarray): (points,) False for points without result
+        phases (list): phase names, index of the last axis of fractions
+    """
+
+    def __init__(self, TK, fractions, offsets, present, valid, phases):
+        self.TK = TK
+        self.fractions = fractions
+        self.offsets = offsets
+        self.present = present
+        self.valid = valid
+        self.phases = list(phases)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def length(self):
+        """number of temperatures of each point"""
+        return np.diff(self.offsets)
+
+    @property
+    def point_index(self):
+        """index of the point of each row"""
+        return np.repeat(np.arange(len(self)), self.length)
+
+    @classmethod
+    def from_dict(cls, result):
+        """build the store from the {'Point0': {'TK': [...], 'FCC_A1': [...]}} dict format
+
+        Args:
+            result (dict): dict of eq/scheil results
+
+        Returns:
+            ResultStore: the columnar store
+        """
+        numPoint = len(result)
+        phases = []
+        for index in range(numPoint):
+            point = result[f'Point{index}']
+            if isinstance(point, dict):
+                for key in point.keys():
+                    if key != 'TK' and key not in phases:
+                        phases.append(key)
+        offsets = np.zeros(numPoint + 1, dtype=np.int64)
+        present = np.zeros((numPoint, len(phases)), dtype=bool)
+        valid = np.zeros(numPoint, dtype=bool)
+        TK = []
+        fractions = []
+        for index in range(numPoint):
+            point = result[f'Point{index}']
+            offsets[index + 1] = offsets[index]
+            if not isinstance(point, dict):
+                continue
+            valid[index] = True
+            numT = len(point['TK'])
+            block = np.zeros((numT, len(phases)))
+            for key, val in point.items():
+                if key == 'TK':
+                    continue
+                phase_index = phases.index(key)
+                present[index, phase_index] = True
+                if len(val) > 0:
+                    block[:, phase_index] = np.asarray(val, dtype=float)
+            TK.append(np.asarray(point['TK'], dtype=float))
+            fractions.append(block)
+            offsets[index + 1] += numT
+        TK = np.concatenate(TK) if len(TK) > 0 else np.zeros(0)
+        fractions = np.concatenate(fractions) if len(fractions) > 0 else np.zeros((0, len(phases)))
+        return cls(TK, fractions, offsets, present, valid, phases)
+
+    def point(self, index):
+        """get one point in the dict format, None if the point has no result"""
+        if not self.valid[index]:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        point = {'TK': self.TK[start:end].tolist()}
+        for phase_index, phase in enumerate(self.phases):
+            if self.present[index, phase_index]:
+                point[phase] = self.fractions[start:end, phase_index].tolist()
+        return point
+
+    def to_dict(self):
+        """JSON compatible dict format, phase fractions are floats instead of strings"""
+        return {f'Point{index}': self.point(index) for index in range(len(self))}
+
+    def dense(self, fill=np.nan):
+        """point x temperature x phase cube, padded with fill
+
+        Returns:
+            set: TK of shape (points, maxT) and fractions of shape (points, maxT, phases)
+        """
+        maxT = int(self.length.max()) if len(self) > 0 else 0
+        rows = np.arange(len(self.TK)) - np.repeat(self.offsets[:-1], self.length)
+        TK = np.full((len(self), maxT), fill)
+        fractions = np.full((len(self), maxT, len(self.phases)), fill)
+        TK[self.point_index, rows] = self.TK
+        fractions[self.point_index, rows] = self.fractions
+        return TK, fractions
+
+    def save(self, folder):
+        """save the store as .npy files in folder, so it can be memory-mapped"""
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        np.save(f'{folder}/TK.npy', self.TK)
+        np.save(f'{folder}/fractions.npy', self.fractions)
+        np.save(f'{folder}/offsets.npy', self.offsets)
+        np.save(f'{folder}/present.npy', self.present)
+        np.save(f'{folder}/valid.npy', self.valid)
+        f = open(f'{folder}/phases.json', 'w')
+        f.write(json.dumps(self.phases))
+        f.close()
+
+    @classmethod
+    def load(cls, folder, mmap_mode='r'):
+        """load a store saved with save
+
+        Args:
+            folder (str): folder of the store
+            mmap_mode (str, optional): passed to np.load, None to read into memory. Defaults to 'r'.
+        """
+        f = open(f'{folder}/phases.json')
+        phases = json.load(f)
+        f.close()
+        return cls(np.load(f'{folder}/TK.npy', mmap_mode=mmap_mode),
+                   np.load(f'{folder}/fractions.npy', mmap_mode=mmap_mode),
+                   np.load(f'{folder}/offsets.npy'),
+                   np.load(f'{folder}/present.npy'),
+                   np.load(f'{folder}/valid.npy'),
+                   phases)
+
+class ResultStoreWriter:
+    """write a ResultStore point by point and in any order, without keeping the results in memory
+
+    The rows of each point are appended to a spill file when the point is added, close() copies
+    them in point order into the memory-mapped .npy files of the store. The phases are ordered by
+    their first appearance in point order, like from_dict.
+
+    Args:
+        folder (str): Result folder
+        numPoint (int): number of points
+        name (str, optional): name of the results. Defaults to 'data_mole'.
+        writeJson (bool, optional): also write {name}.json. Defaults to True.
+    """
+
+    def __init__(self, folder, numPoint, name='data_mole', writeJson=True):
+        self.folder = folder
+        self.name = name
+        self.writeJson = writeJson
+        self.store_folder = f'{folder}/{name}'
+        if not os.path.exists(self.store_folder):
+            os.makedirs(self.store_folder)
+        # a store left from a previous run must not look current while this one is written
+        if os.path.exists(f'{self.store_folder}/phases.json'):
+            os.remove(f'{self.store_folder}/phases.json')
+        self._phase_index = {}
+        self._records = [None] * numPoint
+        self._spill = open(f'{self.store_folder}/rows.tmp', 'w+b')
+
+    def add(self, index, point):
+        """add the result of point index, in the {'TK': [...], 'FCC_A1': [...]} format or None"""
+        if not isinstance(point, dict):
+            self._records[index] = None
+            return
+        TK = np.asarray(point['TK'], dtype=float)
+        keys = [key for key in point.keys() if key != 'TK']
+        columns = np.array([self._phase_index.setdefault(key, len(self._phase_index)) for key in keys], dtype=np.int64)
+        block = np.zeros((len(TK), len(keys)))
+        for column, key in enumerate(keys):
+            if len(point[key]) > 0:
+                block[:, column] = np.asarray(point[key], dtype=float)
+        self._spill.seek(0, os.SEEK_END)
+        position = self._spill.tell()
+        self._spill.write(TK.tobytes())
+        self._spill.write(block.tobytes())
+        self._records[index] = (position, len(TK), columns)
+
+    def close(self):
+        """write the store and the json file
+
+        Returns:
+            ResultStore: the written store, memory-mapped
+        """
+        numPoint = len(self._records)
+        offsets = np.zeros(numPoint + 1, dtype=np.int64)
+        valid = np.zeros(numPoint, dtype=bool)
+        order = []
+        for index, record in enumerate(self._records):
+            offsets[index + 1] = offsets[index]
+            if record is None:
+                continue
+            valid[index] = True
+            offsets[index + 1] += record[1]
+            order += [column for column in record[2].tolist() if column not in order]
+        names = list(self._phase_index)
+        phases = [names[column] for column in order]
+        remap = np.zeros(len(names), dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        present = np.zeros((numPoint, len(phases)), dtype=bool)
+        TK = np.lib.format.open_memmap(f'{self.store_folder}/TK.npy', mode='w+', dtype=float, shape=(int(offsets[-1]),))
+        fractions = np.lib.format.open_memmap(f'{self.store_folder}/fractions.npy', mode='w+', dtype=float, shape=(int(offsets[-1]), len(phases)))
+        for index, record in enumerate(self._records):
+            if record is None:
+                continue
+            position, numT, columns = record
+            self._spill.seek(position)
+            values = np.frombuffer(self._spill.read(8 * numT * (1 + len(columns))), dtype=float)
+            start = offsets[index]
+            TK[start:start+numT] = values[:numT]
+            fractions[start:start+numT, remap[columns]] = values[numT:].reshape(numT, len(columns))
+            present[index, remap[columns]] = True
+        TK.flush()
+        fractions.flush()
+        del TK, fractions
+        self._spill.close()
+        os.remove(f'{self.store_folder}/rows.tmp')
+        np.save(f'{self.store_folder}/offsets.npy', offsets)
+        np.save(f'{self.store_folder}/present.npy', present)
+        np.save(f'{self.store_folder}/valid.npy', valid)
+        store = ResultStore(np.load(f'{self.store_folder}/TK.npy', mmap_mode='r'), np.load(f'{self.store_folder}/fractions.npy', mmap_mode='r'),
+                            offsets, present, valid, phases)
+        if self.writeJson:
+            f = open(f'{self.folder}/{self.name}.json', 'w')
+            f.write('{')
+            for index in range(numPoint):
+                f.write(f'{", " if index > 0 else ""}"Point{index}": {json.dumps(store.point(index))}')
+            f.write('}')
+            f.close()
+        _writeSourceStamp(self.folder, self.name)
+        # phases.json is written last, so hasResultStore only sees the store when it is complete
+        f = open(f'{self.store_folder}/phases.json', 'w')
+        f.write(json.dumps(phases))
+        f.close()
+        return store
+
+def segmentReduce(ufunc, values, offsets, empty=np.nan):
+    """reduce the rows of each point with ufunc, e.g. np.maximum for the max over temperatures
+
+    Args:
+        ufunc (ufunc): numpy ufunc with reduceat
+        values (ndarray): (rows,) values of the ResultStore rows
+        offsets (ndarray): (points+1,) offsets of the ResultStore
+        empty (float, optional): value of the points without rows. Defaults to np.nan.
+
+    Returns:
+        ndarray: (points,) reduced value of each point
+    """
+    length = np.diff(offsets)
+    out = np.full(len(length), empty, dtype=float)
+    hasRows = length > 0
+    if np.any(hasRows):
+        # the rows are ordered by point, so the starts of the non-empty points split the rows exactly
+        out[hasRows] = ufunc.reduceat(np.asarray(values, dtype=float), offsets[:-1][hasRows])
+    return out
+
+def _sourceStamp(filename):
+    """size and mtime in ns of the json file of a store, None if it does not exist"""
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _writeSourceStamp(folder, name):
+    """record the json file the store was written with, see hasResultStore"""
+    f = open(f'{folder}/{name}/source.json', 'w')
+    f.write(json.dumps(_sourceStamp(f'{folder}/{name}.json')))
+    f.close()
+
+def writeResult(result, folder, name='data_mole', writeJson=True):
+    """write eq/scheil results as a ResultStore folder and, optionally, the json file
+
+    Args:
+        result (dict): dict of eq/scheil results
+        folder (str): Result folder
+        name (str, optional): name of the results. Defaults to 'data_mole'.
+        writeJson (bool, optional): also write {name}.json. Defaults to True.
+    """
+    if writeJson:
+        f = open(f'{folder}/{name}.json', 'w')
+        f.write(json.dumps(result))
+        f.close()
+    ResultStore.from_dict(result).save(f'{folder}/{name}')
+    _writeSourceStamp(folder, name)
+
+def hasResultStore(folder, name='data_mole'):
+    """check if folder has a ResultStore and {name}.json was not changed since the store was written
+
+    The size and mtime in ns of the json file are recorded with the store, comparing the mtimes of
+    the two files is not reliable on filesystems with a 1-2 s resolution.
+    """
+    if not os.path.exists(f'{folder}/{name}/phases.json'):
+        return False
+    if not os.path.exists(f'{folder}/{name}.json'):
+        return True
+    if not os.path.exists(f'{folder}/{name}/source.json'):
+        return False
+    f = open(f'{folder}/{name}/source.json')
+    stamp = json.load(f)
+    f.close()
+    return stamp == _sourceStamp(f'{folder}/{name}.json')
+
+def readResultStore(folder, name='data_mole', mmap_mode='r'):
+    """read a ResultStore written by writeResult
+
+    Args:
+        folder (str): Result folder
+        name (str, optional): name of the results. Defaults to 'data_mole'.
+        mmap_mode (str, optional): passed to np.load. Defaults to 'r'.
+
+    Returns:
+        ResultStore: the columnar store
+    """
+    return ResultStore.load(f'{folder}/{name}', mmap_mode)
+
+def exportJson(folder, name='data_mole'):
+    """export a ResultStore folder to the {name}.json dict format"""
+    result = readResultStore(folder, name).to_dict()
+    f = open(f'{folder}/{name}.json', 'w')
+    f.write(json.dumps(result))
+    f.close()
+    _writeSourceStamp(folder, name)
+    return None
@@ -2,6 +2,11 @@ import json
 import os
 from sklearn import neighbors
 from materialsmap.core.GenerateEqScript import getSettings
+from materialsmap.core.result_store import ResultStore, hasResultStore, readResultStore, segmentReduce
+from materialsmap.core.executor import get_executor, default_workers, SerialExecutor, ThreadExecutor
+from materialsmap.plot.feasibility_kernel import evaluateFeasibility, classifyFeasibility, getAllowedMask, getUnallowedFraction, getFinalScheil, toPlotLists, toFinalScheilDict
+from materialsmap.plot.hot_tearing_kernel import getCriteriaBatch
+from materialsmap.plot.render import plotValueField, plotCategories
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
@@ -9,25 +14,34 @@ import materialsmap.plot.feasibility_helpers
 import math
 
 
-def readResult(folder_Scheil,folder_Eq, readMole = True):
+def readResult(folder_Scheil,folder_Eq, readMole = True, asStore = False):
     """read the previously saved Scheil and Eq result
 
     Args:
         folder_Scheil (str): path to folder that contains scheil results
         folder_Eq (str): path to folder that contains eq results
         readMole (bool, optional): _description_. Defaults to True.
+        asStore (bool, optional): return ResultStore objects instead of dicts. Defaults to False.
 
     Returns:
         dcit: dict of eq and scheil results
     """
     if readMole:
-        f_Scheil = open(f'{folder_Scheil}/Result/data_mole.json')
-        f_Eq = open(f'{folder_Eq}/Result/data_mole.json')
+        name = 'data_mole'
     else:
-        f_Scheil = open(f'{folder_Scheil}/Result/data_wt.json')
-        f_Eq = open(f'{folder_Eq}/Result/data_wt.json')
-    ScheilResult = json.load(f_Scheil)
-    EqResult = json.load(f_Eq)
+        name = 'data_wt'
+    results = []
+    for folder in [folder_Scheil, folder_Eq]:
+        if hasResultStore(f'{folder}/Result', name):
+            # the columnar store skips parsing the (large) json file
+            store = readResultStore(f'{folder}/Result', name)
+            results.append(store if asStore else store.to_dict())
+        else:
+            f = open(f'{folder}/Result/{name}.json')
+            result = json.load(f)
+            f.close()
+            results.append(ResultStore.from_dict(result) if asStore else result)
+    ScheilResult, EqResult = results
     return ScheilResult, EqResult
 
 def readDynamicFeasibility(ScheilResult, EqResult, ratio = 2/3):
@@ -276,9 +290,178 @@ def getSolidLiquidTFromScheil(ScheilResult,solidCriterion):
                         solidusT.append(Scheil['TK'][i])
     return solidusT, liquidusT
 
-def plotMaps(path,engine,dynamicTRange = True, dynamicRatio = 2/3, ScheilThreshold = 0.05, EqThrshold = 0.1, allowPhase = ['FCC','BCC','HCP','LIQUID'],solidCriterion = 0.001, hotTeartSettings = {'numDataThreshold':10,'CSCPoints':[0.4,0.9,0.99], 'KouPoints':[0.93,0.98], 'CDPoints':[0.7,0.98]}): 
+class FeasibilityMapSession:
+    """load the results of a map once and answer feasibility queries for many thresholds, ratios and allowed phases
+
+    The unallowed fraction of every eq row is kept for each allowPhase and the max unallowed
+    fractions for each (dynamicTRange, dynamicRatio, allowPhase), so only the first query of a
+    combination runs the kernel and a threshold change is a comparison of two arrays.
+
+    Args:
+        path (str): path to open the setting and store the results
+        engine (str): computational engine, 'pycalphad' or 'thermo_calc'
+    """
+
+    def __init__(self, path, engine):
+        path = os.path.abspath(path)
+        settings = getSettings(path)
+        self.xComp = settings[2]
+        self.yComp = settings[3]
+        self.comps = settings[9]
+        composition_data = settings[7]
+        if engine.lower() == 'pycalphad':
+            path = path + '/Pycalphad'
+        elif engine.lower() == 'thermo-calc' or engine.lower() == 'thermo_calc' or engine.lower() == 'thermocalc':
+            path = path + '/Thermo-calc'
+        else:
+            raise Exception('Please choose the calculations engine')
+        self.path = path
+        self.coord = list(zip(composition_data[self.xComp].values, composition_data[self.yComp].values))
+        self.ScheilStore, self.EqStore = readResult(path + '/Scheil Simulation', path + '/Equilibrium Simulation', asStore = True)
+        self._ScheilResult = None
+        self._finalScheil = None
+        self._unallowed = {}
+        self._evaluated = {}
+
+    @property
+    def ScheilResult(self):
+        """scheil results in the dict format"""
+        if self._ScheilResult is None:
+            self._ScheilResult = self.ScheilStore.to_dict()
+        return self._ScheilResult
+
+    def getAllowedPhases(self, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+        """eq and scheil phases that contain one of the allowPhase names"""
+        allPhases = list(set(self.EqStore.phases + self.ScheilStore.phases))
+        return [allPhases[index] for index in np.flatnonzero(getAllowedMask(allPhases, allowPhase))]
+
+    def getFinalScheilResults(self):
+        """final scheil result of each point in the getFinalScheilResult dict format"""
+        if self._finalScheil is None:
+            self._finalScheil = getFinalScheil(self.ScheilStore)
+        return toFinalScheilDict(self.ScheilStore, self._finalScheil)
+
+    def evaluate(self, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+        """max unallowed eq and scheil fractions of all points, see evaluateFeasibility
+
+        Returns:
+            set: (points,) EqMaxBadPhaseAmount, (points,) ScheilMaxBadPhaseAmount, (points, phases) finalScheil, (points,) status
+        """
+        allowKey = tuple(allowPhase)
+        key = (bool(dynamicTRange), float(dynamicRatio) if dynamicTRange else None, allowKey)
+        if key not in self._evaluated:
+            if allowKey not in self._unallowed:
+                self._unallowed[allowKey] = getUnallowedFraction(self.EqStore, getAllowedMask(self.EqStore.phases, allowPhase))
+            self._evaluated[key] = evaluateFeasibility(self.ScheilStore, self.EqStore, allowPhase, dynamicTRange, dynamicRatio, self._unallowed[allowKey])
+        return self._evaluated[key]
+
+    def classify(self, EqThrshold = 0.1, ScheilThreshold = 0.05, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+        """feasibility class of each point, see classifyFeasibility and CLASS_LABELS
+
+        Returns:
+            ndarray: classes of shape (*broadcast threshold shape, points)
+        """
+        EqMax, ScheilMax, finalScheil, status = self.evaluate(dynamicTRange, dynamicRatio, allowPhase)
+        return classifyFeasibility(EqMax, ScheilMax, status, EqThrshold, ScheilThreshold)
+
+    def sweep(self, EqThrsholds, ScheilThresholds, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+        """feasibility class of each point for every combination of the thresholds
+
+        Args:
+            EqThrsholds (list): eq thresholds
+            ScheilThresholds (list): scheil thresholds
+
+        Returns:
+            ndarray: classes of shape (len(EqThrsholds), len(ScheilThresholds), points)
+        """
+        EqThrsholds = np.asarray(EqThrsholds, dtype=float).reshape(-1, 1)
+        ScheilThresholds = np.asarray(ScheilThresholds, dtype=float).reshape(1, -1)
+        return self.classify(EqThrsholds, ScheilThresholds, dynamicTRange, dynamicRatio, allowPhase)
+
+    def plotFeasibilityMap(self, EqThrshold = 0.1, ScheilThreshold = 0.05, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+        """plot the Scheil-Eq feasibility map of one set of thresholds, see plotScheilEqFeasibilityMap"""
+        EqMax, ScheilMax, finalScheil, status = self.evaluate(dynamicTRange, dynamicRatio, allowPhase)
+        EqMaxBadPhaseAmount, ScheilMaxBadPhaseAmount = toPlotLists(EqMax, ScheilMax, status)
+        plotScheilEqFeasibilityMap(self.path,self.coord,EqMaxBadPhaseAmount,ScheilMaxBadPhaseAmount,EqThrshold,ScheilThreshold,self.xComp,self.yComp,dynamicTRange,self.comps,dynamicRatio)
+        return None
+
+def classifyForRefinement(path, compositions_list, engine = 'pycalphad', EqThrshold = 0.1, ScheilThreshold = 0.05, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID']):
+    """classify callback of core.adaptive_grid.adaptiveCompositions, e.g. functools.partial(classifyForRefinement, EqThrshold = 0.2)
+
+    Args:
+        path (str): path to open the setting and the results
+        compositions_list (list): compositions of the points, in the order of the composition table
+        engine (str, optional): computational engine, 'pycalphad' or 'thermo_calc'. Defaults to 'pycalphad'.
+
+    Returns:
+        set: (points,) feasibility classes (see FeasibilityMapSession.classify) and (points,) scheil solidus T, nan without result
+    """
+    session = FeasibilityMapSession(path, engine)
+    classes = session.classify(EqThrshold, ScheilThreshold, dynamicTRange, dynamicRatio, allowPhase)
+    solidusT = segmentReduce(np.minimum, session.ScheilStore.TK, session.ScheilStore.offsets)
+    return classes, solidusT
+
+FIGURE_JOBS = 4
+
+def getMapData(session, dynamicTRange = True, dynamicRatio = 2/3, allowPhase = ['FCC','BCC','HCP','LIQUID'], solidCriterion = 0.001, hotTeartSettings = {'numDataThreshold':10,'CSCPoints':[0.4,0.9,0.99], 'KouPoints':[0.93,0.98], 'CDPoints':[0.7,0.98]}):
+    """compute the data shared by the figures of plotMaps once
+
+    Args:
+        session (FeasibilityMapSession): loaded results of the map
+        dynamicTRange (bool, optional): Defaults to True.
+        dynamicRatio (float, optional): Defaults to 2/3.
+        allowPhase (list, optional): Defaults to ['FCC','BCC','HCP','LIQUID'].
+        solidCriterion (float, optional): Defaults to 0.001.
+        hotTeartSettings (dict, optional): Defaults to {'numDataThreshold':10,'CSCPoints':[0.4,0.9,0.99], 'KouPoints':[0.93,0.98], 'CDPoints':[0.7,0.98]}.
+
+    Returns:
+        dict: coordinates, feasibility, solidus/liquidus T, final scheil phases and hot tearing criteria of every point, in the list formats of the plot functions
+    """
+    EqMax, ScheilMax, finalScheil, status = session.evaluate(dynamicTRange, dynamicRatio, allowPhase)
+    EqMaxBadPhaseAmount, ScheilMaxBadPhaseAmount = toPlotLists(EqMax, ScheilMax, status)
+    solidusT,liquidusT = getSolidLiquidTFromScheil(session.ScheilResult,solidCriterion)
+    criteria = getCriteriaBatch(session.ScheilStore,solidusT,liquidusT,numDataThreshold = hotTeartSettings['numDataThreshold']
+                                ,CSCPoints = hotTeartSettings['CSCPoints'],KouPoints = hotTeartSettings['KouPoints'],CDPoints = hotTeartSettings['CDPoints'])
+    data = {'xComp': session.xComp, 'yComp': session.yComp, 'comps': session.comps, 'coord': [[float(x), float(y)] for x, y in session.coord],
+            'EqMaxBadPhaseAmount': EqMaxBadPhaseAmount, 'ScheilMaxBadPhaseAmount': ScheilMaxBadPhaseAmount,
+            'solidusT': [None if item is None else float(item) for item in solidusT], 'liquidusT': [None if item is None else float(item) for item in liquidusT],
+            'finalScheilResults': session.getFinalScheilResults(), 'allowedPhases': session.getAllowedPhases(allowPhase)}
+    for name, values in zip(['FR', 'CSC', 'Kou', 'iCSC', 'sRDG'], criteria):
+        data[name] = [None if math.isnan(item) else item for item in values.tolist()]
+    return data
+
+def getFigureJobs(path, data, EqThrshold = 0.1, ScheilThreshold = 0.05, dynamicTRange = True, dynamicRatio = 2/3, solidCriterion = 0.001, render = 'scatter'):
+    """independent figures of plotMaps as (plot function, arguments) jobs
+
+    Args:
+        path (str): path to store the figures
+        data (dict): from getMapData
+
+    Returns:
+        list: jobs, the hot tearing and phase maps first as they have the most subplots
+    """
+    coord = [tuple(item) for item in data['coord']]
+    xComp, yComp = data['xComp'], data['yComp']
+    return [(plotHotTearingSusceptibilityMap, (path, coord, xComp, yComp, data['FR'], data['CSC'], data['Kou'], data['iCSC'], data['sRDG'], render)),
+            (plotScheilPhase, (path, data['finalScheilResults'], data['allowedPhases'], coord, xComp, yComp, render)),
+            (plotScheilTemperature, (path, data['solidusT'], data['liquidusT'], coord, xComp, yComp, solidCriterion, render)),
+            (plotScheilEqFeasibilityMap, (path, coord, data['EqMaxBadPhaseAmount'], data['ScheilMaxBadPhaseAmount'], EqThrshold, ScheilThreshold, xComp, yComp, dynamicTRange, data['comps'], dynamicRatio))]
+
+def _useNonInteractiveBackend():
+    """initializer of the figure workers"""
+    plt.switch_backend('Agg')
+
+def _runFigureJob(plot, args):
+    plot(*args)
+    return None
+
+def plotMaps(path,engine,dynamicTRange = True, dynamicRatio = 2/3, ScheilThreshold = 0.05, EqThrshold = 0.1, allowPhase = ['FCC','BCC','HCP','LIQUID'],solidCriterion = 0.001, hotTeartSettings = {'numDataThreshold':10,'CSCPoints':[0.4,0.9,0.99], 'KouPoints':[0.93,0.98], 'CDPoints':[0.7,0.98]}, render = 'scatter',
+             dataOnly = False, executor = None, max_workers = None): 
     """plot all realted figures
 
+    The data of the figures is computed once by getMapData, then the figures are rendered as
+    independent jobs (getFigureJobs) by the executor, with the Agg backend in the worker processes.
+
     Args:
         path (str): path to open the setting and store the results
         engine (str): computational engine, 'pycalphad' or 'thermo_calc'
@@ -289,58 +472,34 @@ def plotMaps(path,engine,dynamicTRange = True, dynamicRatio = 2/3, ScheilThresho
         allowPhase (list, optional): Defaults to ['FCC','BCC','HCP','LIQUID'].
         solidCriterion (float, optional): Defaults to 0.001.
         hotTeartSettings (dict, optional): Defaults to {'numDataThreshold':10,'CSCPoints':[0.4,0.9,0.99], 'KouPoints':[0.93,0.98], 'CDPoints':[0.7,0.98]}.
+        render (str, optional): 'scatter' or 'tripcolor' for the maps of values, see plotValueField. Defaults to 'scatter'.
+        dataOnly (bool, optional): only write the data of the figures to mapData.json, without rendering. Defaults to False.
+        executor (str or Executor, optional): 'process', 'serial' or 'distributed', pyplot is not thread safe. Defaults to 'process'.
+        max_workers (int, optional): number of workers. Defaults to one per figure, at most default_workers().
 
     Returns:
-        TIF: all figures store in path
+        dict: data of the figures from getMapData, the figures (TIF) or mapData.json are stored in path
     """
     #input path(path to simulation result), dynamicTRange (should use Eq T range according to Scheil result?), dynamicRatio (ScheilSolidT*dynamicRatio to ScheilSolidT), ScheilThreshold = 0.05, EqThrshold = 0.1, allowPhase = ['FCC','BCC','HCP','LIQUID']
-    ###############################get settings######################################
-    path = os.path.abspath(path)
-    settings = getSettings(path)
-    xComp = settings[2]
-    yComp = settings[3]
-    comps = settings[9]
-    composition_data = settings[7]
-    ###############################which source to use################################
-    if engine.lower() == 'pycalphad':
-        path = path + '/Pycalphad'
-    elif engine.lower() == 'thermo-calc' or engine.lower() == 'thermo_calc' or engine.lower() == 'thermocalc':
-        path = path + '/Thermo-calc'
-    else:
-        raise Exception('Please choose the calculations engine')
-    folder_Scheil = path + '/Scheil Simulation'
-    folder_Eq = path + '/Equilibrium Simulation'
-    #######################read data from the simulation result#######################
-    ScheilResult, EqResult = readResult(folder_Scheil,folder_Eq)
-    if dynamicTRange:
-        EqResult = readDynamicFeasibility(ScheilResult, EqResult, dynamicRatio)
-    finalScheilResults = getFinalScheilResult(ScheilResult)
-    EqPhases = getPhases(EqResult)
-    ScheilPhases = getPhases(ScheilResult)
-    allPhases = list(set(EqPhases + ScheilPhases))
-    allowedPhases = []
-    for phase in allPhases:
-        for item in allowPhase:
-            if item in phase:
-                allowedPhases.append(phase)
-    ScheilMaxBadPhaseAmount = findMaxUnallowedPhaseScheil(finalScheilResults, allowedPhases)
-    EqMaxBadPhaseAmount = findMaxUnallowedPhaseEq(EqResult, allowedPhases)
+    if not dataOnly:
+        executor = get_executor(executor, max_workers or min(FIGURE_JOBS, default_workers()), 1)
+        if isinstance(executor, ThreadExecutor):
+            raise ValueError('the figures are drawn with pyplot, which is not thread safe, use the process, serial or distributed executor')
+    ###############################load the results once#############################
+    session = FeasibilityMapSession(path, engine)
+    path = session.path
+    data = getMapData(session, dynamicTRange, dynamicRatio, allowPhase, solidCriterion, hotTeartSettings)
+    if dataOnly:
+        f = open(f'{path}/mapData.json', 'w')
+        f.write(json.dumps(data))
+        f.close()
+        return data
     ###############################plotting##########################################
-    coord = []
-    for index in range(len(composition_data)):
-        x = composition_data[xComp].values[index]
-        y = composition_data[yComp].values[index]
-        coord.append((x, y))
-    
-    plotScheilEqFeasibilityMap(path,coord,EqMaxBadPhaseAmount,ScheilMaxBadPhaseAmount,EqThrshold,ScheilThreshold,xComp,yComp,dynamicTRange,comps,dynamicRatio)
-    solidusT,liquidusT = getSolidLiquidTFromScheil(ScheilResult,solidCriterion)
-    plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriterion)
-    plotScheilPhase(path, finalScheilResults,allowedPhases, coord,xComp,yComp)
-    ##############################hot tearing criteria###############################
-    FR, CSC, Kou, iCSC, sRDG = getCriteria(ScheilResult,solidusT,liquidusT,numDataThreshold = hotTeartSettings['numDataThreshold']
-                                           ,CSCPoints = hotTeartSettings['CSCPoints'],KouPoints = hotTeartSettings['KouPoints'],CDPoints = hotTeartSettings['CDPoints'])
-    plotHotTearingSusceptibilityMap(path, coord, xComp, yComp, FR, CSC, Kou, iCSC, sRDG)
-    return None
+    jobs = getFigureJobs(path, data, EqThrshold, ScheilThreshold, dynamicTRange, dynamicRatio, solidCriterion, render)
+    initializer = None if isinstance(executor, SerialExecutor) else _useNonInteractiveBackend
+    for result in executor.starmap(_runFigureJob, jobs, initializer):
+        pass
+    return data
 
 def plotScheilEqFeasibilityMap(path,coord,EqMaxBadPhaseAmount,ScheilMaxBadPhaseAmount,EqThrshold,ScheilThreshold,xComp,yComp,dynamicTRange,comps,dynamicRatio):
     print('####################################################################')
@@ -381,30 +540,32 @@ def plotScheilEqFeasibilityMap(path,coord,EqMaxBadPhaseAmount,ScheilMaxBadPhaseA
     dotSize = 22
     fig = plt.figure(figsize = (4,4), dpi = 300)
     ax = fig.add_subplot(projection='triangular')
+    categories = []
     for index in range(len(coord)):
-        (x_plot, y_plot) = coord[index]
         ScheilPointResult = ScheilMaxBadPhaseAmount[index]
         EqPointResult = EqMaxBadPhaseAmount[index]
+        category = None
         if (isinstance(ScheilPointResult,float) or isinstance(ScheilPointResult,int)) and (isinstance(EqPointResult,float) or isinstance(EqPointResult,int)):
             eq_is_feasible = EqPointResult < EqThrshold
             scheil_is_feasible = ScheilPointResult < ScheilThreshold
             if not eq_is_feasible and not scheil_is_feasible:
-                ax.scatter(x_plot, y_plot,s=dotSize, label='Equilibrium and Scheil infeasible', c='purple', marker='h')
-                continue
-            if not eq_is_feasible and scheil_is_feasible:
-                ax.scatter(x_plot, y_plot,s=dotSize, label='Equilibrium infeasible, Scheil feasible', c='red', marker='h')
-                continue
-            if not scheil_is_feasible and eq_is_feasible:
-                ax.scatter(x_plot, y_plot,s=dotSize, label='Equilibrium feasible, Scheil infeasible', c='blue', marker='h')
-                continue
-            ax.scatter(x_plot, y_plot, label='Both Feasible',s=dotSize, c='green', marker='h')
-        else:
-            if ScheilPointResult == 'No Scheil Result' or EqPointResult == 'No Eq Result' or EqPointResult == 'No Scheil Result' or EqPointResult == None:
-                ax.scatter(x_plot, y_plot,s=dotSize, label='No Scheil/Eq data', c='black')
-                continue
-            if dynamicTRange and EqPointResult == 'No Eq Result at low temperature':
-                ax.scatter(x_plot, y_plot,s=dotSize, label='No Eq Result at low temperature', c='yellow')
-                continue
+                category = 'Equilibrium and Scheil infeasible'
+            elif not eq_is_feasible and scheil_is_feasible:
+                category = 'Equilibrium infeasible, Scheil feasible'
+            elif not scheil_is_feasible and eq_is_feasible:
+                category = 'Equilibrium feasible, Scheil infeasible'
+            else:
+                category = 'Both Feasible'
+        elif ScheilPointResult == 'No Scheil Result' or EqPointResult == 'No Eq Result' or EqPointResult == 'No Scheil Result' or EqPointResult == None:
+            category = 'No Scheil/Eq data'
+        elif dynamicTRange and EqPointResult == 'No Eq Result at low temperature':
+            category = 'No Eq Result at low temperature'
+        categories.append(category)
+    # one collection per category instead of one artist per point
+    styles = {'Equilibrium and Scheil infeasible': ('purple', 'h'), 'Equilibrium infeasible, Scheil feasible': ('red', 'h'),
+              'Equilibrium feasible, Scheil infeasible': ('blue', 'h'), 'Both Feasible': ('green', 'h'),
+              'No Scheil/Eq data': ('black', 'o'), 'No Eq Result at low temperature': ('yellow', 'o')}
+    plotCategories(ax, coord, categories, styles, dotSize)
 
     fmtted_comps = '-'.join(sorted(set(comps)))
     if dynamicTRange:
@@ -423,7 +584,7 @@ def plotScheilEqFeasibilityMap(path,coord,EqMaxBadPhaseAmount,ScheilMaxBadPhaseA
     print(f'Plotting {fmtted_comps} done!')
     return None
 
-def plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriterion):
+def plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriterion,render = 'scatter'):
     """plot solidius and liquidus T from scheil results
 
     Args:
@@ -434,6 +595,7 @@ def plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriteri
         xComp (str): name for x label
         yComp (str): name for y label
         solidCriterion (float, optional): Defaults to 0.001.
+        render (str, optional): 'scatter' or 'tripcolor', see plotValueField. Defaults to 'scatter'.
 
     Returns:
         TIF: store the reusults as TIF files
@@ -452,15 +614,7 @@ def plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriteri
         bottom = min(values)
         norm = mpl.colors.Normalize(vmin = bottom, vmax = top)
         cmap = 'Greys'
-        for i in range(len(coord)):
-            value = T[i]
-            (x,y) = coord[i]
-            if value != None:
-                RGB1 = mpl.cm.Greys(norm(value), bytes = True)
-                RGB = (RGB1[0]/255,RGB1[1]/255,RGB1[2]/255)
-            else:
-                RGB = 'yellow'
-            subFig.scatter(x, y,s=dotSize, color = RGB, marker = "o")
+        plotValueField(subFig, coord, T, cmap, norm, dotSize, render = render)
         cbar = plt.colorbar(mpl.cm.ScalarMappable(norm=norm, cmap=cmap),
         orientation='horizontal',fraction=0.035, pad=0.2,aspect=20)
         for t in cbar.ax.get_xticklabels():
@@ -479,7 +633,7 @@ def plotScheilTemperature(path,solidusT,liquidusT,coord,xComp,yComp,solidCriteri
     print('Plotting Scheil-Eq Temperature Map done!')
     return None
 
-def plotScheilPhase(path, finalScheilResults,allowedPhases, coord,xComp,yComp):
+def plotScheilPhase(path, finalScheilResults,allowedPhases, coord,xComp,yComp,render = 'scatter'):
     """plot different phases from scheil simulations
 
     Args:
@@ -489,6 +643,7 @@ def plotScheilPhase(path, finalScheilResults,allowedPhases, coord,xComp,yComp):
         coord (list): list of coordation 
         xComp (str): name for x label
         yComp (str): name for y label
+        render (str, optional): 'scatter' or 'tripcolor', see plotValueField. Defaults to 'scatter'.
 
     Returns:
         TIF: store the reusults as TIF files
@@ -512,18 +667,7 @@ def plotScheilPhase(path, finalScheilResults,allowedPhases, coord,xComp,yComp):
                 isBad = False
         if isBad:
             cmap = 'Reds'
-        for i in range(len(coord)):
-            value = phase_data[phase][i]
-            (x,y) = coord[i]
-            if value != '':
-                if isBad:
-                    RGB1 = mpl.cm.Reds(norm(value), bytes = True)
-                else:
-                    RGB1 = mpl.cm.Greys(norm(value), bytes = True) 
-                RGB = (RGB1[0]/255,RGB1[1]/255,RGB1[2]/255)
-            else:
-                RGB = 'yellow'
-            subFig.scatter(x, y, color = RGB, marker = "o",s = 5)
+        plotValueField(subFig, coord, phase_data[phase], cmap, norm, 5, render = render)
 
         cbar = plt.colorbar(mpl.cm.ScalarMappable(norm=norm, cmap=cmap),
             orientation='horizontal',fraction=0.035, pad=0.2,aspect=20)
@@ -721,7 +865,7 @@ def getCriteria(ScheilResult,solidusT,liquidusT,numDataThreshold = 10,CSCPoints
     return FR, CSC, Kou, CD2, CD1
     #CD1: sRDG, CD2: iCSC
 
-def plotHotTearingSusceptibilityMap(path, coord, xComp, yComp, FR, CSC, Kou, iCSC, sRDG):
+def plotHotTearingSusceptibilityMap(path, coord, xComp, yComp, FR, CSC, Kou, iCSC, sRDG, render = 'scatter'):
     """plot the hot crack susceptibility map
 
     Args:
@@ -734,6 +878,7 @@ def plotHotTearingSusceptibilityMap(path, coord, xComp, yComp, FR, CSC, Kou, iCS
         Kou (list): list of values of Kou from scheil results
         iCSC (list): list of values of iCSC from scheil results
         sRDG (list): list of values of sRDG from scheil results
+        render (str, optional): 'scatter' or 'tripcolor', see plotValueField. Defaults to 'scatter'.
 
     Returns:
         TIF: store the crack reusults as TIF files
@@ -754,15 +899,7 @@ def plotHotTearingSusceptibilityMap(path, coord, xComp, yComp, FR, CSC, Kou, iCS
         top = max(values_pure)
         bottom = min(values_pure)
         norm1 = mpl.colors.Normalize(vmin = bottom, vmax = top)
-        for i in range(len(coord)):
-            value = values[i]
-            (x, y) = coord[i]
-            if value != None and not math.isnan(value) and not math.isinf(value):
-                RGB1 = mpl.cm.Greys(norm1(value), bytes = True)
-                RGB = (RGB1[0]/255,RGB1[1]/255,RGB1[2]/255)
-                plt.scatter(x, y,s=dotSize , color = RGB)
-            else:
-                plt.scatter(x, y,s=dotSize , c = 'yellow')
+        plotValueField(plt.gca(), coord, values, 'Greys', norm1, dotSize, render = render)
 
         cbar = plt.colorbar(mpl.cm.ScalarMappable(norm=norm1, cmap='Greys'),
             orientation='horizontal',fraction=0.035, pad=0.2,aspect=20)
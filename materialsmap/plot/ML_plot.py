@@ -1,5 +1,7 @@
 import os
 from materialsmap.core.GenerateEqScript import getSettings
+from materialsmap.core.project import loadSettings, loadCompositions
+from materialsmap.plot.render import plotValueField
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -40,20 +42,21 @@ def getMLResult(result_ML,properties):
     return properties_val
 
 
-def ML_plot(path,properties='melting_temperature'):
+def ML_plot(path,properties='melting_temperature',render='scatter'):
     """_summary_
 
     Args:
         path (str): path to open the setting and store the results
         properties (str): properties of interested. Defaults to melting_temperature.
+        render (str, optional): 'scatter' or 'tripcolor', see plotValueField. Defaults to 'scatter'.
     """
     path = os.path.abspath(path)
-    settings = np.load(f'{path}/setting.npy',allow_pickle=True) #settings = [TemperatureRange,numPoint,numSimultion,relatedEles,terminalAlloys,indep_terminalAlloys,database,pressure]
-    xComp = settings[5][0]
-    yComp = settings[5][1]
-    comps = settings[4]
-    numFile = int(settings[1])
-    data = pd.read_excel(f'{path}/composition_for_feasibilityMap.xlsx')
+    settings = loadSettings(path)
+    xComp = settings['indep_terminalAlloys'][0]
+    yComp = settings['indep_terminalAlloys'][1]
+    comps = settings['terminalAlloys']
+    numFile = settings['numPoint']
+    data = loadCompositions(path)
     composition_data = dict()
     
     for item in data.columns:
@@ -76,15 +79,7 @@ def ML_plot(path,properties='melting_temperature'):
     bottom = min(properties_val)
     norm = mpl.colors.Normalize(vmin = bottom, vmax = top)
     cmap = 'coolwarm'
-    for i in range(len(coord)):
-        value = properties_val[i]
-        (x,y) = coord[i]
-        if value != None:
-            RGB1 = mpl.cm.coolwarm(norm(value), bytes = True)
-            RGB = (RGB1[0]/255,RGB1[1]/255,RGB1[2]/255)
-        else:
-            RGB = 'yellow'
-        subFig.scatter(x, y,s=dotSize, color = RGB, marker = "o")
+    plotValueField(subFig, coord, properties_val, cmap, norm, dotSize, render = render)
     cbar = plt.colorbar(mpl.cm.ScalarMappable(norm=norm, cmap=cmap),
     orientation='horizontal',fraction=0.035, pad=0.2,aspect=20)
     for t in cbar.ax.get_xticklabels():
@@ -0,0 +1,213 @@
+import numpy as np
+from materialsmap.core.result_store import segmentReduce
+
+# status of each point in the feasibility evaluation
+OK = 0
+NO_SCHEIL = 1
+NO_EQ = 2
+NO_EQ_LOW_T = 3
+STATUS_LABELS = {NO_SCHEIL: 'No Scheil Result', NO_EQ: 'No Eq Result', NO_EQ_LOW_T: 'No Eq Result at low temperature'}
+
+# feasibility class of each point, the colors of plotScheilEqFeasibilityMap
+BOTH_FEASIBLE = 0
+EQ_INFEASIBLE = 1
+SCHEIL_INFEASIBLE = 2
+BOTH_INFEASIBLE = 3
+NO_DATA = 4
+NO_DATA_LOW_T = 5
+CLASS_LABELS = ['Both feasible', 'Equilibrium infeasible, Scheil feasible', 'Equilibrium feasible, Scheil infeasible',
+                'Equilibrium and Scheil infeasible', 'No Scheil/Eq data', 'No Eq Result at low temperature']
+
+def getAllowedMask(phases, allowPhase):
+    """mask of the allowed phases, a phase is allowed if it contains one of the allowPhase names (same rule as plotMaps)
+
+    Args:
+        phases (list): phase names of a ResultStore
+        allowPhase (list): allowed names, e.g. ['FCC','BCC','HCP','LIQUID']
+
+    Returns:
+        ndarray: (phases,) True for allowed phases
+    """
+    return np.array([any(item in phase for item in allowPhase) for phase in phases], dtype=bool)
+
+def getUnallowedFraction(store, allowedMask):
+    """total fraction of the unallowed phases on every row of the store
+
+    Args:
+        store (ResultStore): eq/scheil results
+        allowedMask (ndarray): (phases,) mask from getAllowedMask
+
+    Returns:
+        ndarray: (rows,) unallowed fraction
+    """
+    total = np.zeros(len(store.TK))
+    # sum phase by phase in store order, like the loops over the dict keys
+    for index in np.flatnonzero(~np.asarray(allowedMask, dtype=bool)):
+        total += store.fractions[:, index]
+    return total
+
+def getDynamicWindow(ScheilStore, EqStore, ratio = 2/3):
+    """eq rows from ratio*ScheilSolidusT to ScheilSolidusT, vectorized readDynamicFeasibility
+
+    Args:
+        ScheilStore (ResultStore): scheil results
+        EqStore (ResultStore): eq results
+        ratio (float, optional): ratio of T/Tmelt. Defaults to 2/3.
+
+    Returns:
+        set: (eq rows,) mask of the rows in the window and (points,) status of each point
+    """
+    solidusT = segmentReduce(np.minimum, ScheilStore.TK, ScheilStore.offsets)
+    minEqT = segmentReduce(np.minimum, EqStore.TK, EqStore.offsets)
+    status = np.full(len(EqStore), OK, dtype=np.int8)
+    status[~np.asarray(EqStore.valid)] = NO_EQ
+    status[~np.asarray(ScheilStore.valid)] = NO_SCHEIL
+    with np.errstate(invalid='ignore'):
+        status[(status == OK) & ~(solidusT * ratio >= minEqT)] = NO_EQ_LOW_T
+    rowSolidusT = np.repeat(solidusT, EqStore.length)
+    rowOK = np.repeat(status == OK, EqStore.length)
+    TK = np.asarray(EqStore.TK)
+    with np.errstate(invalid='ignore'):
+        window = rowOK & (TK >= rowSolidusT * ratio) & (TK <= rowSolidusT)
+    return window, status
+
+def findMaxUnallowedEq(EqStore, allowedMask, window=None, unallowed=None):
+    """max unallowed phase fraction of each point over the temperatures, vectorized findMaxUnallowedPhaseEq
+
+    Args:
+        EqStore (ResultStore): eq results
+        allowedMask (ndarray): (phases,) mask from getAllowedMask
+        window (ndarray, optional): (rows,) rows to consider, from getDynamicWindow. Defaults to None (all rows).
+        unallowed (ndarray, optional): (rows,) precomputed getUnallowedFraction. Defaults to None.
+
+    Returns:
+        ndarray: (points,) max unallowed fraction, nan for points without result or without rows in the window
+    """
+    if unallowed is None:
+        unallowed = getUnallowedFraction(EqStore, allowedMask)
+    if window is not None:
+        unallowed = np.where(window, unallowed, -np.inf)
+    maxUnallowed = segmentReduce(np.maximum, unallowed, EqStore.offsets)
+    maxUnallowed[maxUnallowed == -np.inf] = np.nan
+    maxUnallowed[~np.asarray(EqStore.valid)] = np.nan
+    return maxUnallowed
+
+def getFinalScheil(ScheilStore):
+    """phase fractions at the end of the scheil simulation, vectorized getFinalScheilResult
+
+    Args:
+        ScheilStore (ResultStore): scheil results
+
+    Returns:
+        ndarray: (points, phases) final phase fractions, nan for points without result
+    """
+    final = np.zeros((len(ScheilStore), len(ScheilStore.phases)))
+    hasRows = ScheilStore.length > 0
+    final[hasRows] = ScheilStore.fractions[ScheilStore.offsets[1:][hasRows] - 1]
+    total = np.zeros(len(ScheilStore))
+    for index in range(len(ScheilStore.phases)):
+        total += final[:, index]
+    # some of the Scheil results end up with a sum of 1.0000000000000002
+    over = total > 1
+    final[over] = final[over] / total[over, None]
+    final[~np.asarray(ScheilStore.valid)] = np.nan
+    return final
+
+def findMaxUnallowedScheil(finalScheil, allowedMask):
+    """unallowed phase fraction at the end of the scheil simulation, vectorized findMaxUnallowedPhaseScheil
+
+    Args:
+        finalScheil (ndarray): (points, phases) from getFinalScheil
+        allowedMask (ndarray): (phases,) mask from getAllowedMask
+
+    Returns:
+        ndarray: (points,) unallowed fraction, nan for points without result
+    """
+    total = np.zeros(len(finalScheil))
+    for index in np.flatnonzero(~np.asarray(allowedMask, dtype=bool)):
+        total += finalScheil[:, index]
+    return total
+
+def evaluateFeasibility(ScheilStore, EqStore, allowPhase, dynamicTRange = True, dynamicRatio = 2/3, unallowed = None):
+    """max unallowed eq and scheil fractions of all points
+
+    Args:
+        ScheilStore (ResultStore): scheil results
+        EqStore (ResultStore): eq results
+        allowPhase (list): allowed names, e.g. ['FCC','BCC','HCP','LIQUID']
+        dynamicTRange (bool, optional): only use eq rows from dynamicRatio*ScheilSolidusT to ScheilSolidusT. Defaults to True.
+        dynamicRatio (float, optional): Defaults to 2/3.
+        unallowed (ndarray, optional): (eq rows,) precomputed getUnallowedFraction of EqStore. Defaults to None.
+
+    Returns:
+        set: (points,) EqMaxBadPhaseAmount, (points,) ScheilMaxBadPhaseAmount, (points, phases) finalScheil, (points,) status
+    """
+    if dynamicTRange:
+        window, status = getDynamicWindow(ScheilStore, EqStore, dynamicRatio)
+    else:
+        window = None
+        status = np.full(len(EqStore), OK, dtype=np.int8)
+        status[~np.asarray(EqStore.valid)] = NO_EQ
+        status[~np.asarray(ScheilStore.valid)] = NO_SCHEIL
+    EqMaxBadPhaseAmount = findMaxUnallowedEq(EqStore, getAllowedMask(EqStore.phases, allowPhase), window, unallowed)
+    if dynamicTRange:
+        status[(status == OK) & np.isnan(EqMaxBadPhaseAmount)] = NO_EQ_LOW_T
+    finalScheil = getFinalScheil(ScheilStore)
+    ScheilMaxBadPhaseAmount = findMaxUnallowedScheil(finalScheil, getAllowedMask(ScheilStore.phases, allowPhase))
+    return EqMaxBadPhaseAmount, ScheilMaxBadPhaseAmount, finalScheil, status
+
+def classifyFeasibility(EqMaxBadPhaseAmount, ScheilMaxBadPhaseAmount, status, EqThrshold, ScheilThreshold):
+    """feasibility class of each point, the thresholds can be arrays to classify many thresholds at once
+
+    Args:
+        EqMaxBadPhaseAmount (ndarray): (points,) from evaluateFeasibility
+        ScheilMaxBadPhaseAmount (ndarray): (points,) from evaluateFeasibility
+        status (ndarray): (points,) from evaluateFeasibility
+        EqThrshold (float or ndarray): eq threshold(s)
+        ScheilThreshold (float or ndarray): scheil threshold(s), broadcast with EqThrshold
+
+    Returns:
+        ndarray: classes of shape (*broadcast threshold shape, points), see CLASS_LABELS
+    """
+    EqThrshold = np.asarray(EqThrshold, dtype=float)[..., None]
+    ScheilThreshold = np.asarray(ScheilThreshold, dtype=float)[..., None]
+    with np.errstate(invalid='ignore'):
+        eqFeasible = EqMaxBadPhaseAmount < EqThrshold
+        scheilFeasible = ScheilMaxBadPhaseAmount < ScheilThreshold
+    classes = np.where(eqFeasible, np.where(scheilFeasible, BOTH_FEASIBLE, SCHEIL_INFEASIBLE),
+                       np.where(scheilFeasible, EQ_INFEASIBLE, BOTH_INFEASIBLE)).astype(np.int8)
+    classes[..., status == NO_EQ_LOW_T] = NO_DATA_LOW_T
+    classes[..., (status == NO_SCHEIL) | (status == NO_EQ)] = NO_DATA
+    return classes
+
+def toPlotLists(EqMaxBadPhaseAmount, ScheilMaxBadPhaseAmount, status):
+    """convert the arrays of evaluateFeasibility to the lists used by plotScheilEqFeasibilityMap
+
+    Returns:
+        set: EqMaxBadPhaseAmount and ScheilMaxBadPhaseAmount lists, with the status labels for points without value
+    """
+    EqList = []
+    ScheilList = []
+    for index in range(len(status)):
+        if status[index] == OK:
+            EqList.append(float(EqMaxBadPhaseAmount[index]))
+            ScheilList.append(float(ScheilMaxBadPhaseAmount[index]))
+        elif status[index] == NO_SCHEIL:
+            EqList.append(STATUS_LABELS[NO_SCHEIL])
+            ScheilList.append(STATUS_LABELS[NO_SCHEIL])
+        else:
+            EqList.append(STATUS_LABELS[status[index]])
+            ScheilList.append(float(ScheilMaxBadPhaseAmount[index]))
+    return EqList, ScheilList
+
+def toFinalScheilDict(ScheilStore, finalScheil):
+    """convert the array of getFinalScheil to the dict format of getFinalScheilResult
+
+    Returns:
+        dict: {'Point': [...], phase: [...]}, '' for points without result
+    """
+    valid = np.asarray(ScheilStore.valid)
+    finalPhases = {'Point': list(range(len(ScheilStore)))}
+    for index, phase in enumerate(ScheilStore.phases):
+        finalPhases[phase] = [float(finalScheil[i, index]) if valid[i] else '' for i in range(len(ScheilStore))]
+    return finalPhases
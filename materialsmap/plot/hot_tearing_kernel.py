@@ -0,0 +1,176 @@
+import numpy as np
+from materialsmap.plot.feasibility_kernel import segmentReduce
+
+def getSolidFraction(ScheilStore, liquidName = 'LIQUID'):
+    """solid fraction 1 - f(liquid) on every row of the scheil store, nan if the store has no liquid phase
+
+    Args:
+        ScheilStore (ResultStore): scheil results
+        liquidName (str, optional): name of the liquid phase. Defaults to 'LIQUID'.
+
+    Returns:
+        ndarray: (rows,) solid fraction
+    """
+    if liquidName not in ScheilStore.phases:
+        return np.full(len(ScheilStore.TK), np.nan)
+    return 1 - np.asarray(ScheilStore.fractions[:, ScheilStore.phases.index(liquidName)], dtype=float)
+
+def firstCrossing(solidFraction, offsets, fs):
+    """first row of each point where the solid fraction reaches fs
+
+    Args:
+        solidFraction (ndarray): (rows,) solid fraction, rows in the order of the scheil simulation
+        offsets (ndarray): (points+1,) offsets of the ResultStore
+        fs (float): solid fraction
+
+    Returns:
+        ndarray: (points,) index of the row, offsets[i+1] if the point never reaches fs
+    """
+    rows = np.arange(len(solidFraction))
+    with np.errstate(invalid='ignore'):
+        reached = solidFraction >= fs
+    first = segmentReduce(np.minimum, np.where(reached, rows, len(rows)), offsets, empty=len(rows))
+    return np.minimum(first, offsets[1:]).astype(np.int64)
+
+def temperatureAtSolidFraction(TK, solidFraction, offsets, fs):
+    """T(fs) of every point, linear between the two rows around the first crossing of fs
+
+    Taking the first crossing makes T(fs) single valued when the solid fraction has plateaus or
+    isothermal steps, so T(fs) is a monotone piecewise-linear function of fs.
+
+    Args:
+        TK (ndarray): (rows,) temperature in K
+        solidFraction (ndarray): (rows,) solid fraction
+        offsets (ndarray): (points+1,) offsets of the ResultStore
+        fs (float): solid fraction
+
+    Returns:
+        set: (points,) T at fs (nan if the point never reaches fs) and (points,) index of the crossing row
+    """
+    TK = np.asarray(TK, dtype=float)
+    crossing = firstCrossing(solidFraction, offsets, fs)
+    reached = crossing < offsets[1:]
+    start = np.maximum(crossing - 1, offsets[:-1])
+    end = np.minimum(crossing, len(TK) - 1)
+    T = np.full(len(end), np.nan)
+    if np.any(reached):
+        f0 = solidFraction[start[reached]]
+        f1 = solidFraction[end[reached]]
+        T0 = TK[start[reached]]
+        T1 = TK[end[reached]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(f1 > f0, (fs - f0) / (f1 - f0), 1.0)
+        T[reached] = T0 + weight * (T1 - T0)
+    return T, crossing
+
+def segmentTrapezoid(Ta, fa, Tb, fb, func, substeps = 32):
+    """trapezoidal integral of func(fs) dT on linear segments from (Ta, fa) to (Tb, fb)
+
+    Every segment is split in substeps equal steps of fs, so steep integrands like the sRDG
+    fs**2/(1-fs)**2 near the coherency point are resolved between two rows of the scheil results.
+
+    Args:
+        Ta (ndarray): (segments,) temperature at the start
+        fa (ndarray): (segments,) solid fraction at the start
+        Tb (ndarray): (segments,) temperature at the end
+        fb (ndarray): (segments,) solid fraction at the end
+        func (function): integrand, vectorized function of fs
+        substeps (int, optional): number of steps per segment. Defaults to 32.
+
+    Returns:
+        ndarray: (segments,) integral
+    """
+    fraction = np.linspace(0, 1, substeps + 1)
+    weights = np.full(substeps + 1, 1.0)
+    weights[[0, -1]] = 0.5
+    fs = fa[:, None] + (fb - fa)[:, None] * fraction
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return func(fs) @ weights * np.abs(Tb - Ta) / substeps
+
+def integrateOverTemperature(TK, solidFraction, offsets, fs0, fsco, func, substeps = 32):
+    """trapezoidal integral of func(fs) dT along the scheil path from fs0 to fsco, for every point
+
+    The path goes through (T(fs0), fs0), the rows between the first crossings of fs0 and fsco and
+    (T(fsco), fsco), fs is linear in T between two nodes, see segmentTrapezoid.
+
+    Args:
+        TK (ndarray): (rows,) temperature in K
+        solidFraction (ndarray): (rows,) solid fraction
+        offsets (ndarray): (points+1,) offsets of the ResultStore
+        fs0 (float): solid fraction at the start of the integral
+        fsco (float): solid fraction at the end of the integral, the coherency point
+        func (function): integrand, vectorized function of fs
+        substeps (int, optional): number of steps between two nodes. Defaults to 32.
+
+    Returns:
+        ndarray: (points,) integral, nan for points that never reach fsco
+    """
+    TK = np.asarray(TK, dtype=float)
+    numPoint = len(offsets) - 1
+    T0, k0 = temperatureAtSolidFraction(TK, solidFraction, offsets, fs0)
+    Tco, kco = temperatureAtSolidFraction(TK, solidFraction, offsets, fsco)
+    # the rows k0 <= row < kco of each point have fs0 <= fs < fsco
+    pointIndex = np.repeat(np.arange(numPoint), np.diff(offsets))
+    rows = np.arange(len(TK))
+    inside = (rows >= k0[pointIndex]) & (rows < kco[pointIndex])
+    pair = np.flatnonzero(inside[:-1] & inside[1:] & (pointIndex[:-1] == pointIndex[1:]))
+    # first node after (T(fs0), fs0) and last node before (T(fsco), fsco), the point has no rows in between if kco == k0
+    hasRows = kco > k0
+    first = np.minimum(k0, len(TK) - 1)
+    last = np.maximum(kco - 1, 0)
+    T1 = np.where(hasRows, TK[first], Tco)
+    f1 = np.where(hasRows, solidFraction[first], fsco)
+    ends = np.flatnonzero(hasRows)
+    Ta = np.concatenate([TK[pair], T0, TK[last[ends]]])
+    fa = np.concatenate([solidFraction[pair], np.full(numPoint, fs0), solidFraction[last[ends]]])
+    Tb = np.concatenate([TK[pair + 1], T1, Tco[ends]])
+    fb = np.concatenate([solidFraction[pair + 1], f1, np.full(len(ends), fsco)])
+    segmentPoint = np.concatenate([pointIndex[pair], np.arange(numPoint), ends])
+    return np.bincount(segmentPoint, weights=segmentTrapezoid(Ta, fa, Tb, fb, func, substeps), minlength=numPoint)
+
+def getCriteriaBatch(ScheilStore, solidusT, liquidusT, numDataThreshold = 10, CSCPoints = [0.4,0.9,0.99], KouPoints = [0.93,0.98], CDPoints = [0.7,0.98], liquidName = 'LIQUID'):
+    """hot tearing criteria of all points, batched getCriteria on the scheil store
+
+    T(fs) is the monotone piecewise-linear interpolation of temperatureAtSolidFraction and the
+    iCSC and sRDG integrals are trapezoidal, see integrateOverTemperature. A point gets nan when
+    it has no result, fewer than numDataThreshold rows or does not solidify past the last point
+    of a criterion.
+
+    Args:
+        ScheilStore (ResultStore): scheil results
+        solidusT (list): list of solidius T, None for points without value
+        liquidusT (list): list of liquidius T, None for points without value
+        numDataThreshold (int, optional): min data for crack criteria. Defaults to 10.
+        CSCPoints (list, optional): settng for CSC criteria. Defaults to [0.4,0.9,0.99].
+        KouPoints (list, optional): settng for Kou criteria. Defaults to [0.93,0.98].
+        CDPoints (list, optional): settng for CD criteria. Defaults to [0.7,0.98].
+        liquidName (str, optional): name of the liquid phase. Defaults to 'LIQUID'.
+
+    Returns:
+        set: (points,) arrays of FR, CSC, Kou, iCSC and sRDG
+    """
+    CSCPoints = sorted(CSCPoints)
+    KouPoints = sorted(KouPoints)
+    CDPoints = sorted(CDPoints)
+    offsets = np.asarray(ScheilStore.offsets)
+    TK = np.asarray(ScheilStore.TK, dtype=float)
+    solidFraction = getSolidFraction(ScheilStore, liquidName)
+    maxSolid = segmentReduce(np.fmax, solidFraction, offsets)
+    enough = np.asarray(ScheilStore.valid) & (ScheilStore.length >= numDataThreshold)
+
+    def atSolidFraction(points):
+        T = [temperatureAtSolidFraction(TK, solidFraction, offsets, fs)[0] for fs in points]
+        with np.errstate(invalid='ignore'):
+            usable = enough & (maxSolid > max(points))
+        return [np.where(usable, item, np.nan) for item in T], usable
+
+    FR = np.asarray(liquidusT, dtype=float) - np.asarray(solidusT, dtype=float)
+    (T3, T2, T1), usable = atSolidFraction(CSCPoints)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        CSC = (T1 - T2) / (T2 - T3)
+    (T2, T1), usable = atSolidFraction(KouPoints)
+    Kou = np.abs((T1 - T2) / (KouPoints[1] ** 0.5 - KouPoints[0] ** 0.5))
+    usable = atSolidFraction(CDPoints)[1]
+    iCSC = np.where(usable, integrateOverTemperature(TK, solidFraction, offsets, CDPoints[0], CDPoints[1], lambda fs: fs), np.nan)
+    sRDG = np.where(usable, integrateOverTemperature(TK, solidFraction, offsets, CDPoints[0], CDPoints[1], lambda fs: fs**2 / (1 - fs)**2), np.nan)
+    return FR, CSC, Kou, iCSC, sRDG
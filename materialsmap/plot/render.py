@@ -0,0 +1,89 @@
+import matplotlib as mpl
+import numpy as np
+from matplotlib.tri import Triangulation
+
+RENDERS = ['scatter', 'tripcolor']
+
+def toValueArray(values):
+    """values of the points as a float array, nan for the points without value (None, '', nan or inf)"""
+    values = np.array([np.nan if item is None or isinstance(item, str) else item for item in values], dtype=float)
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+def getColors(values, cmap, norm, missingColor = 'yellow'):
+    """RGBA colors of all points in one call of the colormap
+
+    Args:
+        values (list): value of each point, see toValueArray
+        cmap (str): name of the colormap
+        norm (Normalize): norm of the colorbar
+        missingColor (str, optional): color of the points without value. Defaults to 'yellow'.
+
+    Returns:
+        ndarray: (points, 4) colors, quantized to 8 bits like mpl.cm.*(value, bytes=True)
+    """
+    values = toValueArray(values)
+    colors = mpl.colormaps[cmap](norm(values), bytes=True) / 255
+    colors[np.isnan(values)] = mpl.colors.to_rgba(missingColor)
+    return colors
+
+def plotValueField(ax, coord, values, cmap, norm, s = 20, marker = 'o', render = 'scatter', missingColor = 'yellow'):
+    """draw a value of every point of the map with one collection
+
+    'scatter' draws one marker per point in a single PathCollection. 'tripcolor' draws a rasterized
+    gouraud-shaded triangulation of the points, the triangles touching a point without value are
+    left out and these points are drawn as missingColor markers. Grids that cannot be triangulated
+    (fewer than 3 points or all on a line) fall back to 'scatter'.
+
+    Args:
+        ax (Axes): triangular axes
+        coord (list): list of coordation
+        values (list): value of each point, see toValueArray
+        cmap (str): name of the colormap
+        norm (Normalize): norm of the colorbar
+        s (float, optional): marker size. Defaults to 20.
+        marker (str, optional): marker of the points. Defaults to 'o'.
+        render (str, optional): 'scatter' or 'tripcolor'. Defaults to 'scatter'.
+        missingColor (str, optional): color of the points without value. Defaults to 'yellow'.
+
+    Returns:
+        Collection: the collection of the values
+    """
+    if render not in RENDERS:
+        raise ValueError(f'unknown render {render}, use one of {RENDERS}')
+    coord = np.asarray(coord, dtype=float).reshape(-1, 2)
+    values = toValueArray(values)
+    if render == 'tripcolor':
+        try:
+            triangulation = Triangulation(coord[:, 0], coord[:, 1])
+        except (ValueError, RuntimeError):
+            render = 'scatter'
+    if render == 'scatter':
+        return ax.scatter(coord[:, 0], coord[:, 1], s=s, c=getColors(values, cmap, norm, missingColor), marker=marker)
+    missing = np.isnan(values)
+    triangulation.set_mask(missing[triangulation.triangles].any(axis=1))
+    collection = ax.tripcolor(triangulation, np.where(missing, 0, values), cmap=cmap, norm=norm, shading='gouraud', rasterized=True)
+    if np.any(missing):
+        ax.scatter(coord[missing, 0], coord[missing, 1], s=s, color=missingColor, marker=marker)
+    return collection
+
+def plotCategories(ax, coord, categories, styles, s = 20):
+    """draw the points of each category with one collection
+
+    Args:
+        ax (Axes): triangular axes
+        coord (list): list of coordation
+        categories (list): category of each point, None for the points that are not drawn
+        styles (dict): (color, marker) of each category, in drawing order
+
+    Returns:
+        dict: collection of each category that has points
+    """
+    coord = np.asarray(coord, dtype=float).reshape(-1, 2)
+    categories = np.array(categories, dtype=object)
+    collections = {}
+    for category, (color, marker) in styles.items():
+        mask = categories == category
+        if np.any(mask):
+            collections[category] = ax.scatter(coord[mask, 0], coord[mask, 1], s=s, c=color, marker=marker, label=category)
+    return collections
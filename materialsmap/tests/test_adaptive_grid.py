@@ -0,0 +1,88 @@
+import unittest
+import shutil
+import tempfile
+import numpy as np
+from materialsmap.core.adaptive_grid import coarseCells, subdivideCell, findBoundaryCells, balanceCells, conformingTriangles, hangingEdges, adaptiveCompositions
+
+
+def _area(triangle):
+    (x0, y0), (x1, y1), (x2, y2) = triangle
+    return abs((x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)) / 2
+
+
+class TestAdaptiveGrid(unittest.TestCase):
+
+    def test_coarseCells(self):
+        cells = coarseCells(2, 1)
+        points = set(p for cell in cells for p in cell[:3])
+        with self.subTest():
+            self.assertEqual(len(cells), 4)
+        with self.subTest():
+            self.assertEqual(sorted(points), [(0, 0), (0, 2), (0, 4), (2, 0), (2, 2), (4, 0)])
+
+    def test_subdivideCell(self):
+        children = subdivideCell(((0, 0), (2, 0), (0, 2), 0))
+        with self.subTest():
+            self.assertEqual(len(children), 4)
+        with self.subTest():
+            self.assertEqual(sorted(set(p for cell in children for p in cell[:3])), [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)])
+        with self.subTest():
+            self.assertTrue(all(cell[3] == 1 for cell in children))
+
+    def test_findBoundaryCells(self):
+        cells = coarseCells(2, 0)
+        pointIndex = {(0, 0): 0, (1, 0): 1, (0, 1): 2, (1, 1): 3, (2, 0): 4, (0, 2): 5}
+        classes = np.array([0, 0, 0, 0, 3, 0])
+        solidusT = np.array([1000, 1010, 1020, 1040, 900, 1100], dtype=float)
+        self.assertEqual(findBoundaryCells(cells, pointIndex, classes, solidusT, 50), [False, False, True, True])
+
+    def test_balanceCells(self):
+        # the corner cell refined twice, its neighbour gets a point at a quarter of their shared edge
+        cells = coarseCells(2, 2)
+        children = subdivideCell(cells[0])
+        cells = cells[1:] + children[:1] + children[2:] + subdivideCell(children[1])
+        with self.subTest():
+            self.assertTrue(hangingEdges(cells[0], set(p for cell in cells for p in cell[:3]))[0][4])
+        balanced = balanceCells(cells)
+        points = set(p for cell in balanced for p in cell[:3])
+        with self.subTest():
+            self.assertGreater(len(balanced), len(cells))
+        with self.subTest():
+            self.assertTrue(all(len(hangingEdges(cell, points)) <= 1 and not any(edge[4] for edge in hangingEdges(cell, points)) for cell in balanced))
+        triangles = conformingTriangles(balanced)
+        with self.subTest():
+            self.assertEqual(sum(_area(triangle) for triangle in triangles), 8 * 8 / 2)
+        with self.subTest():
+            self.assertTrue(all(len(hangingEdges(triangle + (0,), points)) == 0 for triangle in triangles))
+
+    def test_adaptiveCompositions(self):
+        folder = tempfile.mkdtemp()
+        materials = {'Cu': {'Cu': 1}, 'Ag': {'Ag': 1}, 'Al': {'Al': 1}}
+        calculated = []
+        def classify(path, compositions_list):
+            # stub classifier with a feasibility boundary at Ag = 0.3
+            return [int(item['Ag'] > 0.3) for item in compositions_list], [1000.0] * len(compositions_list)
+        def calculate(path, intial_temperature, executor, max_workers):
+            calculated.append(path)
+        compositions_list, classes, triangles = adaptiveCompositions(folder, ['Cu', 'Ag', 'Al'], ['Ag', 'Al'], materials, (600, 2000, 10), folder+'/db.TDB', 2000,
+                                                                      classify, ngridpts = 2, maxLevel = 3, calculate = calculate)
+        shutil.rmtree(folder)
+        coord = [(round(item['Ag'] * 16), round(item['Al'] * 16)) for item in compositions_list]
+        with self.subTest():
+            self.assertEqual(len(calculated), 4)
+        with self.subTest():
+            self.assertEqual(classes.tolist(), [int(item['Ag'] > 0.3) for item in compositions_list])
+        with self.subTest():
+            # the cells crossed by the boundary reach the finest spacing on both sides of Ag = 0.3
+            self.assertTrue({(4, 0), (5, 0), (4, 4), (5, 4)} <= set(coord))
+        with self.subTest():
+            self.assertLess(len(compositions_list), 153)
+        with self.subTest():
+            # the triangles cover the whole simplex without hanging nodes
+            self.assertEqual(sum(_area([coord[index] for index in triangle]) for triangle in triangles), 16 * 16 / 2)
+        with self.subTest():
+            self.assertTrue(all(len(hangingEdges(tuple(coord[index] for index in triangle) + (0,), set(coord))) == 0 for triangle in triangles))
+
+
+if __name__ == '__main__':
+    unittest.main()
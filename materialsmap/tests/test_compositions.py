@@ -1,5 +1,9 @@
 import unittest
-from materialsmap.core.compositions import generateCompositions,createComposition
+import numpy as np
+import pandas as pd
+from pycalphad import variables as v
+from materialsmap.ref_data import eleweight
+from materialsmap.core.compositions import generateCompositions,createComposition,simplexLattice,simplexLatticeSize,massToMoleFractions,getPointCompositions
 
 class TestCalculations(unittest.TestCase):
 
@@ -7,6 +11,27 @@ class TestCalculations(unittest.TestCase):
         composition_lists = generateCompositions(['Ag', 'Al'],1)
         self.assertEqual(composition_lists, [{'Ag': 0.0, 'Al': 0.0}, {'Ag': 0.0, 'Al': 1.0}, {'Ag': 1.0, 'Al': 0.0}],'The generateCompositions is wrong.')
     
+    def test_generateCompositions_quaternary(self):
+        composition_lists = generateCompositions(['Ag', 'Al', 'Cu'],3)
+        with self.subTest():
+            self.assertEqual(len(composition_lists),20)
+        with self.subTest():
+            self.assertEqual(composition_lists[-1],{'Ag': 1.0, 'Al': 0.0, 'Cu': 0.0})
+        with self.subTest():
+            self.assertTrue(all(sum(item.values()) <= 1 + 1e-12 for item in composition_lists))
+
+    def test_simplexLattice(self):
+        chunks = list(simplexLattice(4,10,chunkSize = 100))
+        lattice = np.concatenate(chunks)
+        with self.subTest():
+            self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        with self.subTest():
+            self.assertEqual(len(lattice),simplexLatticeSize(4,10))
+        with self.subTest():
+            self.assertEqual(len(np.unique(lattice,axis=0)),len(lattice))
+        with self.subTest():
+            self.assertTrue(lattice.sum(axis=1).max() == 10 and lattice.min() == 0)
+
     def test_createComposition(self):
         mater = {}
         mater['Cu'] = {'Cu':1}
@@ -22,6 +47,28 @@ class TestCalculations(unittest.TestCase):
         with self.subTest():
             self.assertEqual(numSimultion,3)               
 
+    def test_massToMoleFractions(self):
+        moleFractions = massToMoleFractions(np.array([[0.3, 0.2, 0.5], [1.0, 0.0, 0.0]]), ['CU', 'AG', 'AL'])
+        moles = np.array([0.3/63.546, 0.2/107.868, 0.5/26.982])
+        with self.subTest():
+            np.testing.assert_allclose(moleFractions[0], moles/moles.sum())
+        with self.subTest():
+            self.assertEqual(moleFractions[1].tolist(), [1.0, 0.0, 0.0])
+
+    def test_getPointCompositions(self):
+        df = pd.DataFrame({'CU': [0.3, 0.0, 0.0, 1.0], 'AG': [0.2, 0.6, 0.0, 0.0], 'AL': [0.5, 0.4, 1.0, 0.0]})
+        compositions_list, all_comp_tot = getPointCompositions(df, ['CU', 'AG', 'AL'])
+        with self.subTest():
+            self.assertEqual(all_comp_tot, [['CU', 'AG', 'AL'], ['AG', 'AL'], ['AL', 'CU'], ['CU', 'AG']])
+        with self.subTest():
+            self.assertEqual(compositions_list[2:], [{v.X('CU'): 1E-5}, {v.X('AG'): 1E-5}])
+        for n, (ele, comps) in enumerate([('CU', {v.W('AG'): 0.2, v.W('AL'): 0.5}), ('AG', {v.W('AL'): 0.4})]):
+            expected = v.get_mole_fractions(comps, v.Species(ele), eleweight)
+            with self.subTest(point = n):
+                self.assertEqual(set(compositions_list[n]), set(expected))
+                for key, val in expected.items():
+                    self.assertAlmostEqual(compositions_list[n][key], val)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,174 @@
+import os
+import signal
+import tempfile
+import time
+import unittest
+from materialsmap.core.executor import available_cpus, default_workers, auto_chunksize, get_executor, call_guarded, bounded_imap_unordered, TaskFailure, ProcessExecutor, SerialExecutor
+
+_offset = 0
+
+def _init(offset):
+    global _offset
+    _offset = offset
+
+def _init_file(filename):
+    global _offset
+    with open(filename) as f:
+        _offset = int(f.read())
+
+def _add(a, b):
+    return a + b + _offset
+
+def _fail(a):
+    if a == 3:
+        raise ValueError('bad point')
+    if a == 4:
+        time.sleep(5)
+    if a == 5:
+        os._exit(3)
+    return a
+
+def _pid(a):
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class TestExecutor(unittest.TestCase):
+
+    def test_available_cpus(self):
+        with self.subTest():
+            self.assertTrue(1 <= available_cpus() <= os.cpu_count())
+        with self.subTest():
+            self.assertTrue(1 <= default_workers() <= available_cpus())
+
+    def test_auto_chunksize(self):
+        with self.subTest():
+            self.assertEqual(auto_chunksize(1000, 7), 36)
+        with self.subTest():
+            self.assertEqual(auto_chunksize(3, 7), 1)
+
+    def test_get_executor(self):
+        executor = ProcessExecutor(2)
+        with self.subTest():
+            self.assertIs(get_executor(executor), executor)
+        with self.subTest():
+            self.assertIsInstance(get_executor('serial', 4), SerialExecutor)
+        with self.subTest():
+            self.assertEqual(get_executor(max_workers=3).max_workers, 3)
+        with self.assertRaises(ValueError):
+            get_executor('mpi')
+
+    def test_starmap(self):
+        args = [(i, 2*i) for i in range(10)]
+        for name in ['serial', 'thread', 'process']:
+            with self.subTest(executor=name):
+                executor = get_executor(name, 2, 3)
+                self.assertEqual(list(executor.starmap(_add, args, _init, (100,))), [3*i + 100 for i in range(10)])
+
+    def test_imap_unordered(self):
+        args = [(i, 2*i) for i in range(10)]
+        for name in ['serial', 'thread', 'process']:
+            with self.subTest(executor=name):
+                results = dict(get_executor(name, 2).imap_unordered(_add, args, _init, (100,)))
+                self.assertEqual(results, {i: 3*i + 100 for i in range(10)})
+
+    @unittest.skipUnless(hasattr(signal, 'setitimer'), 'the timeout of call_guarded needs SIGALRM')
+    def test_call_guarded(self):
+        tasks = [(_fail, (i,), 0.5) for i in range(5)]
+        for name in ['serial', 'process']:
+            results = list(get_executor(name, 2).starmap(call_guarded, tasks))
+            with self.subTest(executor=name):
+                self.assertEqual(results[:3], [0, 1, 2])
+            with self.subTest(executor=name):
+                self.assertIsInstance(results[3], TaskFailure)
+                self.assertFalse(results[3].timed_out)
+            with self.subTest(executor=name):
+                self.assertTrue(results[4].timed_out)
+
+    def test_imap_guarded(self):
+        start = time.monotonic()
+        results = dict(get_executor('process', 2).imap_guarded(_fail, [(i,) for i in range(7)], _init, (100,), timeout=0.5))
+        with self.subTest():
+            self.assertLess(time.monotonic() - start, 4)
+        with self.subTest():
+            self.assertEqual([results[index] for index in [0, 1, 2, 6]], [0, 1, 2, 6])
+        with self.subTest():
+            self.assertFalse(results[3].timed_out)
+        with self.subTest():
+            self.assertTrue(results[4].timed_out)
+        with self.subTest():
+            # the worker that exited is replaced
+            self.assertIn('exited with code 3', results[5].error)
+        with self.subTest():
+            results = dict(get_executor('thread', 2).imap_guarded(_fail, [(i,) for i in range(4)]))
+            self.assertEqual([results[index] for index in range(3)], [0, 1, 2])
+            self.assertIsInstance(results[3], TaskFailure)
+        with self.subTest():
+            self.assertRaises(ValueError, list, get_executor('thread', 2).imap_guarded(_fail, [(0,)], timeout=0.5))
+
+    def test_initializer_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'offset.txt')
+            with open(filename, 'w') as f:
+                f.write('100')
+            executor = SerialExecutor()
+            with self.subTest():
+                self.assertEqual(list(executor.starmap(_add, [(1, 2)], _init_file, (filename,))), [103])
+            with self.subTest():
+                # the same file is not read again
+                _init(0)
+                self.assertEqual(list(executor.starmap(_add, [(1, 2)], _init_file, (filename,))), [3])
+            with self.subTest():
+                # the edited file is read again, even within the same mtime tick
+                mtime_ns = os.stat(filename).st_mtime_ns
+                with open(filename, 'w') as f:
+                    f.write('2000')
+                os.utime(filename, ns=(mtime_ns, mtime_ns))
+                self.assertEqual(list(executor.starmap(_add, [(1, 2)], _init_file, (filename,))), [2003])
+
+    def test_imap_guarded_chunksize(self):
+        results = dict(ProcessExecutor(2, 4).imap_guarded(_pid, [(i,) for i in range(8)]))
+        with self.subTest():
+            # two workers, each takes one chunk of 4 tasks
+            self.assertEqual([len({results[index] for index in chunk}) for chunk in [range(4), range(4, 8)]], [1, 1])
+        with self.subTest():
+            self.assertNotEqual(results[0], results[4])
+        start = time.monotonic()
+        results = dict(ProcessExecutor(1, 4).imap_guarded(_fail, [(0,), (4,), (1,), (2,)], timeout=0.5))
+        with self.subTest():
+            self.assertLess(time.monotonic() - start, 4)
+        with self.subTest():
+            # only the task that hung fails, the rest of its chunk runs again on a new worker
+            self.assertEqual([results[index] for index in [0, 2, 3]], [0, 1, 2])
+        with self.subTest():
+            self.assertTrue(results[1].timed_out)
+
+    def test_bounded_imap_unordered(self):
+        results = dict(bounded_imap_unordered(get_executor('process', 2), _fail, [(i,) for i in range(4)], window=3))
+        with self.subTest():
+            self.assertEqual({index: results[index] for index in range(3)}, {0: 0, 1: 1, 2: 2})
+        with self.subTest():
+            self.assertIsInstance(results[3], TaskFailure)
+        with self.subTest():
+            # one pool for all the windows
+            results = dict(bounded_imap_unordered(get_executor('process', 1), os.getpid, [() for i in range(6)], window=2))
+            self.assertEqual(len(set(results.values())), 1)
+        for name in ['thread', 'process']:
+            with self.subTest(name):
+                pulled = []
+                def tasks():
+                    for i in range(8):
+                        pulled.append(i)
+                        yield (i, 0)
+                consumed = 0
+                for index, result in bounded_imap_unordered(get_executor(name, 2), _add, tasks(), window=2):
+                    consumed += 1
+                    self.assertLessEqual(len(pulled), consumed + 2)
+                self.assertEqual(consumed, 8)
+        with self.subTest('stop early'):
+            for index, result in bounded_imap_unordered(get_executor('thread', 2), _add, [(i, 0) for i in range(8)], window=2):
+                break
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from materialsmap.core.result_store import ResultStore
+from materialsmap.plot.FeasibilityMap import readDynamicFeasibility, getFinalScheilResult, findMaxUnallowedPhaseEq, findMaxUnallowedPhaseScheil
+from materialsmap.plot.feasibility_kernel import evaluateFeasibility, classifyFeasibility, getAllowedMask, toPlotLists, toFinalScheilDict, CLASS_LABELS
+
+
+class TestFeasibilityKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.ScheilResult = {'Point0': {'TK': [1300.0, 1290.0, 1280.0], 'FCC_A1': [0.0, 0.6, 0.9], 'LAVES_C15': [0.0, 0.0, 0.1], 'LIQUID': [1.0, 0.4, 0.0]},
+                             'Point1': None,
+                             'Point2': {'TK': [1200.0, 1100.0], 'BCC_A2': [0.0, 0.6], 'LIQUID': [1.0, 0.4000000000000002]},
+                             'Point3': {'TK': [1000.0, 900.0], 'FCC_A1': [0.0, 1.0], 'LIQUID': [1.0, 0.0]}}
+        self.EqResult = {'Point0': {'TK': [700.0, 800.0, 900.0, 1000.0], 'FCC_A1': ['0.80000000', '0.90000000', '0.95000000', '1.00000000'], 'LAVES_C15': ['0.20000000', '0.10000000', '0.05000000', 0]},
+                         'Point1': {'TK': [700.0, 800.0], 'FCC_A1': ['1.00000000', '1.00000000']},
+                         'Point2': None,
+                         'Point3': {'TK': [800.0, 900.0], 'FCC_A1': ['1.00000000', '1.00000000']}}
+        self.allowPhase = ['FCC', 'BCC', 'HCP', 'LIQUID']
+        self.allowedPhases = ['FCC_A1', 'BCC_A2', 'LIQUID']
+
+    def test_getAllowedMask(self):
+        self.assertEqual(getAllowedMask(['FCC_A1', 'LAVES_C15', 'LIQUID'], self.allowPhase).tolist(), [True, False, True])
+
+    def test_evaluateFeasibility(self):
+        ScheilStore = ResultStore.from_dict(self.ScheilResult)
+        EqStore = ResultStore.from_dict(self.EqResult)
+        finalScheilResults = getFinalScheilResult(self.ScheilResult)
+        ScheilMaxBadPhaseAmount = findMaxUnallowedPhaseScheil(finalScheilResults, self.allowedPhases)
+        EqMaxBadPhaseAmount = findMaxUnallowedPhaseEq(readDynamicFeasibility(self.ScheilResult, self.EqResult, 0.7), self.allowedPhases)
+        EqMax, ScheilMax, finalScheil, status = evaluateFeasibility(ScheilStore, EqStore, self.allowPhase, True, 0.7)
+        EqList, ScheilList = toPlotLists(EqMax, ScheilMax, status)
+        with self.subTest():
+            self.assertEqual(EqList, EqMaxBadPhaseAmount)
+        with self.subTest():
+            self.assertEqual([ScheilList[index] for index in [0, 2, 3]], [ScheilMaxBadPhaseAmount[index] for index in [0, 2, 3]])
+        with self.subTest():
+            self.assertEqual(toFinalScheilDict(ScheilStore, finalScheil), finalScheilResults)
+        with self.subTest():
+            self.assertTrue(np.isnan(finalScheil[1]).all())
+
+    def test_evaluateFeasibility_nonDynamic(self):
+        EqMax, ScheilMax, finalScheil, status = evaluateFeasibility(ResultStore.from_dict(self.ScheilResult), ResultStore.from_dict(self.EqResult), self.allowPhase, False)
+        EqList, ScheilList = toPlotLists(EqMax, ScheilMax, status)
+        EqMaxBadPhaseAmount = findMaxUnallowedPhaseEq(self.EqResult, self.allowedPhases)
+        self.assertEqual(EqList, [EqMaxBadPhaseAmount[0], 'No Scheil Result', 'No Eq Result', EqMaxBadPhaseAmount[3]])
+
+    def test_classifyFeasibility(self):
+        EqMax, ScheilMax, finalScheil, status = evaluateFeasibility(ResultStore.from_dict(self.ScheilResult), ResultStore.from_dict(self.EqResult), self.allowPhase, True, 0.7)
+        classes = classifyFeasibility(EqMax, ScheilMax, status, 0.1, 0.05)
+        with self.subTest():
+            self.assertEqual([CLASS_LABELS[item] for item in classes], ['Equilibrium feasible, Scheil infeasible', 'No Scheil/Eq data', 'No Scheil/Eq data', 'No Eq Result at low temperature'])
+        classes = classifyFeasibility(EqMax, ScheilMax, status, np.array([0.01, 0.1]).reshape(-1, 1), np.array([0.05, 0.2]).reshape(1, -1))
+        with self.subTest():
+            self.assertEqual(classes.shape, (2, 2, 4))
+        with self.subTest():
+            self.assertEqual(classes[:, :, 0].tolist(), [[3, 1], [2, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import math
+import numpy as np
+from materialsmap.core.result_store import ResultStore
+from materialsmap.plot.FeasibilityMap import getCriteria
+from materialsmap.plot.hot_tearing_kernel import getCriteriaBatch, temperatureAtSolidFraction
+
+
+class TestHotTearingKernel(unittest.TestCase):
+
+    def setUp(self):
+        # T = 1000 - 100*fs, a step of fs at 950 K and a point with too few rows
+        fs = np.linspace(0, 1, 101)
+        self.ScheilResult = {'Point0': {'TK': (1000 - 100 * fs).tolist(), 'FCC_A1': fs.tolist(), 'LIQUID': (1 - fs).tolist()},
+                             'Point1': None,
+                             'Point2': {'TK': [1000.0, 990.0, 980.0, 970.0, 960.0, 950.0, 950.0, 950.0, 950.0, 940.0, 930.0], 'FCC_A1': [0.0, 0.1, 0.1, 0.1, 0.1, 0.1, 0.5, 0.5, 0.995, 0.997, 1.0],
+                                        'LIQUID': [1.0, 0.9, 0.9, 0.9, 0.9, 0.9, 0.5, 0.5, 0.005, 0.003, 0.0]},
+                             'Point3': {'TK': [1000.0, 900.0], 'FCC_A1': [0.0, 1.0], 'LIQUID': [1.0, 0.0]}}
+        self.store = ResultStore.from_dict(self.ScheilResult)
+        self.solidusT = [900.0, None, 930.0, 900.0]
+        self.liquidusT = [1000.0, None, 1000.0, 1000.0]
+
+    def test_temperatureAtSolidFraction(self):
+        T, crossing = temperatureAtSolidFraction(self.store.TK, 1 - self.store.fractions[:, self.store.phases.index('LIQUID')], self.store.offsets, 0.05)
+        with self.subTest():
+            self.assertEqual(T[[0, 2, 3]].tolist(), [995.0, 995.0, 995.0])
+        with self.subTest():
+            self.assertTrue(np.isnan(T[1]))
+        T, crossing = temperatureAtSolidFraction(self.store.TK, 1 - self.store.fractions[:, self.store.phases.index('LIQUID')], self.store.offsets, 0.3)
+        with self.subTest():
+            self.assertEqual(T[2], 950.0)
+
+    def test_getCriteriaBatch(self):
+        FR, CSC, Kou, iCSC, sRDG = getCriteriaBatch(self.store, self.solidusT, self.liquidusT)
+        G = lambda fs: 1 / (1 - fs) + 2 * math.log(1 - fs) - (1 - fs)
+        with self.subTest():
+            np.testing.assert_allclose(FR, [100.0, np.nan, 70.0, 100.0])
+        with self.subTest():
+            self.assertAlmostEqual(CSC[0], 0.18)
+        with self.subTest():
+            self.assertAlmostEqual(Kou[0], 5 / (0.98 ** 0.5 - 0.93 ** 0.5))
+        with self.subTest():
+            self.assertAlmostEqual(iCSC[0], 50 * (0.98 ** 2 - 0.7 ** 2))
+        with self.subTest():
+            self.assertAlmostEqual(sRDG[0], 100 * (G(0.98) - G(0.7)), delta=1e-3 * sRDG[0])
+        with self.subTest():
+            np.testing.assert_allclose([iCSC[2], sRDG[2]], [0.0, 0.0])
+        with self.subTest():
+            self.assertTrue(np.all(np.isnan([CSC[2], CSC[1], Kou[1], iCSC[1], sRDG[1], CSC[3], Kou[3], iCSC[3], sRDG[3]])))
+
+    def test_getCriteria(self):
+        FR, CSC, Kou, iCSC, sRDG = getCriteriaBatch(self.store, self.solidusT, self.liquidusT)
+        FR_re, CSC_re, Kou_re, iCSC_re, sRDG_re = getCriteria(self.ScheilResult, self.solidusT, self.liquidusT)
+        with self.subTest():
+            self.assertAlmostEqual(CSC[0], CSC_re[0])
+        with self.subTest():
+            self.assertAlmostEqual(Kou[0], Kou_re[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
 import unittest
 import os
+import json
+import shutil
+import tempfile
 import numpy as np
 from pathlib import Path
 from materialsmap.core.pycalphad_run import pycalphad_eq,pycalphad_scheil
 from importlib_resources import files
-from materialsmap.plot.FeasibilityMap import plotScheilEqFeasibilityMap,getSolidLiquidTFromScheil,plotScheilTemperature,plotScheilPhase,plotHotTearingSusceptibilityMap,getCriteria
+from materialsmap.plot.FeasibilityMap import plotScheilEqFeasibilityMap,getSolidLiquidTFromScheil,plotScheilTemperature,plotScheilPhase,plotHotTearingSusceptibilityMap,getCriteria,plotMaps
+from materialsmap.core.ReadEqResult import getEqdata
+from materialsmap.core.ReadScheilResult import getScheilSolidPhase
 
 
 class BaseTestCase(unittest.TestCase):
@@ -69,6 +74,33 @@ class TestCalculations(BaseTestCase):
             self.assertEqual(sRDG,sRDG_re)
         with self.subTest():
             self.assertIsFile(f'{self.path}/hotTearing_normal.tif')      
+    def test_plotMaps(self):
+        folder = tempfile.mkdtemp()
+        shutil.copytree(self.path, folder+'/case')
+        getEqdata(folder+'/case', executor='serial')
+        getScheilSolidPhase(folder+'/case', executor='serial')
+        result = folder+'/case/Thermo-calc'
+        data = plotMaps(folder+'/case', 'thermo_calc', dataOnly=True)
+        f = open(result+'/mapData.json')
+        stored = json.load(f)
+        f.close()
+        with self.subTest():
+            self.assertEqual(stored, data)
+        with self.subTest():
+            self.assertEqual(len(data['coord']), len(data['CSC']))
+        with self.subTest():
+            self.assertEqual([name for name in os.listdir(result) if name.endswith('.tif')], [])
+        plotMaps(folder+'/case', 'thermo_calc', executor='process', max_workers=2)
+        figures = sorted(name for name in os.listdir(result) if name.endswith('.tif'))
+        shutil.rmtree(folder)
+        with self.subTest():
+            self.assertIn('ScheilPhaseHeatMap.tif', figures)
+        with self.subTest():
+            self.assertIn('hotTearing_normal.tif', figures)
+        with self.subTest():
+            self.assertIn('solidusT (K).tif', figures)
+        with self.subTest():
+            self.assertRaises(ValueError, plotMaps, self.path, 'thermo_calc', executor='thread')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from materialsmap.core.project import saveSettings, loadSettings, saveCompositions, loadCompositions
+
+
+class TestProject(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.settings = [(600, 2000, 10), 3, 3, ['AL', 'CU', 'AG'], ['Cu', 'Ag', 'Al'], ['Ag', 'Al'], '/path/Ag-Al-Cu.TDB', 101325, 'massFraction']
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_settings(self):
+        saveSettings(self.path, self.settings)
+        settings = loadSettings(self.path)
+        with self.subTest():
+            self.assertEqual(settings['TemperatureRange'], (600, 2000, 10))
+        with self.subTest():
+            self.assertEqual(settings['indep_terminalAlloys'], ['Ag', 'Al'])
+        with self.subTest():
+            self.assertEqual(settings['database'], '/path/Ag-Al-Cu.TDB')
+
+    def test_legacy_settings(self):
+        legacy = list(self.settings)
+        legacy[1] = 5
+        np.save(f'{self.path}/setting.npy', np.array(legacy, dtype=object))
+        # setting.npy is read when there is no settings.json
+        with self.subTest():
+            self.assertEqual(loadSettings(self.path)['numPoint'], 5)
+        saveSettings(self.path, self.settings)
+        # settings.json is read even if setting.npy is newer
+        mtime = os.path.getmtime(f'{self.path}/settings.json')
+        os.utime(f'{self.path}/setting.npy', (mtime + 10, mtime + 10))
+        with self.subTest():
+            self.assertEqual(loadSettings(self.path)['numPoint'], 3)
+
+    def test_legacy_compositions(self):
+        Compositions = {'AL': [0, 1.0, 0], 'CU': [1.0, 0, 0], 'AG': [0, 0, 1.0], 'Index': [0, 1, 2]}
+        saveCompositions(self.path, Compositions)
+        Compositions['AL'] = [0.5, 0.5, 0]
+        pd.DataFrame(Compositions).to_excel(f'{self.path}/composition_for_feasibilityMap.xlsx')
+        mtime = os.path.getmtime(f'{self.path}/composition_for_feasibilityMap.npz')
+        os.utime(f'{self.path}/composition_for_feasibilityMap.xlsx', (mtime + 10, mtime + 10))
+        with self.subTest():
+            self.assertEqual(loadCompositions(self.path)['AL'].tolist(), [0, 1.0, 0])
+        os.remove(f'{self.path}/composition_for_feasibilityMap.npz')
+        with self.subTest():
+            self.assertEqual(loadCompositions(self.path)['AL'].tolist(), [0.5, 0.5, 0])
+
+    def test_compositions(self):
+        Compositions = {'AL': [0, 1.0, 0], 'CU': [1.0, 0, 0], 'AG': [0, 0, 1.0], 'alloy_Cu': [1.0, 0.0, 0.0], 'alloy_Ag': [0.0, 0.0, 1.0], 'alloy_Al': [0.0, 1.0, 0.0], 'Index': [0, 1, 2]}
+        saveCompositions(self.path, Compositions)
+        df = loadCompositions(self.path)
+        with self.subTest():
+            self.assertEqual(list(df.columns), list(Compositions.keys()))
+        with self.subTest():
+            self.assertEqual(df['AL'].tolist(), [0, 1.0, 0])
+        with self.subTest():
+            self.assertFalse(os.path.exists(f'{self.path}/composition_for_feasibilityMap.xlsx'))
+
+
+if __name__ == '__main__':
+    unittest.main()
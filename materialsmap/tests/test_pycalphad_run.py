@@ -1,10 +1,28 @@
 import unittest
 from pathlib import Path
 import numpy as np
-from materialsmap.core.pycalphad_run import pycalphad_eq,pycalphad_scheil
+from materialsmap.core.pycalphad_run import pycalphad_eq,pycalphad_scheil,pycalphad_eq_scheil,liquidus_brackets,_scheil_costs
+from materialsmap.core.result_store import ResultStore
+from materialsmap.core.result_cache import ResultCache
+from materialsmap.core.checkpoint import Checkpoint
+import os
+import warnings
+import materialsmap.core.pycalphad_worker as pycalphad_worker
+from pycalphad import Database, variables as v
 from importlib_resources import files
 import json
 import shutil 
+import tempfile
+from materialsmap.core.project import saveSettings
+
+def _pressure_database(database, filename):
+    """copy of the TDB with a liquid AL of molar volume 1E-5 m3/mol, melting of pure AL moves up with the pressure"""
+    f = open(database)
+    tdb = f.read()
+    f.close()
+    f = open(filename, 'w')
+    f.write(tdb.replace('PARAMETER G(LIQUID,AL;0)  2.98150E+02  +GLIQAL#;', 'PARAMETER G(LIQUID,AL;0)  2.98150E+02  +GLIQAL#+1E-5*P;'))
+    f.close()
 
 class BaseTestCase(unittest.TestCase):
     
@@ -30,28 +48,206 @@ class TestCalculations(BaseTestCase):
     """
     
     def setUp(self):
-        """test for setting up the pycalphad eq and scheil simulations
+        """test for setting up the pycalphad eq and scheil simulations, each test runs in its own copy of the case files
         
         """
-        self.path = str(files('materialsmap').joinpath('tests/testsCaseFiles'))
-        settings= ((600, 2000, 10),3,3,['AL', 'CU', 'AG'],['Cu', 'Ag', 'Al'],['Ag', 'Al'],self.path+'/Ag-Al-Cu.TDB',101325,'massFraction')
-        np.save(self.path+'/setting.npy', settings)
+        source = str(files('materialsmap').joinpath('tests/testsCaseFiles'))
+        self.path = tempfile.mkdtemp()
+        shutil.copy(source+'/Ag-Al-Cu.TDB', self.path)
+        shutil.copy(source+'/composition_for_feasibilityMap.xlsx', self.path)
+        saveSettings(self.path, [(600, 2000, 10),3,3,['AL', 'CU', 'AG'],['Cu', 'Ag', 'Al'],['Ag', 'Al'],self.path+'/Ag-Al-Cu.TDB',101325,'massFraction'])
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
 
     def test_pycalphad_eq(self):
         pycalphad_eq(self.path)
         self.assertIsEmpty(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json')
 
+    def test_pycalphad_eq_batched(self):
+        pycalphad_eq(self.path, batched=True)
+        self.assertIsEmpty(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json')
+
+    def test_pycalphad_eq_cache(self):
+        cache = self.path+'/Pycalphad/result_cache.sqlite'
+        pycalphad_eq(self.path, cache=cache)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json','r')
+        result = json.load(f)
+        f.close()
+        pycalphad_eq(self.path, cache=cache)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json','r')
+        result_cached = json.load(f)
+        f.close()
+        self.assertEqual(result, result_cached)
+
+    def test_result_cache_commit(self):
+        filename = self.path+'/commit_cache.sqlite'
+        cache = ResultCache(filename, commit_every=2)
+        cache.put('a', 'eq', {'TK': [1.0]})
+        cache.put('b', 'eq', None)
+        cache.put('c', 'eq', {'TK': [2.0]})
+        # a second connection sees the committed puts of a cache that was never closed
+        other = ResultCache(filename)
+        with self.subTest():
+            self.assertEqual(other.get('a'), {'TK': [1.0]})
+        with self.subTest():
+            self.assertIsNone(other.get('c'))
+        other.close()
+        cache.close()
+
+    def test_pycalphad_eq_resume(self):
+        pycalphad_eq(self.path)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/checkpoint.jsonl','r')
+        lines = f.readlines()
+        f.close()
+        self.assertEqual(len(lines), 3)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json','r')
+        result = json.load(f)
+        f.close()
+        pycalphad_eq(self.path, resume=True)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json','r')
+        result_resumed = json.load(f)
+        f.close()
+        self.assertEqual(result, result_resumed)
+
+    def test_checkpoint_resume(self):
+        filename = self.path+'/checkpoint.jsonl'
+        checkpoint = Checkpoint(filename, ['a', 'b', 'c'])
+        checkpoint.write(0, {'TK': [1.0]})
+        checkpoint.write(2, None)
+        checkpoint.close()
+        # a run killed in the middle of a line
+        f = open(filename, 'a')
+        f.write('{"Point": 1, "key": "b", "res')
+        f.close()
+        checkpoint = Checkpoint(filename, ['a', 'b', 'c'], resume=True)
+        checkpoint.close()
+        with self.subTest():
+            self.assertEqual(checkpoint.results, {0: {'TK': [1.0]}, 2: None})
+        resumed = Checkpoint(filename, ['a', 'b', 'c'], resume=True)
+        resumed.close()
+        with self.subTest():
+            self.assertEqual(resumed.results, checkpoint.results)
+        with self.subTest():
+            self.assertFalse(os.path.exists(filename+'.tmp'))
+
+    def test_pycalphad_eq_adaptive_temperature(self):
+        result = dict(pycalphad_eq(self.path))
+        for batched in [False, True]:
+            result_adaptive = pycalphad_eq(self.path, batched=batched, adaptive_temperature=True)
+            for point, item in result_adaptive.items():
+                index = np.searchsorted(result[point]['TK'], item['TK'])
+                with self.subTest(point=point, batched=batched):
+                    self.assertTrue(len(item['TK']) < len(result[point]['TK']))
+                    self.assertEqual(np.asarray(result[point]['TK'])[index].tolist(), np.asarray(item['TK']).tolist())
+                    for phase, val in item.items():
+                        np.testing.assert_allclose(np.asarray(result[point][phase], dtype=float)[index], np.asarray(val, dtype=float))
+
+    def test_pycalphad_eq_timeout(self):
+        pycalphad_eq(self.path, timeout=1E-3)
+        f = open(self.path+'/Pycalphad/Equilibrium Simulation/Result/data_mole.json','r')
+        result = json.load(f)
+        f.close()
+        self.assertEqual(list(result.values()), [None, None, None])
+
     def test_pycalphad_scheil(self):
+        # scheil starts from the liquidus of the eq results
+        pycalphad_eq(self.path)
         pycalphad_scheil(self.path,2000) 
         self.assertIsEmpty(self.path+'/Pycalphad/Scheil Simulation/Result/data_mole.json')    
 
-    @classmethod
-    def tearDownClass(self):
-        self.path = str(files('materialsmap').joinpath('tests/testsCaseFiles'))
-        try:
-            shutil.rmtree(self.path+'/Pycalphad')
-        except OSError as why:
-            print(why)
+    def test_scheil_costs(self):
+        dbf = Database(self.path+'/Ag-Al-Cu.TDB')
+        phases = list(dbf.phases.keys())
+        eq_results = {'Point0': {'TK': [900.0, 1000.0, 1100.0], 'LIQUID': [0, '0.50000000', '1.00000000']},
+                      'Point1': {'TK': [900.0, 1000.0, 1100.0], 'LIQUID': [0, '0.20000000', '1.00000000']},
+                      'Point2': None}
+        costs = _scheil_costs(dbf, phases, [['AL', 'CU', 'AG', 'VA'], ['AL', 'CU', 'VA'], ['AL', 'CU', 'VA']], ResultStore.from_dict(eq_results), 10.0)
+        with self.subTest():
+            self.assertGreater(costs[0], costs[1])
+        with self.subTest():
+            self.assertEqual(costs[1], costs[2])
+
+    def test_liquidus_brackets(self):
+        eq_results = {'Point0': {'TK': [900.0, 1000.0, 1100.0], 'LIQUID': [0, '0.50000000', '1.00000000']},
+                      'Point1': {'TK': [900.0, 1000.0, 1100.0], 'FCC_A1': ['1.00000000', '1.00000000', '0.50000000'], 'LIQUID': [0, 0, '0.50000000']},
+                      'Point2': {'TK': [900.0, 1000.0, 1100.0], 'LIQUID': ['1.00000000', '1.00000000', '1.00000000']},
+                      'Point3': None}
+        T_low, T_high = liquidus_brackets(ResultStore.from_dict(eq_results), 2000, 600)
+        with self.subTest():
+            self.assertEqual(T_low.tolist(), [1000.0, 1100.0, 900.0, 600.0])
+        with self.subTest():
+            self.assertEqual(T_high.tolist(), [1100.0, 2000.0, 900.0, 2000.0])
+
+    def test_pycalphad_eq_scheil(self):
+        eq_result, scheil_results = pycalphad_eq_scheil(self.path, 2000, scheil_options={'liquidus_tolerance': 2.0})
+        T_low, T_high = liquidus_brackets(ResultStore.from_dict(eq_result), 2000, 600)
+        for num, scheil_result in enumerate(scheil_results):
+            with self.subTest(point=num):
+                self.assertTrue(T_low[num] <= scheil_result.temperatures[0] <= T_high[num])
+
+    def test_scheil_point_kwargs(self):
+        pycalphad_worker.init_worker(self.path+'/Ag-Al-Cu.TDB')
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            result = pycalphad_worker.scheil_point(['AL', 'CU', 'VA'], {v.X('CU'): 0.1}, 1000, 2.0, stop=0.05)
+        with self.subTest():
+            self.assertGreater(result.fraction_solid[-1], 0.9)
+        with self.subTest():
+            self.assertEqual([str(item.message) for item in caught if 'unused' in str(item.message)], [])
+
+    def test_publish_database(self):
+        dbf = pycalphad_worker.publish_database(self.path+'/Ag-Al-Cu.TDB')
+        with self.subTest():
+            self.assertIs(pycalphad_worker.publish_database(self.path+'/Ag-Al-Cu.TDB'), dbf)
+        pycalphad_worker.init_worker(self.path+'/Ag-Al-Cu.TDB')
+        with self.subTest():
+            self.assertIs(pycalphad_worker._database, dbf)
+
+    def test_find_liquidus_pressure(self):
+        _pressure_database(self.path+'/Ag-Al-Cu.TDB', self.path+'/pressure.TDB')
+        pycalphad_worker.init_worker(self.path+'/pressure.TDB', ['LIQUID', 'FCC_A1'])
+        T_atm = pycalphad_worker.find_liquidus(['AL', 'VA'], {}, 900, 1000, tolerance=0.1)
+        T_high = pycalphad_worker.find_liquidus(['AL', 'VA'], {}, 900, 1200, tolerance=0.1, pressure=1E8)
+        with self.subTest():
+            self.assertAlmostEqual(T_atm, 933.5, delta=1)
+        with self.subTest():
+            # dT = dV*dP/dS of melting, about 1000/11.5 K
+            self.assertAlmostEqual(T_high - T_atm, 87, delta=10)
+
+    def test_pycalphad_scheil_pressure(self):
+        # eq at 1E8 Pa puts the liquidus of pure AL about 87 K above the one of scheil, which runs at 101325 Pa
+        _pressure_database(self.path+'/Ag-Al-Cu.TDB', self.path+'/pressure.TDB')
+        saveSettings(self.path, [(600, 2000, 10), 3, 3, ['AL', 'CU', 'AG'], ['Cu', 'Ag', 'Al'], ['Ag', 'Al'], self.path+'/pressure.TDB', 1E8, 'massFraction'])
+        pycalphad_eq(self.path)
+        scheil_results = pycalphad_scheil(self.path, 2000, executor='serial')
+        # point 1 is pure AL, the simulation starts within the tolerance of the liquidus at 101325 Pa
+        self.assertAlmostEqual(scheil_results[1].temperatures[0], 933.5, delta=2)
+
+    def test_cached_scheil_models(self):
+        import scheil.simulate
+        original = scheil.simulate.instantiate_models
+        pycalphad_worker.init_worker(self.path+'/Ag-Al-Cu.TDB')
+        with self.subTest():
+            self.assertIs(scheil.simulate.instantiate_models, original)
+        with pycalphad_worker.cached_scheil_models():
+            with pycalphad_worker.cached_scheil_models():
+                pass
+            with self.subTest():
+                self.assertIs(scheil.simulate.instantiate_models, pycalphad_worker._cached_instantiate_models)
+        with self.subTest():
+            self.assertIs(scheil.simulate.instantiate_models, original)
+
+    def test_get_models_threads(self):
+        from multiprocessing.pool import ThreadPool
+        pycalphad_worker.init_worker(self.path+'/Ag-Al-Cu.TDB', ['LIQUID', 'FCC_A1'], 2)
+        comps = [['AL', 'VA'], ['CU', 'VA'], ['AG', 'VA'], ['AL', 'CU', 'VA']] * 3
+        with ThreadPool(4) as p:
+            models = p.map(pycalphad_worker.get_models, comps)
+        with self.subTest():
+            self.assertEqual([sorted(item[1]) for item in models], [['FCC_A1', 'LIQUID']] * len(comps))
+        with self.subTest():
+            self.assertEqual(len(pycalphad_worker._model_cache), 2)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import unittest
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+import materialsmap.plot.feasibility_helpers
+from materialsmap.plot.render import getColors, plotValueField, plotCategories
+
+
+class TestRender(unittest.TestCase):
+
+    def setUp(self):
+        self.coord = [(i / 4, j / 4) for i in range(5) for j in range(5 - i)]
+        self.values = [x + y for x, y in self.coord]
+        self.values[3] = None
+        self.norm = mpl.colors.Normalize(vmin = 0, vmax = 1)
+        self.fig = plt.figure()
+        self.ax = self.fig.add_subplot(projection='triangular')
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_getColors(self):
+        colors = getColors(self.values + ['', float('inf')], 'Greys', self.norm)
+        with self.subTest():
+            self.assertEqual(colors[0].tolist(), [item / 255 for item in mpl.cm.Greys(self.norm(0.0), bytes = True)])
+        with self.subTest():
+            self.assertEqual(colors[[3, -2, -1]].tolist(), [list(mpl.colors.to_rgba('yellow'))] * 3)
+
+    def test_plotValueField(self):
+        plotValueField(self.ax, self.coord, self.values, 'Greys', self.norm)
+        with self.subTest():
+            self.assertEqual(len(self.ax.collections), 1)
+        plotValueField(self.ax, self.coord, self.values, 'Greys', self.norm, render = 'tripcolor')
+        with self.subTest():
+            self.assertEqual(len(self.ax.collections), 3)
+        # a line of points cannot be triangulated
+        plotValueField(self.ax, [(0, 0), (0.5, 0), (1, 0)], [0, 1, 2], 'Greys', self.norm, render = 'tripcolor')
+        with self.subTest():
+            self.assertEqual(len(self.ax.collections), 4)
+        with self.subTest():
+            self.assertRaises(ValueError, plotValueField, self.ax, self.coord, self.values, 'Greys', self.norm, render = 'contour')
+
+    def test_plotCategories(self):
+        categories = ['a', 'b', None, 'a'] + ['b'] * (len(self.coord) - 4)
+        collections = plotCategories(self.ax, self.coord, categories, {'a': ('red', 'h'), 'b': ('blue', 'o'), 'c': ('black', 'o')})
+        with self.subTest():
+            self.assertEqual(list(collections), ['a', 'b'])
+        with self.subTest():
+            self.assertEqual(len(collections['a'].get_offsets()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
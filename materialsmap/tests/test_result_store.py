@@ -0,0 +1,95 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from materialsmap.core.result_store import ResultStore, ResultStoreWriter, writeResult, readResultStore, hasResultStore, exportJson
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.result = {'Point0': {'TK': [1000.0, 1010.0, 1020.0], 'FCC_A1': ['0.25000000', '1.00000000', 0], 'LIQUID': [0, 0, '1.00000000']},
+                       'Point1': None,
+                       'Point2': {'TK': [1000.0, 1010.0], 'BCC_A2': ['1.00000000', '0.50000000'], 'LIQUID': [0, '0.50000000']}}
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_from_dict(self):
+        store = ResultStore.from_dict(self.result)
+        with self.subTest():
+            self.assertEqual(len(store), 3)
+        with self.subTest():
+            self.assertEqual(store.phases, ['FCC_A1', 'LIQUID', 'BCC_A2'])
+        with self.subTest():
+            self.assertEqual(store.offsets.tolist(), [0, 3, 3, 5])
+        with self.subTest():
+            self.assertEqual(store.to_dict(), {'Point0': {'TK': [1000.0, 1010.0, 1020.0], 'FCC_A1': [0.25, 1.0, 0.0], 'LIQUID': [0.0, 0.0, 1.0]},
+                                               'Point1': None,
+                                               'Point2': {'TK': [1000.0, 1010.0], 'LIQUID': [0.0, 0.5], 'BCC_A2': [1.0, 0.5]}})
+
+    def test_dense(self):
+        TK, fractions = ResultStore.from_dict(self.result).dense()
+        with self.subTest():
+            self.assertEqual(fractions.shape, (3, 3, 3))
+        with self.subTest():
+            self.assertTrue(np.all(np.isnan(TK[1])))
+        with self.subTest():
+            self.assertEqual(fractions[2, 1].tolist(), [0.0, 0.5, 0.5])
+
+    def test_writeResult(self):
+        writeResult(self.result, self.folder)
+        self.assertTrue(hasResultStore(self.folder))
+        store = readResultStore(self.folder)
+        with self.subTest():
+            self.assertEqual(store.to_dict(), ResultStore.from_dict(self.result).to_dict())
+        exportJson(self.folder)
+        f = open(f'{self.folder}/data_mole.json')
+        result = json.load(f)
+        f.close()
+        with self.subTest():
+            self.assertEqual(result, store.to_dict())
+
+    def test_hasResultStore(self):
+        writeResult(self.result, self.folder)
+        stat = os.stat(f'{self.folder}/data_mole/phases.json')
+        with self.subTest():
+            self.assertTrue(hasResultStore(self.folder))
+        # rewritten in the same tick of a coarse mtime filesystem as the store
+        f = open(f'{self.folder}/data_mole.json', 'w')
+        f.write(json.dumps({'Point0': None}))
+        f.close()
+        os.utime(f'{self.folder}/data_mole.json', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        with self.subTest():
+            self.assertFalse(hasResultStore(self.folder))
+        exportJson(self.folder)
+        with self.subTest():
+            self.assertTrue(hasResultStore(self.folder))
+        with self.subTest():
+            shutil.rmtree(f'{self.folder}/data_mole')
+            self.assertFalse(hasResultStore(self.folder))
+
+    def test_ResultStoreWriter(self):
+        writer = ResultStoreWriter(self.folder, 3)
+        for index in [2, 1, 0]:
+            writer.add(index, self.result[f'Point{index}'])
+        store = writer.close()
+        expected = ResultStore.from_dict(self.result)
+        with self.subTest():
+            self.assertEqual(store.phases, expected.phases)
+        with self.subTest():
+            self.assertEqual(readResultStore(self.folder).to_dict(), expected.to_dict())
+        f = open(f'{self.folder}/data_mole.json')
+        result = json.load(f)
+        f.close()
+        with self.subTest():
+            self.assertEqual(result, expected.to_dict())
+        with self.subTest():
+            self.assertTrue(hasResultStore(self.folder))
+
+
+if __name__ == '__main__':
+    unittest.main()
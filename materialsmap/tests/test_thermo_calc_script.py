@@ -1,9 +1,10 @@
 import unittest
 import numpy as np
 from materialsmap.core.GenerateEqScript import createEqScript
-from materialsmap.core.ReadEqResult import getEqdata
+from materialsmap.core.ReadEqResult import getEqdata, readEqFromFile
+import tempfile
 from materialsmap.core.GenerateScheilScript import createScheilScript
-from materialsmap.core.ReadScheilResult import getScheilSolidPhase
+from materialsmap.core.ReadScheilResult import getScheilSolidPhase, readScheilSolidFile, linkPhaseAndTemp
 from importlib_resources import files
 import os
 from pathlib import Path
@@ -69,6 +70,56 @@ class TestCalculations(BaseTestCase):
         getEqdata(self.path)
         self.assertIsEmpty(self.path+'/Thermo-calc/Equilibrium Simulation/Result/data_mole.json')
 
+    def test_readEqFromFile(self):
+        folder = tempfile.mkdtemp()
+        f = open(folder+'/0_mole.exp', 'w')
+        f.write('\n Phase Region for:\n     LIQUID\n col-1=TC, col-2=NP(LIQUID),\n   1.20000E+03   1.00000E+00\n   1.10000E+03   1.00000E+00\n\n'
+                ' Phase Region for:\n     FCC_A1\n col-1=TC, col-2=NP(FCC_A1),\n   9.00000E+02   1.00000E+00\n   NONE   1.00000E+00\n\n'
+                ' col-1=TC, col-2=NP(LIQUID), col-3=NP(FCC_A1),\n   1.00000E+03   4.00000E-01   6.00000E-01\n')
+        f.close()
+        output = readEqFromFile(folder, 0)
+        shutil.rmtree(folder)
+        self.assertEqual(output, {'TC': [900.0, 1000.0, 1100.0, 1200.0], 'LIQUID': [0.0, 0.4, 1.0, 1.0], 'FCC_A1': [1.0, 0.6, 0.0, 0.0]})
+
+    def test_failuresPerFile(self):
+        folder = tempfile.mkdtemp()
+        shutil.copytree(self.path, folder+'/case')
+        os.remove(folder+'/case/Thermo-calc/Equilibrium Simulation/1_mole.exp')
+        os.remove(folder+'/case/Thermo-calc/Scheil Simulation/2_liquid_mol%.exp')
+        eqFailures = getEqdata(folder+'/case', executor='serial')
+        scheilFailures = getScheilSolidPhase(folder+'/case', executor='serial')
+        f = open(folder+'/case/Thermo-calc/Equilibrium Simulation/Result/data_mole.json')
+        eqResult = json.load(f)
+        f.close()
+        f = open(folder+'/case/Thermo-calc/Scheil Simulation/Result/data_mole.json')
+        scheilResult = json.load(f)
+        f.close()
+        shutil.rmtree(folder)
+        with self.subTest():
+            self.assertEqual(list(eqFailures), [1])
+        with self.subTest():
+            self.assertEqual([eqResult[f'Point{index}'] is None for index in range(3)], [False, True, False])
+        with self.subTest():
+            self.assertEqual(list(scheilFailures), [2])
+        with self.subTest():
+            self.assertEqual(sorted(scheilResult['Point2']), ['FCC_A1', 'TK'])
+
+    def test_readScheilSolidFile(self):
+        folder = tempfile.mkdtemp()
+        f = open(folder+'/0_solid_mol%.exp', 'w')
+        f.write('$ BLOCK #1\n$E LIQUID\n$E FCC_A1\n$E LAVES_C15\nCLIP ON\n 1.0000E+03 0.0000E+00 M\n 9.9000E+02 5.0000E-01\nCLIP OFF\n'
+                '$ Y-AXIS: col-2\n 9.8000E+02 0.0000E+00 M\n 9.7000E+02 2.0000E-01\nBLOCKEND\n')
+        f.close()
+        currentPhases, currentTemp = readScheilSolidFile(folder+'/0_solid_mol%.exp', 'LIQUID')
+        shutil.rmtree(folder)
+        with self.subTest():
+            self.assertEqual(currentTemp, {'FCC_A1': [1000.0, 990.0], 'LAVES_C15': [980.0, 970.0]})
+        with self.subTest():
+            self.assertEqual(currentPhases, {'FCC_A1': [0.0, 0.5], 'LAVES_C15': [0.0, 0.2]})
+        with self.subTest():
+            self.assertEqual(linkPhaseAndTemp({'FCC_A1': [0.0, 0.5], 'LAVES_C15': [0.0, 0.2]}, {'FCC_A1': [1000.0, 980.0], 'LAVES_C15': [990.0, 970.0]}),
+                             {'TC': [990.0, 970.0], 'FCC_A1': [0.25, 0.5], 'LAVES_C15': [0.0, 0.2]})
+
     def test_getScheilSolidPhase(self):
         getScheilSolidPhase(self.path)
         self.assertIsEmpty(self.path+'/Thermo-calc/Scheil Simulation/Result/data_mole.json')
@@ -85,7 +136,9 @@ class TestCalculations(BaseTestCase):
             os.remove(self.path+'/Thermo-calc/Scheil Simulation/2_AG-_0.TCM')
             os.remove(self.path+'/Thermo-calc/Equilibrium Simulation/Result/data_mole.json')
             os.remove(self.path+'/Thermo-calc/Scheil Simulation/Result/data_mole.json')
-            os.remove(self.path+'/Thermo-calc/Scheil Simulation/Result/ScheilResults.xlsx')
+            os.remove(self.path+'/Thermo-calc/Scheil Simulation/Result/ScheilResults.csv')
+            shutil.rmtree(self.path+'/Thermo-calc/Equilibrium Simulation/Result/data_mole')
+            shutil.rmtree(self.path+'/Thermo-calc/Scheil Simulation/Result/data_mole')
         except OSError as why:
             print(why)
 
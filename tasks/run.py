@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from materialsmap.core.compositions import generateCompositions,createComposition
+from materialsmap.core.project import saveSettings
 from materialsmap.ref_data import periodic_table,materials
 from materialsmap.core.pycalphad_run import pycalphad_eq,pycalphad_scheil
 from materialsmap.core.GenerateEqScript import createEqScript
@@ -54,7 +55,7 @@ compositions_list = generateCompositions(indep_comps,ngridpts)
 Compositions, numPoint, comp, numSimultion = createComposition(indep_comps,comps,compositions_list,materials,path)
 settings = [TemperatureRange,numPoint,numSimultion,comp,comps,indep_comps,os.path.abspath(database),pressure,eleAmountType]
 print(settings)
-np.save(f'{path}/setting.npy',settings)
+saveSettings(path, settings)
 # path = './Simulation/09-07-2023-Ag-Al-Cu-database-Ag-Al-Cu'
 pycalphad_eq(path)
 #pycalphad_scheil(path,1500)